@@ -0,0 +1,727 @@
+"""블로그 스크립트/이미지 생성 (OpenAI 호출부, Streamlit 비의존)
+
+Streamlit 화면 처리는 blogclip_app.py에서 하고, 이 모듈의 함수들은
+작업 스레드나 배치 작업에서도 호출할 수 있도록 예외를 그대로 올립니다.
+"""
+
+import json
+import queue
+import re
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import image_store
+import openai_utils
+
+# 스크립트 생성에 넣을 문서 텍스트 최대 길이 (토큰 제한 고려)
+MAX_SCRIPT_TEXT_LENGTH = 3000
+
+# 페이지별 프롬프트/이미지 생성을 동시에 진행할 최대 페이지 수
+PAGE_WORKERS = 3
+
+# 긴 문서 요약(map-reduce) 설정
+MAP_CHUNK_CHARS = 6000  # 요약 요청 하나에 넣을 본문 최대 길이
+MAP_MIN_CHUNK_CHARS = 2000  # 이보다 짧으면 청크를 나누지 않음
+SUMMARY_WORKERS = 4  # 동시에 진행할 요약 요청 수
+REDUCE_FAN_OUT = 6  # 한 번에 합칠 요약 개수
+CHUNK_BOUNDARY_MODULUS = 32  # 줄 해시가 이 값으로 나누어떨어지면 청크 경계 후보
+
+# 파이프라인 산출물 의존 관계: 키가 바뀌면 값에 있는 산출물을 다시 만들어야 함
+# (스크립트 → 페이지 내용 → 이미지 프롬프트 → 이미지)
+PIPELINE_DEPENDENTS = {
+    "script": ("content",),
+    "content": ("image_prompt",),
+    "image_prompt": ("image_url",),
+    "image_url": (),
+}
+
+# 이미지 스타일에 따른 스타일 지시 문구
+IMAGE_STYLE_PROMPTS = {
+    "실사 스타일": " Create a hyper-realistic photograph with extreme detail. Use professional photography techniques with natural lighting, perfect focus, and authentic textures. The image should look indistinguishable from a high-end camera photo with 8K resolution. Include subtle details like skin pores, fabric texture, or surface reflections where appropriate. Use photorealistic color grading with naturalistic environment.",
+    "동화책 스타일": " in a soft, illustrated storybook style, warm and cozy colors.",
+    "수채화 스타일": " as a delicate watercolor painting with soft colors and gentle brushstrokes.",
+    "3D 렌더링": " as a colorful 3D rendered scene with soft lighting and gentle shadows.",
+    "일러스트레이션": " as a clean, modern illustration with vibrant colors and simple shapes.",
+}
+DEFAULT_IMAGE_STYLE = "실사 스타일"
+
+
+def _generate_image(client, api_key, prompt):
+    """속도 제한/재시도를 거쳐 DALL·E 이미지 생성"""
+    return openai_utils.call_with_retry(
+        api_key,
+        "image",
+        client.images.generate,
+        model="dall-e-3",
+        prompt=prompt,
+        n=1,
+        size="1024x1024",
+    )
+
+
+def build_script_messages(text, num_pages=3, total_script_length=1000):
+    """블로그 스크립트 생성 요청 메시지 구성"""
+    # 텍스트 길이 제한 (토큰 제한 고려)
+    limited_text = text[:MAX_SCRIPT_TEXT_LENGTH]
+
+    # 페이지당 스크립트 길이 계산
+    per_page_length = total_script_length // num_pages
+
+    prompt = f"""
+    다음 문서의 내용을 바탕으로 블로그를 제작하기 위한 스크립트를 작성해 주세요.
+    
+    총 {num_pages}개의 페이지를 생성하고, 각 페이지마다 아래 형식을 따라주세요:
+    
+    # 페이지 제목: [제목]
+    
+    ## 페이지 스크립트:
+    [상세 설명 스크립트]
+    
+    각 페이지는 서로 다른 주제나 측면을 다루되 전체적으로 논리적인 흐름을 가지도록 해주세요.
+    각 페이지의 내용은 약 {per_page_length}자 내외로 작성하여 전체 스크립트가 약 {total_script_length}자가 되도록 해주세요.
+    각 페이지별로 고객 대상으로 친절한 어투로 자세한 설명을 제공해 주세요.
+    
+    반드시 {num_pages}개의 페이지를 생성해 주세요.
+    
+    문서 내용:
+    {limited_text}
+    """
+    return [
+        {"role": "system", "content": "당신은 블로그 제작 전문가입니다."},
+        {"role": "user", "content": prompt},
+    ]
+
+
+def create_video_script(
+    text,
+    num_pages=3,
+    total_script_length=1000,
+    model="gpt-4-turbo-preview",
+    api_key="",
+    use_cache=True,
+):
+    """GPT를 활용하여 블로그 제작을 위한 스크립트 생성 (실패 시 예외 발생)"""
+    messages = build_script_messages(text, num_pages, total_script_length)
+    return openai_utils.chat_completion(api_key, model, messages, use_cache)
+
+
+def stream_video_script(
+    text,
+    num_pages=3,
+    total_script_length=1000,
+    model="gpt-4-turbo-preview",
+    api_key="",
+    use_cache=True,
+):
+    """블로그 스크립트를 생성되는 대로 텍스트 조각 단위로 yield"""
+    messages = build_script_messages(text, num_pages, total_script_length)
+    yield from openai_utils.chat_completion_stream(api_key, model, messages, use_cache)
+
+
+def split_into_chunks(text, max_chars=MAP_CHUNK_CHARS, min_chars=MAP_MIN_CHUNK_CHARS):
+    """긴 텍스트를 요약용 청크로 분할
+
+    청크 경계를 줄 내용의 해시로 정하기 때문에(content-defined chunking)
+    문서 일부만 바뀌어도 나머지 청크는 그대로 유지되어 요약 캐시를 재사용합니다.
+    """
+    chunks = []
+    current = []
+    length = 0
+    for line in text.split("\n"):
+        current.append(line)
+        length += len(line) + 1
+        at_boundary = zlib.crc32(line.encode("utf-8")) % CHUNK_BOUNDARY_MODULUS == 0
+        if length >= max_chars or (length >= min_chars and at_boundary):
+            chunks.append("\n".join(current))
+            current, length = [], 0
+    if any(line.strip() for line in current):
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def summarize_text(
+    text, max_chars, model="gpt-4-turbo-preview", api_key="", use_cache=True
+):
+    """텍스트 하나를 max_chars 이내로 요약 (같은 입력은 응답 캐시 재사용)"""
+    prompt = f"""
+    다음 문서 일부의 핵심 내용을 블로그 제작에 쓸 수 있도록 요약해 주세요.
+    중요한 사실, 수치, 용어, 고유명사는 빠뜨리지 말고 {max_chars}자 이내로 작성해 주세요.
+    요약문만 제공하세요.
+    
+    문서 내용:
+    {text}
+    """
+    messages = [
+        {"role": "system", "content": "당신은 문서를 정확하게 요약하는 전문가입니다."},
+        {"role": "user", "content": prompt},
+    ]
+    return openai_utils.chat_completion(api_key, model, messages, use_cache)
+
+
+def summarize_document(
+    text,
+    target_chars=MAX_SCRIPT_TEXT_LENGTH,
+    model="gpt-4-turbo-preview",
+    api_key="",
+    use_cache=True,
+    max_workers=SUMMARY_WORKERS,
+    fan_out=REDUCE_FAN_OUT,
+    on_progress=None,
+):
+    """긴 문서를 청크별로 동시에 요약한 뒤(map) 합쳐 가며(reduce) target_chars 이내로 축약
+
+    이미 target_chars 이내인 문서는 그대로 반환합니다.
+    on_progress(단계 이름, 완료 수, 전체 수)로 진행 상황을 알립니다.
+    """
+    if len(text) <= target_chars:
+        return text
+
+    fan_out = max(2, fan_out)
+    summaries = split_into_chunks(text)
+    level = 0
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        while level == 0 or (
+            len(summaries) > 1 and len("\n\n".join(summaries)) > target_chars
+        ):
+            if level == 0:
+                groups = [[chunk] for chunk in summaries]
+                stage = "청크 요약"
+            else:
+                groups = [
+                    summaries[i : i + fan_out]
+                    for i in range(0, len(summaries), fan_out)
+                ]
+                stage = f"요약 병합 {level}단계"
+            # 합친 결과가 목표 길이에 맞도록 요약 하나의 길이 배분
+            # (청크 요약은 청크 수와 무관한 고정 길이라야 일부 페이지만 바뀌어도 캐시를 재사용)
+            if level == 0:
+                per_summary = max(200, target_chars // fan_out)
+            else:
+                per_summary = max(200, target_chars // min(len(groups), fan_out))
+            futures = [
+                pool.submit(
+                    summarize_text,
+                    "\n\n".join(group),
+                    per_summary,
+                    model,
+                    api_key,
+                    use_cache,
+                )
+                for group in groups
+            ]
+            results = []
+            for done, future in enumerate(futures, 1):
+                results.append(future.result())
+                if on_progress:
+                    on_progress(stage, done, len(futures))
+            summaries = results
+            level += 1
+
+    return "\n\n".join(summaries)
+
+
+class IncrementalPageParser:
+    """스트리밍 중인 스크립트에서 완성된 페이지를 바로 꺼내는 파서
+
+    '# 페이지 제목:' 블록은 다음 '# 페이지 제목:'이 나타나는 순간 닫힌 것으로 보고
+    페이지로 반환합니다. 마지막 페이지는 finish()에서 반환됩니다.
+    """
+
+    TITLE_PATTERN = re.compile(r"^# 페이지 제목:", re.MULTILINE)
+
+    def __init__(self):
+        self._parts = []
+        self._text = ""
+        self._dirty = False
+        self._emitted = 0
+
+    @property
+    def text(self):
+        """지금까지 받은 스크립트 전체"""
+        if self._dirty:
+            self._text = "".join(self._parts)
+            self._dirty = False
+        return self._text
+
+    def feed(self, chunk):
+        """조각을 추가하고 새로 닫힌 페이지 리스트 반환"""
+        self._parts.append(chunk)
+        self._dirty = True
+        return self._closed_pages(final=False)
+
+    def finish(self):
+        """스트림이 끝난 뒤 남은 마지막 페이지까지 반환"""
+        return self._closed_pages(final=True)
+
+    def _closed_pages(self, final):
+        text = self.text
+        starts = [m.start() for m in self.TITLE_PATTERN.finditer(text)]
+        closed = len(starts) if final else len(starts) - 1
+        pages = []
+        while self._emitted < closed:
+            i = self._emitted
+            end = starts[i + 1] if i + 1 < len(starts) else len(text)
+            pages.append(_parse_page_block(text[starts[i] : end]))
+            self._emitted += 1
+        return pages
+
+
+def _parse_page_block(block):
+    """'# 페이지 제목:'으로 시작하는 블록 하나를 {"title", "content"}로 변환"""
+    first_line, _, rest = block.partition("\n")
+    title = first_line.split(":", 1)[1].strip()
+    match = re.search(r"## 페이지 스크립트:\s*\n([\s\S]+)", rest)
+    content = match.group(1) if match else rest.replace("##", "", 1)
+    return {"title": title, "content": content.strip()}
+
+
+def parse_script_pages(script, expected_page_count=3, on_warning=None):
+    """스크립트에서 페이지 제목과 내용을 추출하여 구조화
+
+    페이지 수가 맞지 않아 보정할 때는 on_warning(메시지)로 알립니다.
+    """
+    # 정규식 패턴: '# 페이지 제목: ' 또는 '# ' 등으로 시작하는 제목 찾기
+    title_patterns = [
+        r"# 페이지 제목:\s*(.+)",
+        r"#\s+페이지\s+\d+[:.]\s*(.+)",
+        r"# (.+)",
+    ]
+
+    # 내용 패턴: '## 페이지 스크립트:' 또는 '## ' 등으로 시작하는 내용 찾기
+    content_patterns = [
+        r"## 페이지 스크립트:\s*\n([\s\S]+?)(?=\n# |$)",
+        r"##\s+페이지\s+\d+[:.]\s*\n([\s\S]+?)(?=\n# |$)",
+        r"## (.+)\n([\s\S]+?)(?=\n# |$)",
+    ]
+
+    pages = []
+    titles = []
+
+    # 먼저 제목을 찾습니다
+    for pattern in title_patterns:
+        titles = re.findall(pattern, script)
+        if titles:
+            break
+
+    # 제목을 찾았다면 내용 추출
+    if titles:
+        # 스크립트를 페이지별로 분할
+        page_blocks = re.split(r"\n# |\n#페이지 \d+[:.] ", script)
+        if page_blocks[0].startswith("# ") or page_blocks[0].startswith("#페이지"):
+            page_blocks[0] = page_blocks[0][page_blocks[0].find("\n") + 1 :]
+
+        # 첫 번째 블록이 비어있거나 # 앞의 내용이라면 제거
+        if not page_blocks[0].strip() or not page_blocks[0].strip().startswith("#"):
+            page_blocks = page_blocks[1:]
+
+        # 각 페이지 블록에서 내용 추출
+        for i, block in enumerate(page_blocks):
+            if i < len(titles):
+                # 내용 찾기
+                content = ""
+                for pattern in content_patterns:
+                    match = re.search(pattern, "# Dummy\n" + block)
+                    if match:
+                        if len(match.groups()) == 1:
+                            content = match.group(1).strip()
+                        elif len(match.groups()) == 2:
+                            content = match.group(2).strip()
+                        break
+
+                # 내용을 찾지 못했다면 전체 블록을 내용으로 사용
+                if not content and block.strip():
+                    if "##" in block:
+                        content = block[block.find("##") + 2 :].strip()
+                    else:
+                        content = block.strip()
+
+                pages.append({"title": titles[i].strip(), "content": content})
+
+    # 페이지 찾기에 실패하거나 예상 페이지 수와 다를 경우 보정
+    if not pages or len(pages) != expected_page_count:
+        if on_warning:
+            on_warning(
+                f"페이지 파싱 문제: {len(pages)}개 페이지가 추출되었지만, {expected_page_count}개가 필요합니다. 보정을 시도합니다."
+            )
+
+        # 페이지가 없거나 너무 적은 경우: 전체 콘텐츠를 강제로 나눔
+        if len(pages) < expected_page_count:
+            # 기존 페이지 유지
+            existing_pages = pages.copy()
+            pages = []
+
+            # 실제 페이지 수가 0이면 전체 스크립트를 사용
+            if len(existing_pages) == 0:
+                # 스크립트를 대략적으로 나누기
+                parts = []
+                script_lines = script.split("\n")
+                chunk_size = len(script_lines) // expected_page_count
+
+                for i in range(expected_page_count):
+                    start = i * chunk_size
+                    end = (
+                        start + chunk_size
+                        if i < expected_page_count - 1
+                        else len(script_lines)
+                    )
+                    parts.append("\n".join(script_lines[start:end]))
+
+                # 나눈 부분으로 페이지 생성
+                for i, part in enumerate(parts):
+                    pages.append({"title": f"페이지 {i+1}", "content": part.strip()})
+            else:
+                # 기존 페이지 먼저 추가
+                pages = existing_pages
+
+                # 추가 페이지 필요
+                remaining = expected_page_count - len(pages)
+                for i in range(remaining):
+                    pages.append(
+                        {
+                            "title": f"추가 페이지 {i+1}",
+                            "content": f"이 콘텐츠는 {expected_page_count}개 페이지 요구사항을 충족하기 위해 자동 생성되었습니다.",
+                        }
+                    )
+
+        # 페이지가 너무 많은 경우: 초과 페이지 제거
+        elif len(pages) > expected_page_count:
+            pages = pages[:expected_page_count]
+
+    return pages
+
+
+def create_image_prompt(page, model="gpt-4-turbo-preview", api_key="", use_cache=True):
+    """페이지 내용에 맞는 이미지 생성 프롬프트 생성 (실패 시 예외 발생)"""
+    if not page or not page.get("content"):
+        return "페이지 내용을 바탕으로 한 실사 이미지"
+
+    # 콘텐츠 길이 제한
+    content_preview = page["content"][:1500]  # 콘텐츠 길이 제한
+
+    prompt = f"""
+    아래 블로그 페이지의 내용을 분석하여,
+    페이지를 초고화질 실사 사진처럼 표현할 수 있는 세부적이고 자세한 이미지 생성 프롬프트를 만들어 주세요.
+    
+    프롬프트는 다음과 같은 요소를 포함해야 합니다:
+    1. 주요 피사체의 명확한 설명 (인물, 제품, 환경 등)
+    2. 조명 조건 (자연광, 부드러운 조명, 극적인 조명 등)
+    3. 촬영 각도 및 구도 (클로즈업, 전체 샷, 원근감 등)
+    4. 색감 및 분위기 (밝고 활기찬, 차분하고 따뜻한 등)
+    5. 고급 사진 효과 (얕은 심도, 선명한 디테일, 부드러운 배경 등)
+    
+    응답은 프롬프트 텍스트만 제공하세요. 설명이나 주석은 필요 없습니다.
+    
+    페이지 제목: {page['title']}
+    
+    페이지 내용:
+    {content_preview}
+    """
+    messages = [
+        {
+            "role": "system",
+            "content": "당신은 안전하고 정교하며 사실적인 이미지 생성 프롬프트를 작성하는 전문가입니다.",
+        },
+        {"role": "user", "content": prompt},
+    ]
+    return openai_utils.chat_completion(api_key, model, messages, use_cache)
+
+
+def _parse_prompt_list(text, expected_count):
+    """응답에서 JSON 배열을 찾아 페이지 순서대로 프롬프트 리스트로 변환"""
+    start, end = text.find("["), text.rfind("]")
+    if start == -1 or end <= start:
+        raise ValueError("응답에서 JSON 배열을 찾지 못했습니다.")
+    items = json.loads(text[start : end + 1])
+    prompts = []
+    for item in items:
+        if isinstance(item, dict):
+            item = item.get("prompt")
+        if not isinstance(item, str) or not item.strip():
+            raise ValueError("비어 있거나 문자열이 아닌 프롬프트가 있습니다.")
+        prompts.append(item.strip())
+    if len(prompts) != expected_count:
+        raise ValueError(
+            f"프롬프트 {len(prompts)}개를 받았지만 {expected_count}개가 필요합니다."
+        )
+    return prompts
+
+
+def create_image_prompts_batch(
+    pages, model="gpt-4-turbo-preview", api_key="", use_cache=True
+):
+    """모든 페이지의 이미지 프롬프트를 한 번의 요청으로 생성
+
+    페이지 순서대로 프롬프트 리스트를 반환하며, 응답 형식이 잘못되면
+    ValueError를 발생시킵니다.
+    """
+    page_blocks = "\n\n".join(
+        f"[페이지 {i+1}]\n페이지 제목: {page['title']}\n페이지 내용:\n{page['content'][:1500]}"
+        for i, page in enumerate(pages)
+    )
+    prompt = f"""
+    아래 블로그 페이지 {len(pages)}개의 내용을 각각 분석하여,
+    각 페이지를 초고화질 실사 사진처럼 표현할 수 있는 세부적이고 자세한 이미지 생성 프롬프트를 만들어 주세요.
+    
+    각 프롬프트는 다음과 같은 요소를 포함해야 합니다:
+    1. 주요 피사체의 명확한 설명 (인물, 제품, 환경 등)
+    2. 조명 조건 (자연광, 부드러운 조명, 극적인 조명 등)
+    3. 촬영 각도 및 구도 (클로즈업, 전체 샷, 원근감 등)
+    4. 색감 및 분위기 (밝고 활기찬, 차분하고 따뜻한 등)
+    5. 고급 사진 효과 (얕은 심도, 선명한 디테일, 부드러운 배경 등)
+    
+    응답은 페이지 순서대로 프롬프트 문자열 {len(pages)}개가 담긴 JSON 배열만 제공하세요.
+    예: ["첫 번째 페이지 프롬프트", "두 번째 페이지 프롬프트"]
+    설명이나 주석은 필요 없습니다.
+    
+    {page_blocks}
+    """
+    messages = [
+        {
+            "role": "system",
+            "content": "당신은 안전하고 정교하며 사실적인 이미지 생성 프롬프트를 작성하는 전문가입니다.",
+        },
+        {"role": "user", "content": prompt},
+    ]
+    # 형식이 잘못된 응답은 캐시에 남기지 않음 (다음 실행에서 다시 요청)
+    text = openai_utils.chat_completion(
+        api_key,
+        model,
+        messages,
+        use_cache,
+        validate=lambda reply: _parse_prompt_list(reply, len(pages)),
+    )
+    return _parse_prompt_list(text, len(pages))
+
+
+def fallback_image_prompt(page):
+    """프롬프트 생성에 실패했을 때 쓰는 기본 프롬프트"""
+    return f"{page['title']}를 표현한 실사 이미지"
+
+
+def create_image(page, image_style=DEFAULT_IMAGE_STYLE, api_key=""):
+    """페이지에 대한 이미지 생성
+
+    {"prompt", "url", "errors"}를 반환하며, 실패하면 url이 None이고
+    errors에 발생한 오류 메시지가 순서대로 담깁니다.
+    """
+    if not page or not page.get("image_prompt"):
+        return {"url": None, "prompt": "프롬프트 생성 실패", "errors": []}
+
+    # 기본 스타일 설정
+    style_prompt = IMAGE_STYLE_PROMPTS.get(
+        image_style, IMAGE_STYLE_PROMPTS[DEFAULT_IMAGE_STYLE]
+    )
+    client = openai_utils.get_client(api_key)
+    prompt_text = page["image_prompt"]
+    errors = []
+
+    try:
+        response = _generate_image(client, api_key, prompt_text + style_prompt)
+        return {"prompt": prompt_text, "url": response.data[0].url, "errors": errors}
+    except Exception as e:
+        error_msg = str(e)
+        errors.append(error_msg)
+
+    # 만약 프롬프트 길이 문제라면
+    if "maximum context length" in error_msg.lower() or "too long" in error_msg.lower():
+        truncated_prompt = prompt_text[:500]  # 프롬프트 길이 제한
+        try:
+            response = _generate_image(client, api_key, truncated_prompt + style_prompt)
+            return {
+                "prompt": truncated_prompt,
+                "url": response.data[0].url,
+                "errors": errors,
+            }
+        except Exception as retry_error:
+            errors.append(str(retry_error))
+
+    return {"prompt": prompt_text, "url": None, "errors": errors}
+
+
+def store_page_image(page):
+    """생성된 이미지를 로컬 저장소에 한 번 내려받아 page["image_id"]에 기록
+
+    실패하면 image_id를 None으로 두고(화면은 원격 URL로 대신 표시)
+    오류 메시지 리스트를 반환합니다.
+    """
+    page["image_id"] = None
+    if not page.get("image_url"):
+        return []
+    try:
+        page["image_id"] = image_store.get_image_store().save_url(page["image_url"])
+    except Exception as e:
+        return [f"이미지 저장 오류: {e}"]
+    return []
+
+
+def dirty_fields(changed):
+    """changed 산출물이 바뀌었을 때 다시 만들어야 할 산출물을 의존 순서대로 반환"""
+    order = []
+    pending = [changed]
+    while pending:
+        field = pending.pop(0)
+        if field not in order:
+            order.append(field)
+            pending.extend(PIPELINE_DEPENDENTS[field])
+    return order
+
+
+def regenerate_page(
+    page,
+    field,
+    model="gpt-4-turbo-preview",
+    image_style=DEFAULT_IMAGE_STYLE,
+    api_key="",
+):
+    """페이지 산출물 field와 그에 의존하는 산출물만 다시 생성
+
+    스크립트와 다른 페이지는 건드리지 않으며, 같은 입력이라도 새 결과를 받도록
+    캐시는 읽지 않습니다. 실패한 단계는 기존 값을 유지하고 이후 단계는 건너뜁니다.
+    오류 메시지 리스트를 반환합니다.
+    """
+    if field not in ("image_prompt", "image_url"):
+        raise ValueError(f"페이지 단위로 다시 만들 수 없는 단계입니다: {field}")
+
+    for name in dirty_fields(field):
+        if name == "image_prompt":
+            try:
+                page["image_prompt"] = create_image_prompt(
+                    page, model, api_key, use_cache=False
+                )
+            except Exception as e:
+                return [f"이미지 프롬프트 생성 오류: {e}"]
+        elif name == "image_url":
+            result = create_image(page, image_style, api_key)
+            if not result["url"]:
+                return [f"이미지 생성 오류: {e}" for e in result["errors"]]
+            page["image_url"] = result["url"]
+            page["image_style"] = image_style
+            return store_page_image(page)
+    return []
+
+
+class PagePipeline:
+    """페이지를 넣는 즉시 이미지 프롬프트 → 이미지 생성을 시작하는 작업 풀
+
+    submit(key, page)로 넣은 페이지는 스레드 풀에서 처리되고, 단계가 끝날 때마다
+    (이벤트 종류, key, 오류 메시지 리스트)가 이벤트 큐에 쌓입니다.
+    """
+
+    def __init__(
+        self,
+        model="gpt-4-turbo-preview",
+        image_style=DEFAULT_IMAGE_STYLE,
+        api_key="",
+        max_workers=PAGE_WORKERS,
+        use_cache=True,
+    ):
+        self.model = model
+        self.image_style = image_style
+        self.api_key = api_key
+        self.use_cache = use_cache
+        self._events = queue.Queue()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_workers))
+        self._futures = []
+
+    def submit(self, key, page, with_prompt=True):
+        """페이지 작업 시작 (with_prompt=False면 이미 채워진 image_prompt 사용)"""
+        self._futures.append(self._pool.submit(self._work, key, page, with_prompt))
+
+    def _work(self, key, page, with_prompt):
+        if with_prompt:
+            errors = []
+            try:
+                page["image_prompt"] = create_image_prompt(
+                    page, self.model, self.api_key, self.use_cache
+                )
+            except Exception as e:
+                errors.append(f"이미지 프롬프트 생성 오류: {e}")
+                page["image_prompt"] = fallback_image_prompt(page)
+            self._events.put(("prompt", key, errors))
+
+        image_result = create_image(page, self.image_style, self.api_key)
+        page["image_url"] = image_result["url"]
+        errors = [f"이미지 생성 오류: {e}" for e in image_result["errors"]]
+        errors += store_page_image(page)
+        self._events.put(("image", key, errors))
+
+    def poll(self):
+        """지금까지 도착한 이벤트를 기다리지 않고 모두 반환"""
+        events = []
+        while True:
+            try:
+                events.append(self._events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def next_event(self, timeout=0.5, should_stop=None):
+        """다음 이벤트를 기다려 반환 (작업 스레드가 예외로 죽었으면 다시 발생)
+
+        기다리는 동안 should_stop()이 참이 되면 None을 반환합니다.
+        """
+        while True:
+            try:
+                return self._events.get(timeout=timeout)
+            except queue.Empty:
+                if should_stop and should_stop():
+                    return None
+                for future in self._futures:
+                    if future.done() and future.exception():
+                        raise future.exception()
+
+    def close(self, wait=True):
+        """작업 풀 종료 (wait=False면 시작 전 작업은 취소하고 바로 반환)"""
+        self._pool.shutdown(wait=wait, cancel_futures=not wait)
+
+
+def generate_page_assets(
+    pages,
+    model="gpt-4-turbo-preview",
+    image_style=DEFAULT_IMAGE_STYLE,
+    api_key="",
+    max_workers=PAGE_WORKERS,
+    use_cache=True,
+    batch_prompts=False,
+    on_warning=None,
+):
+    """여러 페이지의 이미지 프롬프트와 이미지를 동시에 생성하는 제너레이터
+
+    페이지마다 프롬프트 → 이미지 순서로 처리하되 여러 페이지를 함께 진행하므로,
+    한 페이지의 이미지를 만드는 동안 다음 페이지의 프롬프트가 생성됩니다.
+    batch_prompts=True면 모든 페이지의 프롬프트를 먼저 한 번에 요청하고,
+    응답이 잘못됐을 때만 on_warning(메시지)로 알리고 페이지별 요청으로 되돌아갑니다.
+    단계가 끝날 때마다 (이벤트 종류, 페이지 인덱스, 오류 메시지 리스트)를
+    완료된 순서대로 yield 하며, 이벤트 종류는 "prompt" 또는 "image"입니다.
+    결과는 pages의 각 페이지 dict에 image_prompt, image_url, image_id로 채워집니다.
+    """
+    batched = False
+    if batch_prompts and pages:
+        try:
+            prompts = create_image_prompts_batch(pages, model, api_key, use_cache)
+            for page, prompt in zip(pages, prompts):
+                page["image_prompt"] = prompt
+            batched = True
+        except Exception as e:
+            # 일괄 응답이 잘못되면 페이지별 요청으로 대체
+            batched = False
+            if on_warning:
+                on_warning(
+                    f"이미지 프롬프트 일괄 생성 실패, 페이지별로 다시 요청합니다: {e}"
+                )
+
+    if batched:
+        for i in range(len(pages)):
+            yield "prompt", i, []
+
+    pipeline = PagePipeline(model, image_style, api_key, max_workers, use_cache)
+    try:
+        for i, page in enumerate(pages):
+            pipeline.submit(i, page, with_prompt=not batched)
+        remaining = len(pages) if batched else len(pages) * 2
+        while remaining:
+            yield pipeline.next_event()
+            remaining -= 1
+    finally:
+        # 중간에 멈춘 경우(취소 등) 남은 작업은 기다리지 않음
+        pipeline.close(wait=False)
@@ -0,0 +1,532 @@
+"""PDF → 블로그 스크립트/페이지 이미지 전체 파이프라인 (Streamlit 비의존)
+
+앱의 백그라운드 작업과 배치 실행기가 함께 사용합니다. 진행 상황은
+on_progress 콜백으로 알리고, 취소 요청은 단계 사이와 이벤트마다 확인합니다.
+"""
+
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import blog_generator
+import pdf_downloader
+import pdf_extractor
+import text_processing
+
+# 긴 문서 처리 방식
+LONG_DOC_HEAD = "head"  # 문서 앞부분만 사용
+LONG_DOC_SELECT = "select"  # 핵심 문단 선택
+LONG_DOC_SUMMARIZE = "summarize"  # 전체 요약
+
+# 파이프라인 단계
+STAGE_DOWNLOAD = "download"
+STAGE_EXTRACT = "extract"
+STAGE_PREPARE = "prepare"
+STAGE_SCRIPT = "script"
+STAGE_IMAGES = "images"
+
+STAGE_LABELS = {
+    STAGE_DOWNLOAD: "PDF 다운로드",
+    STAGE_EXTRACT: "텍스트 추출",
+    STAGE_PREPARE: "긴 문서 정리",
+    STAGE_SCRIPT: "스크립트 작성",
+    STAGE_IMAGES: "페이지 이미지 생성",
+}
+
+# 단계별로 전체 진행률에서 차지하는 구간 (시작, 끝)
+STAGE_PROGRESS = {
+    STAGE_DOWNLOAD: (0.0, 0.1),
+    STAGE_EXTRACT: (0.1, 0.2),
+    STAGE_PREPARE: (0.2, 0.3),
+    STAGE_SCRIPT: (0.3, 0.6),
+    STAGE_IMAGES: (0.6, 1.0),
+}
+
+# 문서별 생성 모드에서 프로세스 전체가 동시에 처리할 문서 수 (여러 작업이 함께 나눠 씀)
+MAX_PARALLEL_DOCUMENTS = 3
+
+# 문서별 생성 결과 상태
+DOCUMENT_PENDING = "pending"
+DOCUMENT_DONE = "done"
+DOCUMENT_FAILED = "failed"
+
+DEFAULT_OPTIONS = {
+    "model": "gpt-4-turbo",
+    "num_pages": 3,
+    "script_length": 300,  # 페이지당 스크립트 길이 (자)
+    "image_style": blog_generator.DEFAULT_IMAGE_STYLE,
+    "page_workers": blog_generator.PAGE_WORKERS,
+    "long_doc_mode": LONG_DOC_HEAD,
+    "summary_fan_out": blog_generator.REDUCE_FAN_OUT,
+    "stream_script": False,
+    "batch_prompts": True,
+    "use_cache": True,
+    "per_document": False,  # PDF마다 블로그를 따로 생성
+}
+
+_document_slots = threading.BoundedSemaphore(MAX_PARALLEL_DOCUMENTS)
+
+
+class PipelineError(Exception):
+    """파이프라인을 더 진행할 수 없을 때 (입력 PDF나 텍스트가 없음 등)"""
+
+
+class PipelineCancelled(Exception):
+    """취소 요청으로 파이프라인을 멈췄을 때"""
+
+
+class _Run:
+    """파이프라인 한 번 실행하는 동안의 설정, 진행 보고, 경고 모음"""
+
+    def __init__(self, api_key, options, on_progress, is_cancelled):
+        self.api_key = api_key
+        self.options = {**DEFAULT_OPTIONS, **(options or {})}
+        self.on_progress = on_progress
+        self.is_cancelled = is_cancelled
+        self.warnings = []
+        self.report = {}  # 결과 화면에 보여 줄 단계별 통계
+
+    def progress(self, stage, fraction, message, **details):
+        """단계 안 진행률(0~1)을 전체 진행률로 바꿔 알림"""
+        if self.on_progress:
+            start, end = STAGE_PROGRESS[stage]
+            fraction = min(max(fraction, 0.0), 1.0)
+            self.on_progress(
+                {
+                    "stage": stage,
+                    "progress": start + (end - start) * fraction,
+                    "message": message,
+                    **details,
+                }
+            )
+
+    def check_cancelled(self):
+        if self.is_cancelled and self.is_cancelled():
+            raise PipelineCancelled()
+
+
+def run_pipeline(
+    sources=(),
+    urls=(),
+    work_dir=None,
+    api_key="",
+    options=None,
+    on_progress=None,
+    is_cancelled=None,
+):
+    """업로드한 PDF와 PDF URL로 블로그 스크립트와 페이지 이미지를 생성
+
+    sources에는 PDF 파일 경로나 메모리 상의 업로드 파일을, urls에는 내려받을
+    PDF 주소를 넣습니다. work_dir는 URL 다운로드에 쓰이며 텍스트 추출이 끝나면 삭제됩니다.
+    진행 상황은 on_progress({"stage", "progress", "message", ...})로 알리고,
+    is_cancelled()가 참이 되면 다음 확인 지점에서 PipelineCancelled를 발생시킵니다.
+    결과는 {"raw_script", "pages", "warnings", "report", "options"} dict로 반환합니다.
+    options["per_document"]가 참이면 PDF마다 블로그를 따로 만들어
+    {"documents": [...], "warnings", "report"}를 반환합니다. 두 경우 모두 페이지 일부를
+    다시 생성할 때 쓰도록 적용한 설정을 "options"에 담습니다.
+    """
+    run = _Run(api_key, options, on_progress, is_cancelled)
+    per_document = run.options["per_document"]
+    sources = list(sources)
+
+    try:
+        # urls는 파일을 한 줄씩 읽는 이터레이터일 수 있으므로 작업 스레드에서 한 번만 읽음
+        urls = list(urls)
+        if urls:
+            sources += _download_urls(run, urls, work_dir)
+        if not sources:
+            raise PipelineError(" ".join(["처리할 PDF가 없습니다."] + run.warnings))
+        run.check_cancelled()
+        extracted = _extract_text(run, sources, per_document)
+    finally:
+        if work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    if per_document:
+        if not extracted:
+            raise PipelineError(
+                " ".join(["텍스트를 추출한 PDF가 없습니다."] + run.warnings)
+            )
+        documents = _generate_each(run, extracted)
+        return {
+            "documents": documents,
+            "warnings": run.warnings,
+            "report": run.report,
+            "options": run.options,
+        }
+
+    result = _generate_blog(run, extracted)
+    return {
+        **result,
+        "warnings": run.warnings,
+        "report": run.report,
+        "options": run.options,
+    }
+
+
+def _generate_blog(run, text):
+    """텍스트 하나로 블로그 생성 (긴 문서 정리 → 스크립트 → 페이지 이미지)"""
+    if not text.strip():
+        raise PipelineError("PDF에서 추출한 텍스트가 없습니다.")
+    run.check_cancelled()
+    text = _prepare_text(run, text)
+    run.check_cancelled()
+
+    if run.options["stream_script"]:
+        raw_script, pages = _stream_script_and_images(run, text)
+    else:
+        raw_script, pages = _script_then_images(run, text)
+    return {"raw_script": raw_script, "pages": pages}
+
+
+def _generate_each(run, documents):
+    """문서마다 블로그를 따로 생성 (동시 처리 문서 수는 프로세스 전체 기준으로 제한)
+
+    문서 하나가 끝날 때마다 on_progress의 "documents"로 지금까지의 결과를 알리므로
+    화면에서 끝난 문서부터 보여 줄 수 있습니다.
+    """
+    results = [{"name": name, "status": DOCUMENT_PENDING} for name, _ in documents]
+    doc_progress = [0.0] * len(documents)
+    lock = threading.Lock()
+    start, _ = STAGE_PROGRESS[STAGE_PREPARE]
+
+    def report(i, update=None):
+        with lock:
+            if update:
+                # 문서별 진행률(정리~이미지 구간)을 0~1로 바꿔 평균
+                doc_progress[i] = (update["progress"] - start) / (1 - start)
+            finished = sum(1 for r in results if r["status"] != DOCUMENT_PENDING)
+            message = f"문서 {finished}/{len(documents)}개 완료"
+            if update:
+                message += f" · {results[i]['name']}: {update['message']}"
+            payload = {
+                "stage": update["stage"] if update else STAGE_IMAGES,
+                "progress": start + (1 - start) * sum(doc_progress) / len(documents),
+                "message": message,
+            }
+            if update is None:
+                payload["documents"] = [dict(r) for r in results]
+        if run.on_progress:
+            run.on_progress(payload)
+
+    def work(i, text):
+        with _document_slots:
+            run.check_cancelled()
+            child = _Run(
+                run.api_key,
+                run.options,
+                lambda update: report(i, update),
+                run.is_cancelled,
+            )
+            try:
+                entry = {"status": DOCUMENT_DONE, **_generate_blog(child, text)}
+            except PipelineCancelled:
+                raise
+            except Exception as e:
+                entry = {"status": DOCUMENT_FAILED, "error": f"{type(e).__name__}: {e}"}
+            entry.update(warnings=child.warnings, report=child.report)
+        with lock:
+            results[i].update(entry)
+            doc_progress[i] = 1.0
+        report(i)
+
+    pool = ThreadPoolExecutor(max_workers=min(len(documents), MAX_PARALLEL_DOCUMENTS))
+    try:
+        futures = [pool.submit(work, i, text) for i, (_, text) in enumerate(documents)]
+        for future in as_completed(futures):
+            future.result()
+    finally:
+        # 취소 등으로 중간에 멈추면 시작 전 문서는 버리고 기다리지 않음
+        pool.shutdown(wait=False, cancel_futures=True)
+    return results
+
+
+def _download_urls(run, urls, work_dir):
+    """URL 목록을 동시에 내려받고 성공한 파일 경로 리스트 반환"""
+    errors = {}
+
+    def show_progress(statuses):
+        finished = 0
+        for status in statuses:
+            if status["status"] == pdf_downloader.STATUS_FAILED:
+                errors[status["url"]] = status["error"]
+            if status["status"] in (
+                pdf_downloader.STATUS_DONE,
+                pdf_downloader.STATUS_FAILED,
+            ):
+                finished += 1
+        run.progress(
+            STAGE_DOWNLOAD,
+            finished / len(statuses),
+            f"PDF 다운로드 중... ({finished}/{len(statuses)})",
+            # URL별 상태와 소요 시간 (작업 스레드가 계속 고치므로 복사본 전달)
+            downloads=[dict(status) for status in statuses],
+        )
+
+    paths = pdf_downloader.download_many(urls, work_dir, on_progress=show_progress)
+    for url, path in zip(urls, paths):
+        if path is None:
+            run.warnings.append(
+                f"❗ URL 다운로드 실패: {url} | 오류: {errors.get(url)}"
+            )
+    run.report["downloads"] = {
+        "requested": len(urls),
+        "failed": sum(1 for path in paths if path is None),
+    }
+    return [path for path in paths if path]
+
+
+def _extract_text(run, sources, per_document=False):
+    """PDF들을 파일명 순서로 추출하고 반복 머리말/꼬리말을 정리
+
+    per_document면 [(파일명, 텍스트)] 문서별 리스트를, 아니면 이어 붙인 텍스트를 반환합니다.
+    """
+    sources = sorted(sources, key=pdf_extractor.source_name)
+    run.progress(STAGE_EXTRACT, 0, f"PDF {len(sources)}개에서 텍스트 추출 중...")
+
+    def on_error(source, error):
+        run.warnings.append(
+            f"⚠️ PDF 처리 실패: {pdf_extractor.source_name(source)} | 오류: {error}"
+        )
+
+    cleaning = []  # 파일별 머리말/꼬리말 정리 통계
+    documents = []
+    if run.options["long_doc_mode"] == LONG_DOC_HEAD:
+        # 스크립트에 쓰일 만큼만 추출 (문서별 생성이면 문서마다 예산 적용)
+        groups = [[source] for source in sources] if per_document else [sources]
+        run.report["pages_extracted"] = run.report["pages_skipped"] = 0
+        for group in groups:
+            text, stats = pdf_extractor.extract_text_within_budget(
+                group,
+                blog_generator.MAX_SCRIPT_TEXT_LENGTH,
+                on_error=on_error,
+                make_filter=text_processing.BoilerplateFilter,
+            )
+            run.report["pages_extracted"] += stats["pages_extracted"]
+            run.report["pages_skipped"] += stats["pages_skipped"]
+            for i, result in stats["cleaning"].items():
+                cleaning.append({"file": pdf_extractor.source_name(group[i]), **result})
+            if stats["cleaning"]:
+                documents.append((pdf_extractor.source_name(group[0]), text))
+    else:
+        for source, (pages, error) in zip(
+            sources, pdf_extractor.extract_pdfs_parallel(sources)
+        ):
+            if error is not None:
+                on_error(source, error)
+                continue
+            pages, result = text_processing.clean_document_pages(pages)
+            cleaning.append({"file": pdf_extractor.source_name(source), **result})
+            documents.append((pdf_extractor.source_name(source), "\n".join(pages)))
+
+    run.report["cleaning"] = cleaning
+    total_chars = sum(len(text) for _, text in documents)
+    run.progress(STAGE_EXTRACT, 1, f"텍스트 {total_chars:,}자 추출 완료")
+    if per_document:
+        return documents
+    if run.options["long_doc_mode"] == LONG_DOC_HEAD:
+        return documents[0][1] if documents else ""
+    return "".join("\n" + text for _, text in documents)
+
+
+def _prepare_text(run, text):
+    """긴 문서를 핵심 문단 선택 또는 요약으로 스크립트 입력 길이에 맞춤"""
+    max_chars = blog_generator.MAX_SCRIPT_TEXT_LENGTH
+    mode = run.options["long_doc_mode"]
+    prepared = text
+
+    if mode == LONG_DOC_SELECT:
+        run.progress(STAGE_PREPARE, 0, "핵심 문단 선택 중...")
+        prepared = text_processing.select_passages(text, max_chars)
+    elif mode == LONG_DOC_SUMMARIZE:
+        try:
+            prepared = blog_generator.summarize_document(
+                text,
+                max_chars,
+                model=run.options["model"],
+                api_key=run.api_key,
+                use_cache=run.options["use_cache"],
+                fan_out=run.options["summary_fan_out"],
+                on_progress=lambda stage, done, total: run.progress(
+                    STAGE_PREPARE,
+                    done / total,
+                    f"긴 문서 {stage} 중... ({done}/{total})",
+                ),
+            )
+        except PipelineCancelled:
+            raise
+        except Exception as e:
+            # 요약에 실패하면 기존처럼 앞부분만 사용
+            run.warnings.append(f"문서 요약 오류: {e}")
+
+    run.report["input"] = {
+        "mode": mode,
+        "original_chars": len(text),
+        "input_chars": len(prepared),
+    }
+    return prepared
+
+
+def _script_then_images(run, text):
+    """스크립트를 한 번에 받은 뒤 페이지별 이미지 프롬프트/이미지 생성"""
+    options = run.options
+    num_pages = options["num_pages"]
+
+    run.progress(STAGE_SCRIPT, 0, "블로그 스크립트 생성 중...")
+    raw_script = blog_generator.create_video_script(
+        text,
+        num_pages,
+        options["script_length"] * num_pages,
+        options["model"],
+        run.api_key,
+        options["use_cache"],
+    )
+    run.progress(STAGE_SCRIPT, 1, "스크립트 작성 완료", script=raw_script)
+    run.check_cancelled()
+
+    # 스크립트를 페이지별로 파싱 (예상 페이지 수 전달)
+    pages = blog_generator.parse_script_pages(
+        raw_script, num_pages, on_warning=run.warnings.append
+    )
+
+    total_steps = len(pages) * 2  # 페이지마다 프롬프트, 이미지 두 단계
+    done_steps = 0
+    images_done = 0
+    for event, i, errors in blog_generator.generate_page_assets(
+        pages,
+        options["model"],
+        options["image_style"],
+        run.api_key,
+        options["page_workers"],
+        use_cache=options["use_cache"],
+        batch_prompts=options["batch_prompts"],
+        on_warning=run.warnings.append,
+    ):
+        run.warnings.extend(errors)
+        done_steps += 1
+        if event == "image":
+            images_done += 1
+        run.progress(
+            STAGE_IMAGES,
+            done_steps / total_steps,
+            f"페이지 {i+1} {'프롬프트' if event == 'prompt' else '이미지'} 완료 "
+            f"(이미지 {images_done}/{len(pages)})",
+        )
+        run.check_cancelled()
+
+    return raw_script, pages
+
+
+def _same_page(a, b):
+    """제목이 같고 내용이 공백 차이 말고는 같은 페이지인지 여부"""
+    return a["title"].strip() == b["title"].strip() and " ".join(
+        a["content"].split()
+    ) == " ".join(b["content"].split())
+
+
+def _stream_script_and_images(run, text):
+    """스크립트를 스트리밍으로 받으면서 완성된 페이지부터 이미지 생성을 시작"""
+    options = run.options
+    num_pages = options["num_pages"]
+    total_script_length = options["script_length"] * num_pages
+
+    pipeline = blog_generator.PagePipeline(
+        options["model"],
+        options["image_style"],
+        run.api_key,
+        options["page_workers"],
+        options["use_cache"],
+    )
+    parser = blog_generator.IncrementalPageParser()
+    early_pages = []  # 스트리밍 중 먼저 작업을 시작한 페이지
+    extra_pages = 0  # 요청보다 많이 써서 버린 페이지 수
+    seen_events = []
+
+    def start_pages(pages):
+        nonlocal extra_pages
+        for page in pages:
+            if len(early_pages) >= num_pages:
+                # 요청보다 많이 쓴 페이지는 최종 결과에서 빠지므로 시작하지 않음
+                extra_pages += 1
+                continue
+            pipeline.submit(("early", len(early_pages)), page)
+            early_pages.append(page)
+
+    def collect(events):
+        for event, key, errors in events:
+            run.warnings.extend(errors)
+            seen_events.append((event, key))
+
+    try:
+        run.progress(STAGE_SCRIPT, 0, "블로그 스크립트 생성 중...")
+        for chunk in blog_generator.stream_video_script(
+            text,
+            num_pages,
+            total_script_length,
+            options["model"],
+            run.api_key,
+            options["use_cache"],
+        ):
+            start_pages(parser.feed(chunk))
+            collect(pipeline.poll())
+            images_done = sum(1 for event, _ in seen_events if event == "image")
+            run.progress(
+                STAGE_SCRIPT,
+                len(parser.text) / total_script_length * 0.95,
+                f"스크립트 작성 중... (페이지 {len(early_pages)}개 작업 시작, "
+                f"이미지 {images_done}개 완료)",
+                script=parser.text,
+            )
+            run.check_cancelled()
+        start_pages(parser.finish())
+        raw_script = parser.text.strip()
+        run.progress(STAGE_SCRIPT, 1, "스크립트 작성 완료", script=raw_script)
+
+        if len(early_pages) == num_pages:
+            # 형식대로 쓴 스크립트면 스트리밍 중 나눈 페이지가 곧 최종 결과
+            if extra_pages:
+                run.warnings.append(
+                    f"페이지 파싱 문제: {num_pages + extra_pages}개 페이지가 추출되었지만, "
+                    f"{num_pages}개가 필요합니다. 앞의 {num_pages}개만 사용합니다."
+                )
+            pages = list(early_pages)
+            keys = [("early", i) for i in range(num_pages)]
+        else:
+            # 형식이 달라 보정이 필요하면 다시 파싱하고, 같은 순서·제목에 내용도
+            # 같은 페이지는 먼저 시작한 결과를 재사용
+            pages = blog_generator.parse_script_pages(
+                raw_script, num_pages, on_warning=run.warnings.append
+            )
+            keys = []
+            for i, page in enumerate(pages):
+                early = early_pages[i] if i < len(early_pages) else None
+                if early and _same_page(early, page):
+                    pages[i] = early
+                    keys.append(("early", i))
+                else:
+                    pipeline.submit(("final", i), page)
+                    keys.append(("final", i))
+
+        # 최종 페이지에 해당하는 이벤트만 진행률에 반영
+        wanted = set(keys)
+        total_steps = len(pages) * 2
+        done = {(event, key) for event, key in seen_events if key in wanted}
+        while len(done) < total_steps:
+            images_done = sum(1 for event, _ in done if event == "image")
+            run.progress(
+                STAGE_IMAGES,
+                len(done) / total_steps,
+                f"페이지 이미지 생성 중... ({images_done}/{len(pages)})",
+            )
+            item = pipeline.next_event(should_stop=run.is_cancelled)
+            run.check_cancelled()
+            event, key, errors = item
+            if key not in wanted:
+                continue
+            run.warnings.extend(errors)
+            done.add((event, key))
+    finally:
+        # 최종 스크립트와 달라 버려진 작업이나 취소된 작업은 기다리지 않음
+        pipeline.close(wait=False)
+
+    return raw_script, pages
@@ -1,20 +1,43 @@
 import streamlit as st
-from langchain_community.document_loaders import PyPDFLoader
-from openai import OpenAI
 import os
 import json
-import time
-import re
 import pandas as pd
 import tempfile
+import time
 import uuid
-import requests
+import functools
 import shutil  # 폴더 삭제에 필요
+import blog_generator
+import blog_pipeline
+import export_bundle
+import image_store
+import job_queue
+import openai_utils
+import pdf_backends
+import pdf_downloader
+import pdf_extractor
+import url_ingest
 
 
 # API 키 기본값은 빈 문자열
 DEFAULT_OPENAI_API_KEY = ""
 
+# 긴 문서 처리 방식 표시 이름
+LONG_DOC_LABELS = {
+    blog_pipeline.LONG_DOC_HEAD: "앞부분만 사용",
+    blog_pipeline.LONG_DOC_SELECT: "핵심 문단 선택",
+    blog_pipeline.LONG_DOC_SUMMARIZE: "전체 요약",
+}
+
+# 이 크기 이하의 업로드 PDF는 임시 파일 없이 메모리에서 바로 추출
+IN_MEMORY_UPLOAD_MAX_BYTES = 20 * 1024 * 1024
+
+# 백그라운드 작업 진행 상황을 다시 그리는 간격 (초)
+JOB_POLL_SECONDS = 1.0
+
+# 디버그 모드: 환경 변수 BLOGCLIP_DEBUG=1 또는 URL에 ?debug=1 (렌더링 시간 표시)
+DEBUG_ENV = os.environ.get("BLOGCLIP_DEBUG") == "1"
+
 st.set_page_config(page_title="BlogClip", page_icon="🎬", layout="wide")
 
 ## 사용자 별로 user_id 부여
@@ -27,19 +50,9 @@ user_temp_dir = os.path.join(tempfile.gettempdir(), f"streamlit_{user_id}")
 os.makedirs(user_temp_dir, exist_ok=True)
 
 
-# url을 받아 임시폴더에 pdf를 다운로드하는 함수
-def download_pdf_from_url(url, save_dir):
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        filename = os.path.basename(url.split("?")[0])  # 쿼리스트링 제거
-        save_path = os.path.join(save_dir, filename)
-        with open(save_path, "wb") as f:
-            f.write(response.content)
-        return save_path
-    except Exception as e:
-        st.warning(f"❗ URL 다운로드 실패: {url} | 오류: {e}")
-        return None
+def debug_enabled():
+    """렌더링 시간 등 디버그 정보를 표시할지 여부"""
+    return DEBUG_ENV or st.query_params.get("debug") == "1"
 
 
 def save_uploaded_file(uploaded_file, save_dir):
@@ -50,315 +63,472 @@ def save_uploaded_file(uploaded_file, save_dir):
     return file_path
 
 
-def extract_all_pdfs_from_folder(folder_path):
-    """폴더 내 모든 PDF 파일 텍스트 추출 후 폴더 삭제"""
-    text = ""
-    for file in sorted(os.listdir(folder_path)):
-        if file.lower().endswith(".pdf"):
-            file_path = os.path.join(folder_path, file)
-            try:
-                loader = PyPDFLoader(file_path)
-                pages = loader.load()
-                content = "\n".join([p.page_content for p in pages])
-                text += "\n" + content
-            except Exception as e:
-                st.warning(f"⚠️ PDF 처리 실패: {file} | 오류: {e}")
-
-    #  추출 끝난 후 폴더 통째로 삭제
-    try:
-        shutil.rmtree(folder_path)
-        st.info(f"🧹 임시 폴더 삭제 완료: `{folder_path}`")  # 디버깅용
-    except Exception as e:
-        st.warning(f"❗ 임시 폴더 삭제 실패: {e}")
-    return text
-
-
 # csv 파일에서 URL을 추출하고 미리보기 출력
 def handle_csv_and_preview_urls(csv_file, max_preview=2):
-    """CSV 파일에서 URL을 추출하고 미리보기 출력"""
-    try:
-        df = pd.read_csv(csv_file, header=None)
-        urls = df[0].dropna().tolist()
-        urls = list(set(urls))  # 중복 제거
-
-        if len(urls) > max_preview:
-            preview_urls = urls[:max_preview]
-            st.success(f"✅ 총 {len(urls)}개의 URL을 불러왔습니다.")
-            st.write(preview_urls)
-            st.info(f"🔍 (그 외 {len(urls) - max_preview}개 URL은 생략됨)")
-        else:
-            st.success(f"✅ 총 {len(urls)}개의 URL을 불러왔습니다.")
-            st.write(urls)
+    """CSV 파일의 URL을 정리해 사용자 임시 폴더에 저장하고 집계와 미리보기 출력
 
-        return urls  # URL 리스트 반환
+    URL 목록은 파일로만 저장하고 세션에는 집계와 앞부분 미리보기만 보관하며,
+    같은 업로드 파일은 다시 그릴 때마다 새로 읽지 않습니다.
+    """
+    ingest = st.session_state.get("csv_ingest")
+    if ingest is None or ingest["file_id"] != csv_file.file_id:
+        path = os.path.join(user_temp_dir, "csv_urls.txt")
+        try:
+            ingest = url_ingest.ingest_csv(csv_file, path, max_preview)
+        except Exception as e:
+            st.session_state.pop("csv_ingest", None)
+            st.error(f"CSV 파일을 읽는 도중 오류가 발생했습니다: {e}")
+            return
+        ingest.update(file_id=csv_file.file_id, path=path)
+        st.session_state["csv_ingest"] = ingest
+
+    counts = ingest["counts"]
+    st.success(f"✅ 총 {counts['urls']}개의 URL을 불러왔습니다.")
+    st.write(ingest["preview"])
+    if counts["urls"] > len(ingest["preview"]):
+        st.info(f"🔍 (그 외 {counts['urls'] - len(ingest['preview'])}개 URL은 생략됨)")
+    if counts["duplicates"] or counts["invalid"] or counts["not_pdf"]:
+        st.caption(
+            f"중복 {counts['duplicates']}개 · 잘못된 값 {counts['invalid']}개 · "
+            f"PDF가 아닌 링크 {counts['not_pdf']}개는 제외했습니다."
+        )
 
-    except Exception as e:
-        st.error(f"CSV 파일을 읽는 도중 오류가 발생했습니다: {e}")
-        return []  # 실패 시 빈 리스트 반환
 
+def csv_urls(work_dir):
+    """불러온 CSV의 URL을 한 줄씩 읽는 이터레이터 (작업 스레드에서 필요할 때 읽음)
 
-def generate_video_script(
-    text, num_pages=3, total_script_length=1000, model="gpt-4-turbo-preview"
-):
-    """GPT를 활용하여 블로그 제작을 위한 스크립트 생성"""
-    if not text:
-        return "스크립트를 생성할 내용이 없습니다."
-
-    # 텍스트 길이 제한 (토큰 제한 고려)
-    max_text_length = 3000  # 안전한 값으로 설정
-    limited_text = text[:max_text_length]
-
-    # 페이지당 스크립트 길이 계산
-    per_page_length = total_script_length // num_pages
-
-    prompt = f"""
-    다음 문서의 내용을 바탕으로 블로그를 제작하기 위한 스크립트를 작성해 주세요.
-    
-    총 {num_pages}개의 페이지를 생성하고, 각 페이지마다 아래 형식을 따라주세요:
-    
-    # 페이지 제목: [제목]
-    
-    ## 페이지 스크립트:
-    [상세 설명 스크립트]
-    
-    각 페이지는 서로 다른 주제나 측면을 다루되 전체적으로 논리적인 흐름을 가지도록 해주세요.
-    각 페이지의 내용은 약 {per_page_length}자 내외로 작성하여 전체 스크립트가 약 {total_script_length}자가 되도록 해주세요.
-    각 페이지별로 고객 대상으로 친절한 어투로 자세한 설명을 제공해 주세요.
-    
-    반드시 {num_pages}개의 페이지를 생성해 주세요.
-    
-    문서 내용:
-    {limited_text}
+    작업이 시작되기 전에 다른 CSV를 올려도 바뀌지 않도록 URL 파일을 작업 폴더에 복사해 둡니다.
     """
+    ingest = st.session_state.get("csv_ingest")
+    if ingest is None:
+        return ()
+    path = os.path.join(work_dir, "csv_urls.txt")
+    shutil.copyfile(ingest["path"], path)
+    return url_ingest.read_url_file(path)
+
+
+def run_blog_job(job, sources, urls, work_dir, api_key, options):
+    """백그라운드 작업: 블로그 생성 파이프라인 실행 (작업 스레드에서 실행되므로 st 호출 금지)"""
+    # 세션이 키를 바꾸거나 떠나도 작업이 끝날 때까지 클라이언트를 닫지 않음
+    with openai_utils.hold_client(api_key):
+        return blog_pipeline.run_pipeline(
+            sources,
+            urls,
+            work_dir,
+            api_key,
+            options,
+            on_progress=lambda update: job.update(**update),
+            is_cancelled=job.is_cancelled,
+        )
+
+
+def start_blog_job(uploaded_files, options):
+    """업로드 파일과 CSV URL로 백그라운드 작업을 시작하고 작업 ID 반환 (실패 시 None)"""
+    work_dir = os.path.join(user_temp_dir, uuid.uuid4().hex)
+    os.makedirs(work_dir, exist_ok=True)
+    urls = csv_urls(work_dir)
+
+    # 작은 업로드 파일은 메모리에서 바로 추출, 큰 파일만 임시 폴더에 저장
+    sources = []
+    for uploaded_file in uploaded_files:
+        if uploaded_file.size <= IN_MEMORY_UPLOAD_MAX_BYTES:
+            sources.append(uploaded_file)
+        else:
+            sources.append(save_uploaded_file(uploaded_file, work_dir))
+
     try:
-        # API 키 가져오기
-        api_key = st.session_state.get("openai_api_key", DEFAULT_OPENAI_API_KEY)
-        client = OpenAI(api_key=api_key)
-
-        with st.spinner("블로그 스크립트 생성 중..."):
-            response = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": "당신은 블로그 제작 전문가입니다."},
-                    {"role": "user", "content": prompt},
-                ],
-            )
-        return response.choices[0].message.content.strip()
-    except Exception as e:
-        st.error(f"스크립트 생성 오류: {e}")
-        return "블로그 스크립트 생성 실패"
-
-
-def parse_script_pages(script, expected_page_count=3):
-    """스크립트에서 페이지 제목과 내용을 추출하여 구조화"""
-    # 정규식 패턴: '# 페이지 제목: ' 또는 '# ' 등으로 시작하는 제목 찾기
-    title_patterns = [
-        r"# 페이지 제목:\s*(.+)",
-        r"#\s+페이지\s+\d+[:.]\s*(.+)",
-        r"# (.+)",
-    ]
-
-    # 내용 패턴: '## 페이지 스크립트:' 또는 '## ' 등으로 시작하는 내용 찾기
-    content_patterns = [
-        r"## 페이지 스크립트:\s*\n([\s\S]+?)(?=\n# |$)",
-        r"##\s+페이지\s+\d+[:.]\s*\n([\s\S]+?)(?=\n# |$)",
-        r"## (.+)\n([\s\S]+?)(?=\n# |$)",
-    ]
-
-    pages = []
-    titles = []
-
-    # 먼저 제목을 찾습니다
-    for pattern in title_patterns:
-        titles = re.findall(pattern, script)
-        if titles:
-            break
-
-    # 제목을 찾았다면 내용 추출
-    if titles:
-        # 스크립트를 페이지별로 분할
-        page_blocks = re.split(r"\n# |\n#페이지 \d+[:.] ", script)
-        if page_blocks[0].startswith("# ") or page_blocks[0].startswith("#페이지"):
-            page_blocks[0] = page_blocks[0][page_blocks[0].find("\n") + 1 :]
-
-        # 첫 번째 블록이 비어있거나 # 앞의 내용이라면 제거
-        if not page_blocks[0].strip() or not page_blocks[0].strip().startswith("#"):
-            page_blocks = page_blocks[1:]
-
-        # 각 페이지 블록에서 내용 추출
-        for i, block in enumerate(page_blocks):
-            if i < len(titles):
-                # 내용 찾기
-                content = ""
-                for pattern in content_patterns:
-                    match = re.search(pattern, "# Dummy\n" + block)
-                    if match:
-                        if len(match.groups()) == 1:
-                            content = match.group(1).strip()
-                        elif len(match.groups()) == 2:
-                            content = match.group(2).strip()
-                        break
-
-                # 내용을 찾지 못했다면 전체 블록을 내용으로 사용
-                if not content and block.strip():
-                    if "##" in block:
-                        content = block[block.find("##") + 2 :].strip()
-                    else:
-                        content = block.strip()
-
-                pages.append({"title": titles[i].strip(), "content": content})
-
-    # 페이지 찾기에 실패하거나 예상 페이지 수와 다를 경우 보정
-    if not pages or len(pages) != expected_page_count:
-        st.warning(
-            f"페이지 파싱 문제: {len(pages)}개 페이지가 추출되었지만, {expected_page_count}개가 필요합니다. 보정을 시도합니다."
+        return job_queue.get_job_manager().submit(
+            run_blog_job,
+            sources,
+            urls,
+            work_dir,
+            st.session_state.openai_api_key,
+            options,
+            # 시작 전에 취소되면 파이프라인이 지우지 못한 업로드 사본 삭제
+            on_skip=functools.partial(shutil.rmtree, work_dir, ignore_errors=True),
         )
+    except job_queue.JobQueueFullError as e:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        st.error(f"⏳ {e}")
+        return None
 
-        # 페이지가 없거나 너무 적은 경우: 전체 콘텐츠를 강제로 나눔
-        if len(pages) < expected_page_count:
-            # 기존 페이지 유지
-            existing_pages = pages.copy()
-            pages = []
-
-            # 실제 페이지 수가 0이면 전체 스크립트를 사용
-            if len(existing_pages) == 0:
-                # 스크립트를 대략적으로 나누기
-                parts = []
-                script_lines = script.split("\n")
-                chunk_size = len(script_lines) // expected_page_count
-
-                for i in range(expected_page_count):
-                    start = i * chunk_size
-                    end = (
-                        start + chunk_size
-                        if i < expected_page_count - 1
-                        else len(script_lines)
-                    )
-                    parts.append("\n".join(script_lines[start:end]))
 
-                # 나눈 부분으로 페이지 생성
-                for i, part in enumerate(parts):
-                    pages.append({"title": f"페이지 {i+1}", "content": part.strip()})
-            else:
-                # 기존 페이지 먼저 추가
-                pages = existing_pages
+def show_download_table(statuses):
+    """URL별 다운로드 상태와 소요 시간 표"""
+    st.dataframe(
+        pd.DataFrame(statuses).rename(
+            columns={
+                "url": "URL",
+                "status": "상태",
+                "seconds": "소요 시간(초)",
+                "error": "오류",
+            }
+        ),
+        use_container_width=True,
+        hide_index=True,
+    )
+
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def show_job_progress(job_id):
+    """실행 중인 작업 진행 상황 표시 (이 부분만 주기적으로 다시 그림)"""
+    status = job_queue.get_job_manager().get(job_id)
+    if status is None or status["status"] not in job_queue.ACTIVE_STATUSES:
+        st.rerun()  # 작업이 끝나면 전체 화면을 다시 그려 결과 표시
+
+    stage = blog_pipeline.STAGE_LABELS.get(status["stage"], "대기")
+    st.progress(status["progress"], text=f"{stage}: {status['message']}")
+    if status.get("downloads"):
+        with st.expander(
+            "🌐 URL별 다운로드 상황",
+            expanded=status["stage"] == blog_pipeline.STAGE_DOWNLOAD,
+        ):
+            show_download_table(status["downloads"])
+    if status.get("documents"):
+        # 문서별 생성: 끝난 문서부터 결과 표시
+        show_document_results(status["documents"], editable=False)
+    elif status.get("script"):
+        with st.expander("📝 작성 중인 스크립트", expanded=True):
+            st.markdown(status["script"])
+
+    if st.button("⏹️ 작업 취소", key=f"cancel_{job_id}"):
+        job_queue.get_job_manager().cancel(job_id)
+        st.info("취소를 요청했습니다. 진행 중인 단계가 끝나면 멈춥니다.")
+
+
+def show_job_report(result):
+    """작업 결과의 경고와 텍스트 정리 통계 표시"""
+    for warning in result["warnings"]:
+        st.warning(warning)
+
+    report = result["report"]
+    if report.get("pages_skipped"):
+        st.caption(
+            f"📄 {report['pages_extracted']}페이지 추출, "
+            f"예산 초과로 {report['pages_skipped']}페이지는 건너뜀"
+        )
 
-                # 추가 페이지 필요
-                remaining = expected_page_count - len(pages)
-                for i in range(remaining):
-                    pages.append(
+    ## 문서별 머리말/꼬리말 정리 결과
+    cleaning = report.get("cleaning", [])
+    if cleaning:
+        saved_chars = sum(item["chars_saved"] for item in cleaning)
+        saved_tokens = sum(item["tokens_saved"] for item in cleaning)
+        with st.expander(
+            f"🧽 반복 머리말/꼬리말 정리: {saved_chars:,}자 (약 {saved_tokens:,} 토큰) 절약"
+        ):
+            st.dataframe(
+                pd.DataFrame(
+                    [
                         {
-                            "title": f"추가 페이지 {i+1}",
-                            "content": f"이 콘텐츠는 {expected_page_count}개 페이지 요구사항을 충족하기 위해 자동 생성되었습니다.",
+                            "파일": item["file"],
+                            "원본 글자 수": item["chars_before"],
+                            "정리 후 글자 수": item["chars_after"],
+                            "절약한 글자 수": item["chars_saved"],
+                            "절약한 토큰(추정)": item["tokens_saved"],
                         }
-                    )
+                        for item in cleaning
+                    ]
+                ),
+                hide_index=True,
+            )
+
+    text_input = report.get("input")
+    if text_input and text_input["input_chars"] < text_input["original_chars"]:
+        if text_input["mode"] == blog_pipeline.LONG_DOC_SELECT:
+            st.caption(
+                f"📌 문서 {text_input['original_chars']:,}자에서 "
+                f"핵심 문단 {text_input['input_chars']:,}자를 골랐습니다."
+            )
+        elif text_input["mode"] == blog_pipeline.LONG_DOC_SUMMARIZE:
+            st.caption(
+                f"📚 문서 {text_input['original_chars']:,}자를 "
+                f"{text_input['input_chars']:,}자로 요약했습니다."
+            )
+
+
+def page_image_source(page, full_size=False):
+    """페이지 이미지 표시용 경로 (로컬 저장소의 썸네일/원본, 없으면 원격 URL)"""
+    image_id = page.get("image_id")
+    if image_id:
+        store = image_store.get_image_store()
+        path = store.original(image_id) if full_size else store.thumbnail(image_id)
+        if path:
+            return path
+    # 저장 실패 또는 용량 초과로 지워진 경우 원격 URL 사용 (만료됐을 수 있음)
+    return page.get("image_url")
+
+
+def result_json(raw_script, pages):
+    """전체 결과 JSON 문자열 (다운로드 버튼을 누를 때 호출)"""
+    result_data = {
+        "raw_script": raw_script,
+        "pages": [
+            {
+                "title": page["title"],
+                "content": page["content"],
+                "image_prompt": page["image_prompt"],
+                "image_url": page["image_url"],
+                "image_id": page.get("image_id"),
+            }
+            for page in pages
+        ],
+    }
+    return json.dumps(result_data, indent=2, ensure_ascii=False)
+
 
-        # 페이지가 너무 많은 경우: 초과 페이지 제거
-        elif len(pages) > expected_page_count:
-            pages = pages[:expected_page_count]
-
-    return pages
-
-
-def generate_image_prompt_for_page(page, model="gpt-4-turbo-preview"):
-    """페이지 내용에 맞는 이미지 생성 프롬프트 생성"""
-    if not page or not page.get("content"):
-        return "페이지 내용을 바탕으로 한 실사 이미지"
-
-    # 콘텐츠 길이 제한
-    content_preview = page["content"][:1500]  # 콘텐츠 길이 제한
-
-    prompt = f"""
-    아래 블로그 페이지의 내용을 분석하여,
-    페이지를 초고화질 실사 사진처럼 표현할 수 있는 세부적이고 자세한 이미지 생성 프롬프트를 만들어 주세요.
-    
-    프롬프트는 다음과 같은 요소를 포함해야 합니다:
-    1. 주요 피사체의 명확한 설명 (인물, 제품, 환경 등)
-    2. 조명 조건 (자연광, 부드러운 조명, 극적인 조명 등)
-    3. 촬영 각도 및 구도 (클로즈업, 전체 샷, 원근감 등)
-    4. 색감 및 분위기 (밝고 활기찬, 차분하고 따뜻한 등)
-    5. 고급 사진 효과 (얕은 심도, 선명한 디테일, 부드러운 배경 등)
-    
-    응답은 프롬프트 텍스트만 제공하세요. 설명이나 주석은 필요 없습니다.
-    
-    페이지 제목: {page['title']}
-    
-    페이지 내용:
-    {content_preview}
+@st.fragment
+def show_blog_result(
+    raw_script, pages, key_prefix="", editable=True, default_style=None
+):
+    """블로그 하나의 결과(전체 보기 또는 선택한 페이지 하나) 표시
+
+    탭은 모든 내용을 매번 그리므로, 보기 선택 버튼으로 고른 화면만 그립니다.
+    fragment라서 보기 전환이나 페이지 안의 조작은 이 부분만 다시 실행합니다.
+    editable이면 페이지마다 프롬프트/이미지 다시 생성 버튼을 함께 표시합니다.
     """
-    try:
-        # API 키 가져오기
-        api_key = st.session_state.get("openai_api_key", DEFAULT_OPENAI_API_KEY)
-        client = OpenAI(api_key=api_key)
-
-        with st.spinner("이미지 프롬프트 생성 중..."):
-            response = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "당신은 안전하고 정교하며 사실적인 이미지 생성 프롬프트를 작성하는 전문가입니다.",
-                    },
-                    {"role": "user", "content": prompt},
+    started = time.perf_counter()
+    view = st.radio(
+        "보기",
+        range(len(pages) + 1),
+        format_func=lambda i: f"📄 페이지 {i}" if i else "📊 전체 보기",
+        horizontal=True,
+        label_visibility="collapsed",
+        key=f"{key_prefix}view",
+    )
+    if view == 0:
+        show_result_overview(raw_script, pages, key_prefix)
+    else:
+        show_page_detail(view - 1, pages[view - 1], key_prefix, editable, default_style)
+
+    if debug_enabled():
+        st.caption(f"⏱️ 결과 영역 렌더링 {(time.perf_counter() - started) * 1000:.1f}ms")
+
+
+def show_result_overview(raw_script, pages, key_prefix=""):
+    """전체 보기: 페이지 요약 목록과 전체 결과 다운로드"""
+    st.markdown("## 📑 블로그 페이지 요약")
+
+    # 전체 스크립트 다운로드 버튼
+    st.download_button(
+        "전체 스크립트 다운로드",
+        raw_script,
+        file_name="blog_script.txt",
+        mime="text/plain",
+        on_click=download_file,
+        args=(raw_script, "blog_script.txt"),
+        key=f"{key_prefix}full_script_download",
+    )
+
+    # 페이지 목록 표시
+    for i, page in enumerate(pages):
+        with st.expander(f"페이지 {i+1}: {page['title']}"):
+            # 2열 레이아웃
+            col1, col2 = st.columns([2, 1])
+
+            with col1:
+                st.markdown(f"### {page['title']}")
+                st.markdown(page["content"])
+                st.text_area(
+                    "이미지 프롬프트",
+                    page["image_prompt"],
+                    height=100,
+                    key=f"{key_prefix}prompt_summary_{i}",
+                )
+
+            with col2:
+                if page["image_url"]:
+                    st.image(
+                        page_image_source(page),
+                        caption=f"페이지 {i+1} 이미지",
+                        use_container_width=True,
+                    )
+                else:
+                    st.error("이미지 생성 실패")
+
+    # 전체 결과 다운로드 옵션
+    st.markdown("### 📥 전체 결과 다운로드")
+
+    # 다운로드 버튼
+    st.download_button(
+        "전체 결과 JSON 다운로드",
+        # 직렬화는 버튼을 누를 때만 (다시 그릴 때마다 만들지 않음)
+        functools.partial(result_json, raw_script, pages),
+        file_name="blog_creation_results.json",
+        mime="application/json",
+        on_click=download_file,
+        args=(None, "blog_creation_results.json"),
+        key=f"{key_prefix}result_download",
+    )
+
+    # 이미지까지 담은 ZIP 번들 (버튼을 누를 때 만들고, 같은 결과는 재사용)
+    st.download_button(
+        "📦 전체 결과 번들(ZIP) 다운로드",
+        functools.partial(export_bundle.read_bundle, raw_script, pages),
+        file_name="blog_creation_bundle.zip",
+        mime="application/zip",
+        on_click=download_file,
+        args=(None, "blog_creation_bundle.zip"),
+        help="스크립트, 페이지별 마크다운, 이미지 프롬프트, 이미지 원본, 매니페스트를 한 파일로 받습니다.",
+        key=f"{key_prefix}bundle_download",
+    )
+
+
+def show_page_detail(i, page, key_prefix="", editable=True, default_style=None):
+    """페이지 하나의 내용, 이미지, 프롬프트와 다시 생성 버튼 표시"""
+
+    # 페이지 제목
+    st.markdown(f"# {page['title']}")
+
+    # 2열 레이아웃
+    col1, col2 = st.columns([3, 2])
+
+    with col1:
+        st.markdown("### 페이지 내용")
+        st.markdown(page["content"])
+
+        # 페이지 스크립트 다운로드
+        page_content = f"# {page['title']}\n\n{page['content']}"
+        st.download_button(
+            "페이지 스크립트 다운로드",
+            page_content,
+            file_name=f"page_{i+1}_script.txt",
+            mime="text/plain",
+            on_click=download_file,
+            args=(page_content, f"page_{i+1}_script.txt"),
+            key=f"{key_prefix}page_{i+1}_download",
+        )
+
+    with col2:
+        st.markdown("### 페이지 이미지")
+        if page["image_url"]:
+            # 원본은 요청할 때만 불러오고 기본은 썸네일 표시
+            full_size = st.toggle(
+                "🔍 원본 크기로 보기",
+                key=f"{key_prefix}full_image_{i}",
+                disabled=not page.get("image_id"),
+            )
+            st.image(
+                page_image_source(page, full_size),
+                caption=page["title"],
+                use_container_width=True,
+            )
+        else:
+            st.error("이미지 생성 실패")
+
+        st.markdown("### 이미지 프롬프트")
+        st.text_area(
+            "프롬프트",
+            page["image_prompt"],
+            height=150,
+            key=f"{key_prefix}prompt_detail_{i}",
+        )
+
+        ## 이 페이지만 다시 생성 (스크립트와 다른 페이지는 그대로 사용)
+        if editable:
+            styles = list(blog_generator.IMAGE_STYLE_PROMPTS)
+            current_style = page.get("image_style", default_style)
+            st.selectbox(
+                "이미지 스타일",
+                styles,
+                index=(styles.index(current_style) if current_style in styles else 0),
+                key=f"{key_prefix}style_{i}",
+            )
+            regenerate_args = (
+                page,
+                f"{key_prefix}style_{i}",
+                f"{key_prefix}prompt_detail_{i}",
+                [
+                    f"{key_prefix}prompt_detail_{i}",
+                    f"{key_prefix}prompt_summary_{i}",
                 ],
             )
-        return response.choices[0].message.content.strip()
-    except Exception as e:
-        st.error(f"이미지 프롬프트 생성 오류: {e}")
-        return f"{page['title']}를 표현한 실사 이미지"
-
-
-def generate_image_for_page(page, image_style="실사 스타일"):
-    """페이지에 대한 이미지 생성"""
-    if not page or not page.get("image_prompt"):
-        return {"url": None, "prompt": "프롬프트 생성 실패"}
-
-    # 이미지 스타일에 따른 스타일 지시 문구
-    style_prompts = {
-        "실사 스타일": " Create a hyper-realistic photograph with extreme detail. Use professional photography techniques with natural lighting, perfect focus, and authentic textures. The image should look indistinguishable from a high-end camera photo with 8K resolution. Include subtle details like skin pores, fabric texture, or surface reflections where appropriate. Use photorealistic color grading with naturalistic environment.",
-        "동화책 스타일": " in a soft, illustrated storybook style, warm and cozy colors.",
-        "수채화 스타일": " as a delicate watercolor painting with soft colors and gentle brushstrokes.",
-        "3D 렌더링": " as a colorful 3D rendered scene with soft lighting and gentle shadows.",
-        "일러스트레이션": " as a clean, modern illustration with vibrant colors and simple shapes.",
-    }
+            st.button(
+                "🔄 프롬프트 다시 생성",
+                key=f"{key_prefix}regen_prompt_{i}",
+                on_click=regenerate_page_part,
+                args=("image_prompt", *regenerate_args),
+                help="이 페이지의 이미지 프롬프트를 새로 만들고 이미지도 다시 생성합니다.",
+                use_container_width=True,
+            )
+            st.button(
+                "🖼️ 이미지 다시 생성",
+                key=f"{key_prefix}regen_image_{i}",
+                on_click=regenerate_page_part,
+                args=("image_url", *regenerate_args),
+                help="위 프롬프트(수정한 경우 수정한 내용)와 선택한 스타일로 이미지만 다시 생성합니다.",
+                use_container_width=True,
+            )
 
-    # 기본 스타일 설정
-    style_prompt = style_prompts.get(image_style, style_prompts["실사 스타일"])
 
-    # API 키 가져오기
+def regenerate_page_part(field, page, style_key, prompt_key, reset_keys):
+    """버튼 콜백: 페이지 하나의 이미지 프롬프트 또는 이미지만 다시 생성"""
     api_key = st.session_state.get("openai_api_key", DEFAULT_OPENAI_API_KEY)
-    client = OpenAI(api_key=api_key)
+    if not api_key:
+        st.warning("OpenAI API 키를 입력해주세요.")
+        return
 
-    try:
-        prompt_text = page["image_prompt"]
-        full_prompt = prompt_text + style_prompt
+    options = {
+        **blog_pipeline.DEFAULT_OPTIONS,
+        **st.session_state.job_result.get("options", {}),
+    }
+    # 프롬프트를 직접 고쳤으면 고친 프롬프트로 이미지 생성
+    edited_prompt = st.session_state.get(prompt_key)
+    if field == "image_url" and edited_prompt:
+        page["image_prompt"] = edited_prompt
+
+    with st.spinner(f"'{page['title']}' 다시 생성 중..."):
+        errors = blog_generator.regenerate_page(
+            page,
+            field,
+            options["model"],
+            st.session_state.get(style_key, options["image_style"]),
+            api_key,
+        )
+    for error in errors:
+        st.error(error)
 
-        with st.spinner(f"'{page['title']}' 이미지 생성 중..."):
-            response = client.images.generate(
-                model="dall-e-3", prompt=full_prompt, n=1, size="1024x1024"
-            )
-        return {"prompt": prompt_text, "url": response.data[0].url}
-    except Exception as e:
-        error_msg = str(e)
-        st.error(f"이미지 생성 오류: {error_msg}")
-
-        # 만약 프롬프트 길이 문제라면
-        if (
-            "maximum context length" in error_msg.lower()
-            or "too long" in error_msg.lower()
-        ):
-            truncated_prompt = prompt_text[:500]  # 프롬프트 길이 제한
-            try:
-                full_prompt = truncated_prompt + style_prompt
-                with st.spinner(f"'{page['title']}' 이미지 재시도 중..."):
-                    response = client.images.generate(
-                        model="dall-e-3", prompt=full_prompt, n=1, size="1024x1024"
-                    )
-                return {"prompt": truncated_prompt, "url": response.data[0].url}
-            except Exception as retry_error:
-                st.error(f"이미지 재생성 오류: {str(retry_error)}")
+    # 프롬프트 입력란이 새 값으로 다시 그려지도록 위젯 상태 초기화
+    for key in reset_keys:
+        st.session_state.pop(key, None)
+
+    # 새로 고침 후 다시 연결해도 바뀐 결과가 보이도록 작업 결과도 갱신
+    job_queue.get_job_manager().update_result(
+        st.session_state.result_job_id, st.session_state.job_result
+    )
 
-        return {"prompt": prompt_text, "url": None}
+
+def show_document_results(documents, editable=True, default_style=None):
+    """문서별 생성 결과를 문서 선택 버튼으로 골라 표시 (처리 중인 문서는 상태만 표시)"""
+    icons = {
+        blog_pipeline.DOCUMENT_PENDING: "⏳",
+        blog_pipeline.DOCUMENT_DONE: "✅",
+        blog_pipeline.DOCUMENT_FAILED: "❌",
+    }
+    # 선택한 문서만 그림 (탭은 모든 문서의 결과를 매번 그림)
+    i = st.radio(
+        "문서",
+        range(len(documents)),
+        format_func=lambda i: f"{icons[documents[i]['status']]} {documents[i]['name']}",
+        horizontal=True,
+        label_visibility="collapsed",
+        key="document_view",
+    )
+    doc = documents[i]
+    if doc["status"] == blog_pipeline.DOCUMENT_PENDING:
+        st.info("⏳ 블로그를 생성하는 중입니다...")
+        return
+    for warning in doc["warnings"]:
+        st.warning(warning)
+    if doc["status"] == blog_pipeline.DOCUMENT_FAILED:
+        st.error(f"❌ 블로그 생성에 실패했습니다: {doc['error']}")
+    else:
+        show_blog_result(
+            doc["raw_script"],
+            doc["pages"],
+            key_prefix=f"doc{i}_",
+            editable=editable,
+            default_style=default_style,
+        )
 
 
 # 다운로드 함수
@@ -369,6 +539,7 @@ def download_file(content, filename):
 
 
 def main():
+    started = time.perf_counter()
     st.title("📚 BlogClip🎬")
     st.subheader("PDF를 스크립트와 멋진 이미지 시퀀스로 변환하세요")
 
@@ -407,6 +578,9 @@ def main():
         if api_key_input:
             st.session_state.openai_api_key = api_key_input
 
+        # 세션이 쓰는 키 등록 (키가 바뀌면 이전 키의 클라이언트 정리)
+        openai_utils.bind_session(user_id, st.session_state.openai_api_key)
+
         # LLM 모델 선택
         st.subheader("LLM 모델 선택")
         selected_model = st.selectbox(
@@ -419,6 +593,56 @@ def main():
         # 모델 선택 저장
         st.session_state.selected_model = selected_model
 
+        # LLM 응답 캐시 사용 여부
+        st.session_state.use_llm_cache = st.checkbox(
+            "LLM 응답 캐시 사용",
+            value=st.session_state.get("use_llm_cache", True),
+            help="같은 문서·설정으로 다시 생성할 때 이전 GPT 응답을 재사용합니다. 끄면 항상 새로 생성합니다.",
+        )
+
+        # PDF 다운로드 캐시 현황
+        cache_stats = pdf_downloader.get_http_cache().stats()
+        st.caption(
+            f"📦 PDF 캐시: 적중 {cache_stats['hits']}회 / 미스 {cache_stats['misses']}회 "
+            f"({cache_stats['entries']}개, {cache_stats['bytes'] / 1024 / 1024:.1f}MB)"
+        )
+        image_stats = image_store.get_image_store().stats()
+        st.caption(
+            f"🖼️ 이미지 저장소: {image_stats['entries']}개 "
+            f"({image_stats['bytes'] / 1024 / 1024:.1f}MB / "
+            f"{image_store.IMAGE_STORE_MAX_BYTES / 1024 / 1024 / 1024:.0f}GB)"
+        )
+        text_cache_stats = pdf_extractor.get_text_cache().stats()
+        st.caption(
+            f"📝 추출 캐시: 적중 {text_cache_stats['hits']}회 / 미스 {text_cache_stats['misses']}회 "
+            f"({text_cache_stats['documents']}개 문서, "
+            f"추출 백엔드 {' → '.join(pdf_backends.backend_order())})"
+        )
+
+        response_cache_stats = openai_utils.get_response_cache().stats()
+        st.caption(
+            f"💬 LLM 응답 캐시: 적중 {response_cache_stats['hits']}회 / "
+            f"미스 {response_cache_stats['misses']}회 ({response_cache_stats['entries']}개)"
+        )
+
+        # OpenAI 호출 대기 현황 (같은 API 키를 쓰는 모든 세션 합산)
+        for kind, stats in openai_utils.limiter_stats(
+            st.session_state.openai_api_key
+        ).items():
+            label = "이미지" if kind == "image" else "채팅"
+            st.caption(
+                f"⏱️ {label} API: 대기 {stats['waiting']}건 · "
+                f"평균 대기 {stats['avg_wait']:.1f}초 · 최대 {stats['max_wait']:.1f}초"
+            )
+
+        # 백그라운드 작업 현황 (이 서버 프로세스 전체)
+        job_stats = job_queue.get_job_manager().stats()
+        st.caption(
+            f"🧵 작업: 실행 {job_stats[job_queue.STATUS_RUNNING]}개 / "
+            f"대기 {job_stats[job_queue.STATUS_QUEUED]}개 "
+            f"(동시 실행 최대 {job_queue.MAX_RUNNING_JOBS}개)"
+        )
+
         st.divider()
 
         st.header("CSV 업로드")
@@ -427,9 +651,9 @@ def main():
         )
 
         if csv_file is not None:
-            urls = handle_csv_and_preview_urls(csv_file)
-            st.session_state["csv_urls"] = urls  # 다운로드는 메인세션에서
+            handle_csv_and_preview_urls(csv_file)  # 다운로드는 메인세션에서
         else:
+            st.session_state.pop("csv_ingest", None)
             st.info("예시 CSV 형식:\n\n```\nhttps://example.com/a.pdf\n```")
 
         st.header("PDF 업로드")
@@ -461,6 +685,51 @@ def main():
                 ],
             )
 
+            per_document = st.checkbox(
+                "PDF별로 따로 생성",
+                value=False,
+                help="PDF를 하나로 합치지 않고 파일마다 블로그를 따로 만듭니다. 여러 문서를 동시에 처리하며, 끝난 문서부터 탭으로 보여줍니다.",
+            )
+            page_workers = st.slider(
+                "동시 생성 페이지 수",
+                1,
+                5,
+                blog_generator.PAGE_WORKERS,
+                1,
+                help="이미지 프롬프트/이미지 생성을 동시에 진행할 페이지 수입니다. 속도 제한(429) 오류가 나면 줄여주세요.",
+            )
+            long_doc_mode = st.selectbox(
+                "긴 문서 처리 방식",
+                list(LONG_DOC_LABELS),
+                format_func=LONG_DOC_LABELS.get,
+                help="앞부분만 사용: 문서 앞 3000자만 사용 (가장 빠름)\n\n"
+                "핵심 문단 선택: 문서 전체에서 정보량이 많은 문단을 골라 3000자를 채움 (API 호출 없음)\n\n"
+                "전체 요약: 문서 전체를 나눠 요약한 뒤 합침 (느리지만 전체 내용 반영)",
+            )
+            if long_doc_mode == blog_pipeline.LONG_DOC_SUMMARIZE:
+                summary_fan_out = st.slider(
+                    "요약 병합 단위",
+                    2,
+                    12,
+                    blog_generator.REDUCE_FAN_OUT,
+                    1,
+                    help="요약을 합칠 때 한 번에 묶는 요약 개수입니다.",
+                )
+            else:
+                summary_fan_out = blog_generator.REDUCE_FAN_OUT
+            stream_script = st.checkbox(
+                "스크립트 스트리밍",
+                value=False,
+                help="스크립트가 작성되는 대로 보여주고, 완성된 페이지부터 바로 이미지 생성을 시작합니다. "
+                "켜면 이미지 프롬프트를 페이지마다 따로 요청합니다.",
+            )
+            batch_prompts = st.checkbox(
+                "이미지 프롬프트 한 번에 생성",
+                value=True,
+                disabled=stream_script,
+                help="모든 페이지의 이미지 프롬프트를 한 번의 요청으로 만듭니다. 응답이 잘못되면 페이지별로 다시 생성합니다. 스크립트 스트리밍을 끈 경우에만 적용됩니다.",
+            )
+
             # API 키 확인
             if not st.session_state.openai_api_key:
                 st.warning("OpenAI API 키를 입력해주세요.")
@@ -479,6 +748,12 @@ def main():
             num_pages = 3  # 기본값
             script_length = 300  # 기본값
             image_style = "실사 스타일"  # 기본값
+            per_document = False  # 기본값
+            page_workers = blog_generator.PAGE_WORKERS  # 기본값
+            long_doc_mode = blog_pipeline.LONG_DOC_HEAD  # 기본값
+            summary_fan_out = blog_generator.REDUCE_FAN_OUT  # 기본값
+            stream_script = False  # 기본값 (프롬프트 일괄 생성 사용)
+            batch_prompts = True  # 기본값
             st.info("먼저 PDF 파일을 업로드해주세요.")
             st.markdown(
                 """
@@ -493,213 +768,84 @@ def main():
             )
 
     # 메인 섹션
-    if (uploaded_files or csv_file is not None) and (
-        process_button or st.session_state.processing_done
-    ):
-        # 처리가 완료되지 않았거나 새로운 처리 요청이 있을 경우에만 실행
-        if not st.session_state.processing_done or process_button:
-            # 진행 상황 표시 컨테이너
-            progress_container = st.container()
-
-            with progress_container:
-
-                # 1. 업로드된 PDF 저장
-                for uploaded_file in uploaded_files:
-                    save_uploaded_file(uploaded_file, user_temp_dir)
-
-                # 2. CSV에서 추출한 URL로 PDF 다운로드
-                urls = st.session_state.get("csv_urls", [])
-                for url in urls:
-                    download_pdf_from_url(url, user_temp_dir)
-
-                # 3. 전체 텍스트 추출
-                text = extract_all_pdfs_from_folder(user_temp_dir)
-
-            print(text)  # 디버깅용
-
-            # 선택된 모델로 스크립트 생성
-            selected_model = st.session_state.selected_model
-            total_script_length = script_length * num_pages
-            raw_script = generate_video_script(
-                text, num_pages, total_script_length, selected_model
+    manager = job_queue.get_job_manager()
+    job_id = st.query_params.get("job")
+
+    # 변환 시작: 파이프라인을 백그라운드 작업으로 넘기고 작업 ID를 주소에 기록
+    if process_button:
+        previous = manager.get(job_id) if job_id else None
+        if previous and previous["status"] in job_queue.ACTIVE_STATUSES:
+            manager.cancel(job_id)  # 같은 화면에서 다시 시작하면 이전 작업은 취소
+
+        options = {
+            "model": st.session_state.selected_model,
+            "num_pages": num_pages,
+            "script_length": script_length,
+            "image_style": image_style,
+            "page_workers": page_workers,
+            "long_doc_mode": long_doc_mode,
+            "summary_fan_out": summary_fan_out,
+            "stream_script": stream_script,
+            "batch_prompts": batch_prompts,
+            "use_cache": st.session_state.get("use_llm_cache", True),
+            "per_document": per_document,
+        }
+        new_job_id = start_blog_job(uploaded_files or [], options)
+        if new_job_id:
+            job_id = new_job_id
+            st.query_params["job"] = job_id
+
+    # 작업 상태 확인 (새로 고침한 뒤에도 주소의 작업 ID로 다시 연결)
+    if job_id:
+        status = manager.get(job_id)
+        if status is None:
+            st.warning("🔍 작업을 찾을 수 없습니다. 만료되었거나 잘못된 주소입니다.")
+            del st.query_params["job"]
+        elif status["status"] in job_queue.ACTIVE_STATUSES:
+            st.caption(
+                f"🧵 작업 ID `{job_id}` 처리 중입니다. "
+                "페이지를 새로 고쳐도 이 주소로 진행 상황을 다시 볼 수 있습니다."
             )
-            if not raw_script or "실패" in raw_script:
-                st.error("블로그 스크립트 생성에 실패했습니다.")
-                return
-
-            # 세션에 원본 스크립트 저장
-            st.session_state.raw_script = raw_script
-
-            # 스크립트를 페이지별로 파싱 (예상 페이지 수 전달)
-            pages = parse_script_pages(raw_script, num_pages)
-
-            # 각 페이지에 대한 이미지 프롬프트 생성
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-
-            for i, page in enumerate(pages):
-                status_text.text(f"페이지 {i+1}/{len(pages)} 처리 중...")
-                progress_bar.progress(
-                    (i) / len(pages) / 2
-                )  # 전체 진행의 절반은 프롬프트 생성
+            show_job_progress(job_id)
+        elif status["status"] == job_queue.STATUS_DONE:
+            # 결과를 세션에 한 번만 옮겨 두고 이후에는 세션 값으로 표시
+            if st.session_state.get("result_job_id") != job_id:
+                st.session_state.result_job_id = job_id
+                st.session_state.job_result = status["result"]
+                st.session_state.raw_script = status["result"].get("raw_script", "")
+                st.session_state.pages = status["result"].get("pages", [])
+                st.session_state.processing_done = True
+        elif status["status"] == job_queue.STATUS_FAILED:
+            st.error(f"❌ 블로그 생성에 실패했습니다: {status['error']}")
+        else:
+            st.info("⏹️ 작업이 취소되었습니다.")
 
-                # 이미지 프롬프트 생성
-                page["image_prompt"] = generate_image_prompt_for_page(
-                    page, selected_model
-                )
+    if st.session_state.processing_done and st.session_state.get("job_result"):
+        show_job_report(st.session_state.job_result)
 
-                # 이미지 생성
-                progress_bar.progress(
-                    0.5 + (i) / len(pages) / 2
-                )  # 후반부는 이미지 생성
-                image_result = generate_image_for_page(page, image_style)
-                page["image_url"] = image_result["url"]
-
-                # 이미지 생성 사이 간격
-                time.sleep(0.5)
-
-            progress_bar.progress(1.0)
-            status_text.text("페이지 생성 완료!")
-            time.sleep(0.5)
-            status_text.empty()
-            progress_bar.empty()
-
-            # 세션에 페이지 저장
-            st.session_state.pages = pages
-
-            # 처리 완료 상태 업데이트
-            st.session_state.processing_done = True
-
-        # 결과 표시 (처리 완료 상태일 때)
-        if st.session_state.processing_done:
-            # 페이지 탭 생성
-            page_tabs = ["📊 전체 보기"] + [
-                f"📄 페이지 {i+1}" for i in range(len(st.session_state.pages))
-            ]
-            tabs = st.tabs(page_tabs)
-
-            # 전체 보기 탭
-            with tabs[0]:
-                st.markdown("## 📑 블로그 페이지 요약")
-
-                # 전체 스크립트 다운로드 버튼
-                st.download_button(
-                    "전체 스크립트 다운로드",
-                    st.session_state.raw_script,
-                    file_name="blog_script.txt",
-                    mime="text/plain",
-                    on_click=download_file,
-                    args=(st.session_state.raw_script, "blog_script.txt"),
-                    key="full_script_download",
-                )
+    # 결과 표시 (처리 완료 상태일 때)
+    if st.session_state.processing_done:
+        documents = st.session_state.job_result.get("documents")
+        default_style = st.session_state.job_result.get("options", {}).get(
+            "image_style"
+        )
+        if documents:
+            show_document_results(documents, default_style=default_style)
+        else:
+            show_blog_result(
+                st.session_state.raw_script,
+                st.session_state.pages,
+                default_style=default_style,
+            )
 
-                # 페이지 목록 표시
-                for i, page in enumerate(st.session_state.pages):
-                    with st.expander(f"페이지 {i+1}: {page['title']}"):
-                        # 2열 레이아웃
-                        col1, col2 = st.columns([2, 1])
-
-                        with col1:
-                            st.markdown(f"### {page['title']}")
-                            st.markdown(page["content"])
-                            st.text_area(
-                                "이미지 프롬프트",
-                                page["image_prompt"],
-                                height=100,
-                                key=f"prompt_summary_{i}",
-                            )
-
-                        with col2:
-                            if page["image_url"]:
-                                st.image(
-                                    page["image_url"],
-                                    caption=f"페이지 {i+1} 이미지",
-                                    use_container_width=True,
-                                )
-                            else:
-                                st.error("이미지 생성 실패")
-
-                # 전체 결과 다운로드 옵션
-                st.markdown("### 📥 전체 결과 다운로드")
-
-                # 결과를 JSON으로 변환
-                result_data = {
-                    "raw_script": st.session_state.raw_script,
-                    "pages": [
-                        {
-                            "title": page["title"],
-                            "content": page["content"],
-                            "image_prompt": page["image_prompt"],
-                            "image_url": page["image_url"],
-                        }
-                        for page in st.session_state.pages
-                    ],
-                }
-
-                result_json = json.dumps(result_data, indent=2, ensure_ascii=False)
-
-                # 다운로드 버튼
-                st.download_button(
-                    "전체 결과 JSON 다운로드",
-                    result_json,
-                    file_name="blog_creation_results.json",
-                    mime="application/json",
-                    on_click=download_file,
-                    args=(result_json, "blog_creation_results.json"),
-                    key="result_download",
-                )
+    # 다운로드 성공 메시지 표시
+    if st.session_state.download_clicked:
+        st.success("파일이 성공적으로 다운로드되었습니다!")
+        # 다음 다운로드를 위해 상태 재설정
+        st.session_state.download_clicked = False
 
-            # 개별 페이지 탭
-            for i in range(len(st.session_state.pages)):
-                with tabs[i + 1]:
-                    page = st.session_state.pages[i]
-
-                    # 페이지 제목
-                    st.markdown(f"# {page['title']}")
-
-                    # 2열 레이아웃
-                    col1, col2 = st.columns([3, 2])
-
-                    with col1:
-                        st.markdown("### 페이지 내용")
-                        st.markdown(page["content"])
-
-                        # 페이지 스크립트 다운로드
-                        page_content = f"# {page['title']}\n\n{page['content']}"
-                        st.download_button(
-                            "페이지 스크립트 다운로드",
-                            page_content,
-                            file_name=f"page_{i+1}_script.txt",
-                            mime="text/plain",
-                            on_click=download_file,
-                            args=(page_content, f"page_{i+1}_script.txt"),
-                            key=f"page_{i+1}_download",
-                        )
-
-                    with col2:
-                        st.markdown("### 페이지 이미지")
-                        if page["image_url"]:
-                            st.image(
-                                page["image_url"],
-                                caption=page["title"],
-                                use_container_width=True,
-                            )
-                        else:
-                            st.error("이미지 생성 실패")
-
-                        st.markdown("### 이미지 프롬프트")
-                        st.text_area(
-                            "프롬프트",
-                            page["image_prompt"],
-                            height=150,
-                            key=f"prompt_detail_{i}",
-                        )
-
-        # 다운로드 성공 메시지 표시
-        if st.session_state.download_clicked:
-            st.success("파일이 성공적으로 다운로드되었습니다!")
-            # 다음 다운로드를 위해 상태 재설정
-            st.session_state.download_clicked = False
+    if debug_enabled():
+        st.caption(f"⏱️ 전체 렌더링 {(time.perf_counter() - started) * 1000:.1f}ms")
 
 
 if __name__ == "__main__":
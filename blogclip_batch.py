@@ -0,0 +1,295 @@
+"""CSV의 PDF URL을 Streamlit 없이 일괄 처리하는 배치 실행기
+
+사용 예:
+    python blogclip_batch.py test.CSV -o results.jsonl --workers 4
+
+문서마다 다운로드 → 텍스트 추출 → 스크립트 생성 → 페이지 분리 → 이미지 프롬프트 → 이미지
+순서로 처리하고, 끝난 문서마다 결과 한 줄을 출력 JSONL 파일에 바로 기록합니다.
+같은 출력 파일로 다시 실행하면 이미 기록된 URL은 건너뛰므로 중단된 지점부터 이어집니다.
+"""
+
+import argparse
+import functools
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import blog_generator
+import blog_pipeline
+import openai_utils
+import pdf_downloader
+import url_ingest
+
+DOCUMENT_WORKERS = 4  # 동시에 처리할 문서 수
+DEFAULT_OUTPUT = "blogclip_results.jsonl"
+
+# 결과 레코드 상태
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+
+def read_csv_urls(csv_path, counts=None):
+    """CSV 첫 번째 열의 URL을 정리해 순서대로 yield (정규화한 URL 기준 중복 제거)
+
+    counts를 주면 중복·잘못된 값·PDF가 아닌 링크 수가 집계됩니다 (url_ingest.new_counts()).
+    """
+    with url_ingest.open_csv_text(csv_path) as f:
+        yield from url_ingest.iter_csv_urls(f, counts)
+
+
+class Checkpoint:
+    """결과 JSONL 파일 (이미 처리한 URL 조회 + 문서별 결과 한 줄씩 추가)
+
+    같은 URL의 레코드가 여러 번 있으면 마지막 레코드가 유효합니다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._status = {}  # 정규화한 URL -> 마지막 상태
+        needs_newline = False
+
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    needs_newline = not line.endswith("\n")
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # 강제 종료로 잘린 줄
+                    key = pdf_downloader.normalize_url(record["url"])
+                    self._status[key] = record["status"]
+
+        self._file = open(path, "a", encoding="utf-8")
+        if needs_newline:
+            self._file.write("\n")  # 잘린 줄 뒤에 이어 쓰지 않도록 줄바꿈
+
+    def should_skip(self, url, retry_failed=False):
+        """이미 결과가 기록된 URL인지 확인 (retry_failed면 실패한 URL은 다시 처리)"""
+        status = self._status.get(pdf_downloader.normalize_url(url))
+        if status == STATUS_DONE:
+            return True
+        return status == STATUS_FAILED and not retry_failed
+
+    def write(self, record):
+        """결과 한 줄을 추가하고 디스크에 바로 반영"""
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._status[pdf_downloader.normalize_url(record["url"])] = record["status"]
+
+    def close(self):
+        self._file.close()
+
+
+def process_document(url, work_root, api_key, options):
+    """URL 하나를 끝까지 처리하고 결과 레코드 반환 (실패해도 예외 대신 레코드로 반환)"""
+    started = time.time()
+    record = {"url": url, "status": STATUS_FAILED}
+    stage = {"name": blog_pipeline.STAGE_DOWNLOAD}  # 실패한 단계 기록용
+
+    def track(update):
+        stage["name"] = update["stage"]
+
+    try:
+        result = blog_pipeline.run_pipeline(
+            urls=[url],
+            work_dir=tempfile.mkdtemp(dir=work_root),
+            api_key=api_key,
+            options=options,
+            on_progress=track,
+        )
+        record.update(
+            status=STATUS_DONE,
+            script=result["raw_script"],
+            pages=result["pages"],
+            warnings=result["warnings"],
+            report=result["report"],
+        )
+    except Exception as e:
+        record.update(stage=stage["name"], error=f"{type(e).__name__}: {e}")
+
+    record["elapsed_seconds"] = round(time.time() - started, 2)
+    return record
+
+
+def run_batch(
+    urls,
+    checkpoint,
+    api_key,
+    options=None,
+    workers=DOCUMENT_WORKERS,
+    retry_failed=False,
+    on_record=None,
+):
+    """URL들을 문서 단위로 병렬 처리하며 결과를 checkpoint에 기록
+
+    한꺼번에 모든 작업을 만들지 않고 workers의 두 배까지만 대기열에 올려
+    수천 개의 URL도 일정한 메모리로 처리합니다. Ctrl+C를 누르면 새 문서는
+    시작하지 않고, 진행 중인 문서를 마저 기록한 뒤 KeyboardInterrupt를 다시 발생시킵니다.
+    처리한 문서 수를 {"done", "failed", "skipped"}로 반환합니다.
+    """
+    counts = {STATUS_DONE: 0, STATUS_FAILED: 0, "skipped": 0}
+    workers = max(1, workers)
+
+    def record_results(futures):
+        for future in futures:
+            record = future.result()
+            checkpoint.write(record)
+            counts[record["status"]] += 1
+            if on_record:
+                on_record(record, counts)
+
+    with tempfile.TemporaryDirectory(prefix="blogclip_batch_") as work_root:
+        work = functools.partial(
+            process_document, work_root=work_root, api_key=api_key, options=options
+        )
+        pool = ThreadPoolExecutor(max_workers=workers)
+        running = set()
+        try:
+            for url in urls:
+                if checkpoint.should_skip(url, retry_failed):
+                    counts["skipped"] += 1
+                    continue
+                while len(running) >= workers * 2:
+                    done, running = wait(running, return_when=FIRST_COMPLETED)
+                    record_results(done)
+                running.add(pool.submit(work, url))
+            while running:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                record_results(done)
+        except KeyboardInterrupt:
+            for future in running:
+                future.cancel()
+            record_results(f for f in running if not f.cancelled())
+            raise
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    return {
+        "done": counts[STATUS_DONE],
+        "failed": counts[STATUS_FAILED],
+        "skipped": counts["skipped"],
+    }
+
+
+def _print_record(record, counts):
+    """문서 하나가 끝날 때마다 진행 상황 출력"""
+    if record["status"] == STATUS_DONE:
+        message = f"완료 ({record['elapsed_seconds']}초)"
+    else:
+        message = f"실패 [{record['stage']}] {record['error']}"
+    print(
+        f"[완료 {counts[STATUS_DONE]} / 실패 {counts[STATUS_FAILED]}] "
+        f"{record['url']}: {message}",
+        flush=True,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="CSV의 PDF URL마다 블로그 스크립트와 이미지를 일괄 생성합니다."
+    )
+    parser.add_argument("csv_path", help="첫 번째 열에 PDF URL이 있는 CSV 파일")
+    parser.add_argument(
+        "-o", "--output", default=DEFAULT_OUTPUT, help="결과/체크포인트 JSONL 파일"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=DOCUMENT_WORKERS, help="동시에 처리할 문서 수"
+    )
+    parser.add_argument(
+        "--page-workers",
+        type=int,
+        default=blog_generator.PAGE_WORKERS,
+        help="문서당 동시에 이미지를 생성할 페이지 수",
+    )
+    parser.add_argument("--model", default=blog_pipeline.DEFAULT_OPTIONS["model"])
+    parser.add_argument("--pages", type=int, default=3, help="블로그 페이지 수")
+    parser.add_argument(
+        "--script-length",
+        type=int,
+        default=blog_pipeline.DEFAULT_OPTIONS["script_length"],
+        help="페이지당 스크립트 길이 (자)",
+    )
+    parser.add_argument(
+        "--image-style",
+        default=blog_generator.DEFAULT_IMAGE_STYLE,
+        choices=list(blog_generator.IMAGE_STYLE_PROMPTS),
+    )
+    parser.add_argument(
+        "--long-doc",
+        default=blog_pipeline.LONG_DOC_SELECT,
+        choices=[
+            blog_pipeline.LONG_DOC_HEAD,
+            blog_pipeline.LONG_DOC_SELECT,
+            blog_pipeline.LONG_DOC_SUMMARIZE,
+        ],
+        help="긴 문서 처리 방식",
+    )
+    parser.add_argument(
+        "--no-batch-prompts",
+        action="store_true",
+        help="이미지 프롬프트를 페이지마다 따로 요청",
+    )
+    parser.add_argument(
+        "--retry-failed", action="store_true", help="이전에 실패한 URL도 다시 처리"
+    )
+    parser.add_argument(
+        "--api-key",
+        default=os.environ.get("OPENAI_API_KEY", ""),
+        help="OpenAI API 키 (기본값: 환경 변수 OPENAI_API_KEY)",
+    )
+    args = parser.parse_args(argv)
+
+    if not args.api_key:
+        parser.error("OpenAI API 키가 필요합니다 (--api-key 또는 OPENAI_API_KEY).")
+
+    checkpoint = Checkpoint(args.output)
+    csv_counts = url_ingest.new_counts()
+    try:
+        counts = run_batch(
+            read_csv_urls(args.csv_path, csv_counts),
+            checkpoint,
+            args.api_key,
+            options={
+                "model": args.model,
+                "num_pages": args.pages,
+                "script_length": args.script_length,
+                "image_style": args.image_style,
+                "page_workers": args.page_workers,
+                "long_doc_mode": args.long_doc,
+                # 배치에서는 스트리밍 화면이 없으므로 프롬프트 일괄 생성을 기본으로 사용
+                "stream_script": False,
+                "batch_prompts": not args.no_batch_prompts,
+            },
+            workers=args.workers,
+            retry_failed=args.retry_failed,
+            on_record=_print_record,
+        )
+    except KeyboardInterrupt:
+        print(f"⏸️ 중단됨. 같은 명령으로 다시 실행하면 이어서 처리합니다: {args.output}")
+        return 130
+    finally:
+        checkpoint.close()
+        openai_utils.close_clients()
+
+    print(
+        f"📄 CSV: 고유 URL {csv_counts['urls']}개 "
+        f"(중복 {csv_counts['duplicates']}개, 잘못된 값 {csv_counts['invalid']}개, "
+        f"PDF가 아닌 링크 {csv_counts['not_pdf']}개 제외)"
+    )
+    print(
+        f"✅ 완료 {counts['done']}개 / 실패 {counts['failed']}개 / "
+        f"이전 결과 사용 {counts['skipped']}개 → {args.output}"
+    )
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""생성 결과 ZIP 번들 내보내기 (스크립트, 페이지별 마크다운, 프롬프트, 이미지, 매니페스트)
+
+ZIP은 항목을 하나씩 디스크에 바로 써 나가므로 이미지가 많아도 메모리를 적게 쓰고,
+결과 내용의 해시로 파일 이름을 정해 같은 결과는 한 번만 만듭니다.
+이미지를 받지 못한 페이지가 있는 번들은 재사용하지 않고 다음 요청 때 다시 만듭니다.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from urllib.parse import urlsplit
+
+import image_store
+import pdf_downloader
+
+EXPORT_DIR = os.path.join(tempfile.gettempdir(), "blogclip_exports")
+EXPORT_TTL_SECONDS = 24 * 3600  # 만든 번들 보관 기간
+DOWNLOAD_TIMEOUT = (5, 60)  # 로컬에 없는 이미지 다운로드 (연결, 읽기) 타임아웃 (초)
+COPY_CHUNK_SIZE = 1024 * 1024  # 이미지를 ZIP에 옮겨 쓰는 단위 (바이트)
+
+# 번들 내용에 영향을 주는 페이지 필드
+_PAGE_FIELDS = ("title", "content", "image_prompt", "image_url", "image_id")
+
+_build_locks = {}  # 번들 키 -> [같은 번들을 동시에 두 번 만들지 않기 위한 락, 사용 중인 호출 수]
+_lock = threading.Lock()
+
+
+def bundle_key(raw_script, pages):
+    """결과 내용 해시 (내용이 같으면 같은 번들)"""
+    payload = json.dumps(
+        {
+            "raw_script": raw_script,
+            "pages": [
+                {field: page.get(field) for field in _PAGE_FIELDS} for page in pages
+            ],
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _page_markdown(number, page, image_name):
+    lines = [f"# {page['title']}", "", page["content"], ""]
+    if image_name:
+        lines += [f"![페이지 {number} 이미지](../{image_name})", ""]
+    lines += ["## 이미지 프롬프트", "", page.get("image_prompt") or "", ""]
+    return "\n".join(lines)
+
+
+def _write_image(zf, number, page):
+    """페이지 이미지를 ZIP에 조각 단위로 복사하고 (파일 이름, 크기, 출처) 반환, 없으면 None"""
+    image_id = page.get("image_id")
+    path = image_store.get_image_store().original(image_id) if image_id else None
+    if path:
+        name = f"images/page_{number:02d}{os.path.splitext(path)[1]}"
+        # 이미 압축된 이미지는 다시 압축하지 않음
+        with open(path, "rb") as src, zf.open(
+            zipfile.ZipInfo(name, time.localtime()[:6]), "w"
+        ) as dst:
+            shutil.copyfileobj(src, dst, COPY_CHUNK_SIZE)
+        return name, os.path.getsize(path), "local"
+
+    url = page.get("image_url")
+    if not url:
+        return None
+    # 로컬 저장소에 없으면 원격 URL에서 받아 바로 ZIP에 씀 (만료됐으면 실패)
+    session = pdf_downloader.get_session(urlsplit(url).netloc.lower())
+    with session.get(url, timeout=DOWNLOAD_TIMEOUT, stream=True) as response:
+        response.raise_for_status()
+        name = f"images/page_{number:02d}.png"
+        size = 0
+        with zf.open(zipfile.ZipInfo(name, time.localtime()[:6]), "w") as dst:
+            for chunk in response.iter_content(COPY_CHUNK_SIZE):
+                dst.write(chunk)
+                size += len(chunk)
+    return name, size, "remote"
+
+
+def build_bundle(raw_script, pages, path, incomplete_path=None):
+    """결과를 ZIP 번들로 path에 저장하고 저장한 경로 반환 (임시 파일에 다 쓴 뒤 교체)
+
+    incomplete_path를 주면 이미지를 넣지 못한 페이지가 있는 번들은 그 경로에 저장합니다.
+    """
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    manifest = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "page_count": len(pages),
+        "pages": [],
+    }
+    try:
+        with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("script.txt", raw_script)
+
+            prompts = []
+            for number, page in enumerate(pages, start=1):
+                entry = {
+                    "page": number,
+                    "title": page["title"],
+                    "image_url": page.get("image_url"),
+                    "image_id": page.get("image_id"),
+                    "image_style": page.get("image_style"),
+                    "image": None,
+                }
+                try:
+                    image = _write_image(zf, number, page)
+                except Exception as e:
+                    entry["image_error"] = str(e)
+                    image = None
+                if image:
+                    entry["image"], entry["image_bytes"], entry["image_source"] = image
+
+                markdown_name = f"pages/page_{number:02d}.md"
+                zf.writestr(markdown_name, _page_markdown(number, page, entry["image"]))
+                entry["markdown"] = markdown_name
+                manifest["pages"].append(entry)
+                prompts.append(
+                    {"page": number, "image_prompt": page.get("image_prompt")}
+                )
+
+            zf.writestr(
+                "prompts.json", json.dumps(prompts, indent=2, ensure_ascii=False)
+            )
+            zf.writestr(
+                "manifest.json", json.dumps(manifest, indent=2, ensure_ascii=False)
+            )
+        if incomplete_path and any("image_error" in e for e in manifest["pages"]):
+            path = incomplete_path
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return path
+
+
+def _cleanup(export_dir):
+    """보관 기간이 지난 번들 삭제"""
+    now = time.time()
+    for name in os.listdir(export_dir):
+        path = os.path.join(export_dir, name)
+        try:
+            if now - os.path.getmtime(path) > EXPORT_TTL_SECONDS:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def get_bundle(raw_script, pages, export_dir=EXPORT_DIR):
+    """결과의 ZIP 번들 경로 반환 (같은 내용으로 이미 만든 번들이 있으면 재사용)
+
+    원격 이미지를 받지 못한 번들은 재사용하지 않는 별도 경로에 만들어, 일시적인
+    다운로드 실패가 보관 기간 내내 번들에 남지 않게 합니다.
+    """
+    os.makedirs(export_dir, exist_ok=True)
+    key = bundle_key(raw_script, pages)
+    path = os.path.join(export_dir, f"{key}.zip")
+    incomplete_path = os.path.join(export_dir, f"{key}.incomplete.zip")
+
+    with _lock:
+        entry = _build_locks.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            if os.path.exists(path):
+                os.utime(path)  # 보관 기간은 마지막 사용 시각부터
+            else:
+                _cleanup(export_dir)
+                path = build_bundle(raw_script, pages, path, incomplete_path)
+    finally:
+        # 기다리는 호출이 없을 때만 락을 지워, 새 호출이 다른 락으로 동시에 만들지 않게 함
+        with _lock:
+            entry[1] -= 1
+            if not entry[1]:
+                del _build_locks[key]
+    return path
+
+
+def read_bundle(raw_script, pages):
+    """다운로드 버튼에 넘길 번들 바이트 (버튼을 누를 때 호출)
+
+    st.download_button은 파일 객체를 넘겨도 전부 read()해 메모리 저장소에
+    bytes로 올리고 조각(generator)은 받지 않으므로, 여기서 한 번 읽어 넘깁니다.
+    ZIP은 디스크에서 조각 단위로 만들어 두어 최대 메모리는 번들 크기 하나입니다.
+    """
+    with open(get_bundle(raw_script, pages), "rb") as f:
+        return f.read()
@@ -0,0 +1,198 @@
+"""생성 이미지 로컬 저장소 (내용 해시 주소 + WebP 썸네일, 용량 기준 LRU 삭제)
+
+DALL·E가 돌려주는 이미지 URL은 한 시간 정도 뒤 만료되므로, 생성 직후 한 번만
+내려받아 SHA-256 이름으로 저장하고 화면에는 작은 썸네일을 보여 줍니다.
+"""
+
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from PIL import Image
+
+import pdf_downloader
+
+IMAGE_STORE_DIR = os.path.join(tempfile.gettempdir(), "blogclip_images")
+IMAGE_STORE_MAX_BYTES = 1024 * 1024 * 1024  # 1GB 넘으면 오래 안 본 이미지부터 삭제
+THUMBNAIL_SIZE = 512  # 썸네일 긴 변 길이 (px)
+THUMBNAIL_QUALITY = 80  # 썸네일 WebP 품질
+THUMBNAIL_WORKERS = 4  # 썸네일 생성 스레드 수
+DOWNLOAD_TIMEOUT = (5, 60)  # 이미지 다운로드 (연결, 읽기) 타임아웃 (초)
+INDEX_SAVE_INTERVAL = 30  # 조회 시각만 바뀐 경우 인덱스 저장 최소 간격 (초)
+
+_EXTENSIONS = {"PNG": ".png", "JPEG": ".jpg", "WEBP": ".webp", "GIF": ".gif"}
+
+_image_store = None
+_lock = threading.Lock()
+
+
+class ImageStore:
+    """이미지 ID(원본 바이트의 SHA-256)로 원본과 썸네일을 보관하는 디스크 저장소"""
+
+    def __init__(self, store_dir=IMAGE_STORE_DIR, max_bytes=IMAGE_STORE_MAX_BYTES):
+        self.store_dir = store_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index_path = os.path.join(store_dir, "index.json")
+        os.makedirs(store_dir, exist_ok=True)
+        self._index = self._load_index()
+        self._saved_at = time.monotonic()
+        self._pool = ThreadPoolExecutor(
+            max_workers=THUMBNAIL_WORKERS, thread_name_prefix="blogclip-thumb"
+        )
+        self._pending = {}  # 이미지 ID -> 썸네일 생성 Future
+
+    def _load_index(self):
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # 원본 파일이 사라진 항목은 버림
+        return {
+            image_id: entry
+            for image_id, entry in index.items()
+            if os.path.exists(os.path.join(self.store_dir, image_id + entry["ext"]))
+        }
+
+    def _save_index(self):
+        # _lock을 잡은 상태에서 호출
+        tmp_path = self._index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self._index_path)
+        self._saved_at = time.monotonic()
+
+    def _original_path(self, image_id, entry):
+        return os.path.join(self.store_dir, image_id + entry["ext"])
+
+    def _thumbnail_path(self, image_id):
+        return os.path.join(self.store_dir, f"{image_id}_thumb.webp")
+
+    def save_bytes(self, data):
+        """이미지 바이트를 저장하고 이미지 ID 반환 (썸네일은 스레드 풀에서 생성)"""
+        with Image.open(io.BytesIO(data)) as image:
+            ext = _EXTENSIONS.get(image.format, ".img")
+        image_id = hashlib.sha256(data).hexdigest()
+
+        with self._lock:
+            entry = self._index.get(image_id)
+            if entry is None:
+                # 같은 내용의 이미지는 한 번만 저장
+                entry = {"ext": ext, "size": len(data), "thumb_size": 0}
+                path = self._original_path(image_id, entry)
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+                self._index[image_id] = entry
+            entry["last_used"] = time.time()
+            self._evict()
+            self._save_index()
+
+            if image_id not in self._pending and not os.path.exists(
+                self._thumbnail_path(image_id)
+            ):
+                self._pending[image_id] = self._pool.submit(
+                    self._make_thumbnail, image_id
+                )
+        return image_id
+
+    def save_url(self, url):
+        """URL의 이미지를 한 번 내려받아 저장하고 이미지 ID 반환"""
+        session = pdf_downloader.get_session(urlsplit(url).netloc.lower())
+        response = session.get(url, timeout=DOWNLOAD_TIMEOUT)
+        response.raise_for_status()
+        return self.save_bytes(response.content)
+
+    def _make_thumbnail(self, image_id):
+        with self._lock:
+            entry = self._index.get(image_id)
+        try:
+            if entry is None:
+                return None
+            path = self._thumbnail_path(image_id)
+            with Image.open(self._original_path(image_id, entry)) as image:
+                image.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                image.save(tmp_path, "WEBP", quality=THUMBNAIL_QUALITY)
+            os.replace(tmp_path, path)
+            with self._lock:
+                if image_id in self._index:
+                    self._index[image_id]["thumb_size"] = os.path.getsize(path)
+            return path
+        finally:
+            with self._lock:
+                self._pending.pop(image_id, None)
+
+    def _touch(self, image_id):
+        # _lock을 잡은 상태에서 호출
+        self._index[image_id]["last_used"] = time.time()
+        if time.monotonic() - self._saved_at >= INDEX_SAVE_INTERVAL:
+            self._save_index()
+
+    def thumbnail(self, image_id):
+        """썸네일 파일 경로 반환 (생성 중이면 기다리고, 없으면 바로 생성, 원본이 없으면 None)"""
+        with self._lock:
+            if image_id not in self._index:
+                return None
+            future = self._pending.get(image_id)
+            self._touch(image_id)
+
+        path = self._thumbnail_path(image_id)
+        if future is not None:
+            future.result()
+        elif not os.path.exists(path):
+            self._make_thumbnail(image_id)
+        return path if os.path.exists(path) else None
+
+    def original(self, image_id):
+        """원본 이미지 파일 경로 반환 (없으면 None)"""
+        with self._lock:
+            entry = self._index.get(image_id)
+            if entry is None:
+                return None
+            self._touch(image_id)
+            return self._original_path(image_id, entry)
+
+    def _evict(self):
+        # _lock을 잡은 상태에서 호출
+        total = sum(e["size"] + e["thumb_size"] for e in self._index.values())
+        for image_id, entry in sorted(
+            self._index.items(), key=lambda item: item[1]["last_used"]
+        ):
+            if total <= self.max_bytes:
+                break
+            for path in (
+                self._original_path(image_id, entry),
+                self._thumbnail_path(image_id),
+            ):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            del self._index[image_id]
+            total -= entry["size"] + entry["thumb_size"]
+
+    def stats(self):
+        """저장된 이미지 수와 사용량 (썸네일 포함)"""
+        with self._lock:
+            return {
+                "entries": len(self._index),
+                "bytes": sum(e["size"] + e["thumb_size"] for e in self._index.values()),
+            }
+
+
+def get_image_store():
+    """프로세스 전체에서 공유하는 이미지 저장소 반환"""
+    global _image_store
+    with _lock:
+        if _image_store is None:
+            _image_store = ImageStore()
+        return _image_store
@@ -0,0 +1,286 @@
+"""Streamlit 스크립트 실행과 분리된 백그라운드 작업 큐
+
+작업 상태는 작업 ID별 JSON 파일로 저장되므로, 브라우저를 새로 고쳐
+세션이 바뀌어도 작업 ID만 있으면 진행 상황과 결과를 다시 조회할 수 있습니다.
+"""
+
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+JOB_DIR = os.path.join(tempfile.gettempdir(), "blogclip_jobs")
+MAX_RUNNING_JOBS = 2  # 프로세스당 동시에 실행할 작업 수
+MAX_ACTIVE_JOBS = 6  # 실행 대기까지 포함해 받아 둘 수 있는 최대 작업 수
+JOB_TTL_SECONDS = 24 * 3600  # 끝난 작업 상태 파일 보관 기간
+SAVE_INTERVAL = 0.5  # 진행 상황만 바뀐 경우 상태 파일 저장 최소 간격 (초)
+STALE_JOB_SECONDS = 3600  # 다른 프로세스의 작업이 이 시간 동안 갱신이 없으면 멈춘 것으로 봄
+
+# 작업 상태
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+ACTIVE_STATUSES = (STATUS_QUEUED, STATUS_RUNNING)
+
+
+class JobQueueFullError(Exception):
+    """실행 중/대기 중인 작업이 가득 차 새 작업을 받을 수 없을 때"""
+
+
+def _process_alive(pid):
+    """pid 프로세스가 살아 있는지 (확인할 수 없으면 살아 있다고 봄)"""
+    if not pid:
+        return False
+    if os.name == "nt":
+        return True  # Windows의 os.kill은 신호 0도 프로세스를 종료시킴
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # 다른 사용자의 프로세스 (PermissionError)
+    return True
+
+
+class Job:
+    """작업 함수에 넘겨지는 핸들 (진행 상황 기록과 취소 여부 확인)"""
+
+    def __init__(self, manager, job_id):
+        self.id = job_id
+        self._manager = manager
+        self._cancel_event = threading.Event()
+
+    def update(self, **fields):
+        """진행 상황(stage, progress, message 등) 기록"""
+        self._manager._update(self.id, fields)
+
+    def is_cancelled(self):
+        return self._cancel_event.is_set()
+
+
+class JobManager:
+    """작업 ID 발급, 실행 개수 제한, 상태 저장, 취소를 맡는 작업 관리자"""
+
+    def __init__(
+        self,
+        job_dir=JOB_DIR,
+        max_running=MAX_RUNNING_JOBS,
+        max_active=MAX_ACTIVE_JOBS,
+    ):
+        self.job_dir = job_dir
+        self.max_active = max_active
+        os.makedirs(job_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(1, max_running), thread_name_prefix="blogclip-job"
+        )
+        self._status = {}  # 이 프로세스에서 만든 작업 ID -> 최신 상태
+        self._handles = {}  # 작업 ID -> (Job, Future, on_skip)
+        self._saved_at = {}  # 작업 ID -> 마지막 저장 시각
+        self._cleanup()
+
+    def _path(self, job_id):
+        return os.path.join(self.job_dir, f"{job_id}.json")
+
+    def _save(self, status):
+        # 읽는 쪽이 쓰다 만 파일을 보지 않도록 임시 파일에 쓴 뒤 교체
+        path = self._path(status["id"])
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(status, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        self._saved_at[status["id"]] = time.monotonic()
+
+    def _load(self, job_id):
+        try:
+            with open(self._path(job_id), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _cleanup(self):
+        """오래된 상태 파일 삭제, 끝난(이전) 프로세스에서 멈춘 작업은 실패로 표시
+
+        같은 작업 폴더를 쓰는 다른 서버 프로세스가 살아 있으면 그 작업은 건드리지 않고,
+        프로세스가 없거나 STALE_JOB_SECONDS 동안 갱신이 없을 때만 실패로 봅니다.
+        """
+        now = time.time()
+        for name in os.listdir(self.job_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.job_dir, name)
+            try:
+                if now - os.path.getmtime(path) > JOB_TTL_SECONDS:
+                    os.remove(path)
+                    continue
+            except OSError:
+                continue
+            status = self._load(name[: -len(".json")])
+            if (
+                status
+                and status["status"] in ACTIVE_STATUSES
+                and status.get("pid") != os.getpid()
+                and (
+                    not _process_alive(status.get("pid"))
+                    or now - status.get("updated_at", 0) > STALE_JOB_SECONDS
+                )
+            ):
+                status.update(
+                    status=STATUS_FAILED,
+                    error="서버가 다시 시작되어 작업이 중단되었습니다.",
+                    updated_at=now,
+                )
+                self._save(status)
+
+    def _update(self, job_id, fields):
+        with self._lock:
+            status = self._status[job_id]
+            status.update(fields, updated_at=time.time())
+            # 상태가 바뀌었거나 일정 시간이 지났을 때만 디스크에 저장
+            if (
+                "status" in fields
+                or time.monotonic() - self._saved_at.get(job_id, 0) >= SAVE_INTERVAL
+            ):
+                self._save(status)
+
+    def stats(self):
+        """상태별 작업 수"""
+        with self._lock:
+            counts = {STATUS_QUEUED: 0, STATUS_RUNNING: 0}
+            for status in self._status.values():
+                if status["status"] in counts:
+                    counts[status["status"]] += 1
+            return counts
+
+    def submit(self, func, *args, on_skip=None, **kwargs):
+        """func(job, *args, **kwargs)를 백그라운드에서 실행하고 작업 ID 반환
+
+        실행 중/대기 중인 작업이 max_active개면 JobQueueFullError를 발생시킵니다.
+        시작 전에 취소되어 func가 실행되지 않으면 on_skip()을 대신 호출합니다
+        (작업용 임시 파일 정리 등).
+        """
+        with self._lock:
+            active = sum(
+                1 for s in self._status.values() if s["status"] in ACTIVE_STATUSES
+            )
+            if active >= self.max_active:
+                raise JobQueueFullError(
+                    f"처리 중인 작업이 {active}개로 가득 찼습니다. 잠시 후 다시 시도해주세요."
+                )
+
+            job_id = uuid.uuid4().hex
+            now = time.time()
+            status = {
+                "id": job_id,
+                "pid": os.getpid(),
+                "status": STATUS_QUEUED,
+                "stage": None,
+                "progress": 0.0,
+                "message": "대기 중...",
+                "created_at": now,
+                "updated_at": now,
+                "result": None,
+                "error": None,
+            }
+            self._status[job_id] = status
+            self._save(status)
+
+            job = Job(self, job_id)
+            future = self._pool.submit(self._run, job, func, args, kwargs, on_skip)
+            self._handles[job_id] = (job, future, on_skip)
+        return job_id
+
+    def _finish(self, job_id, fields):
+        """끝난 작업 상태를 저장하고 메모리에서 내림 (이후 조회는 상태 파일에서)"""
+        self._update(job_id, fields)
+        with self._lock:
+            self._status.pop(job_id, None)
+            self._handles.pop(job_id, None)
+            self._saved_at.pop(job_id, None)
+
+    def _skip(self, job_id, on_skip):
+        """시작하지 않은 작업을 취소 처리하고 정리 함수 호출"""
+        self._finish(job_id, {"status": STATUS_CANCELLED, "message": "취소되었습니다."})
+        if on_skip is not None:
+            on_skip()
+
+    def _run(self, job, func, args, kwargs, on_skip):
+        if job.is_cancelled():
+            # cancel()이 시작 직전에 들어와 future.cancel()이 실패한 경우
+            self._skip(job.id, on_skip)
+            return
+        self._update(job.id, {"status": STATUS_RUNNING, "message": "시작하는 중..."})
+        try:
+            result = func(job, *args, **kwargs)
+        except Exception as e:
+            if job.is_cancelled():
+                self._finish(
+                    job.id, {"status": STATUS_CANCELLED, "message": "취소되었습니다."}
+                )
+            else:
+                self._finish(
+                    job.id,
+                    {"status": STATUS_FAILED, "error": f"{type(e).__name__}: {e}"},
+                )
+        else:
+            self._finish(
+                job.id,
+                {
+                    "status": STATUS_DONE,
+                    "progress": 1.0,
+                    "message": "완료",
+                    "result": result,
+                },
+            )
+
+    def get(self, job_id):
+        """작업 상태 dict 반환 (없는 작업이면 None)"""
+        if not re.fullmatch(r"[0-9a-f]{32}", job_id or ""):
+            return None  # URL로 받은 값이 파일 경로로 쓰이지 않도록 형식 확인
+        with self._lock:
+            status = self._status.get(job_id)
+            if status is not None:
+                return dict(status)
+        return self._load(job_id)
+
+    def update_result(self, job_id, result):
+        """끝난 작업의 결과를 바꿔 저장 (페이지 일부를 다시 생성한 경우 등)"""
+        status = self.get(job_id)
+        if status is None or status["status"] != STATUS_DONE:
+            return False
+        status.update(result=result, updated_at=time.time())
+        with self._lock:
+            self._save(status)
+        return True
+
+    def cancel(self, job_id):
+        """작업 취소 요청 (실행 중이면 다음 확인 지점에서 멈춤), 요청했으면 True 반환"""
+        with self._lock:
+            handle = self._handles.get(job_id)
+        if handle is None:
+            return False
+        job, future, on_skip = handle
+        job._cancel_event.set()
+        if future.cancel():
+            # 아직 시작 전이면 바로 취소 처리
+            self._skip(job_id, on_skip)
+        return True
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager():
+    """프로세스에서 함께 쓰는 작업 관리자 반환"""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager()
+        return _manager
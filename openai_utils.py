@@ -0,0 +1,477 @@
+"""OpenAI 호출 공통 처리 (API 키별 클라이언트 풀 + 속도 제한 + 429 재시도 + 응답 캐시)"""
+
+import contextlib
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+import httpx
+import openai
+
+import text_processing
+
+# API 키별 분당 한도 (계정 등급에 맞게 조정)
+CHAT_RPM = 500  # 채팅 요청 수
+CHAT_TPM = 30_000  # 채팅 토큰 수
+IMAGE_RPM = 5  # 이미지 생성 요청 수
+
+# 재시도 설정
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0  # 첫 재시도 대기 (초)
+BACKOFF_MAX = 60.0  # 최대 재시도 대기 (초)
+
+# 클라이언트 설정
+CONNECT_TIMEOUT = 5.0  # 연결 타임아웃 (초)
+READ_TIMEOUT = 120.0  # 응답 타임아웃 (초, 이미지 생성은 오래 걸릴 수 있음)
+MAX_CONNECTIONS = 20  # API 키별 최대 동시 연결 수
+MAX_KEEPALIVE_CONNECTIONS = 10  # 재사용을 위해 열어 둘 연결 수
+CLIENT_IDLE_SECONDS = 600  # 이 시간 동안 쓰이지 않은 클라이언트는 닫음
+
+# 채팅 응답 캐시 설정 (같은 모델/메시지/파라미터면 API를 다시 부르지 않음)
+RESPONSE_CACHE_PATH = os.path.join(tempfile.gettempdir(), "blogclip_llm_cache.sqlite3")
+RESPONSE_CACHE_TTL_SECONDS = 7 * 24 * 3600  # 보관 기간
+RESPONSE_CACHE_MAX_BYTES = 100 * 1024 * 1024  # 넘으면 오래 안 쓴 응답부터 삭제
+
+## API 키별 제한기/클라이언트는 모든 세션이 공유
+_limiters = {}
+_limiters_lock = threading.Lock()
+_clients = {}  # 키 해시 -> {"client": OpenAI, "last_used": 시각}
+_session_keys = {}  # 세션 ID -> {"key_id": 키 해시, "last_seen": 마지막 활동 시각}
+_client_holds = {}  # 키 해시 -> 클라이언트를 쓰는 중인 백그라운드 작업 수
+_released_keys = set()  # 세션에서 빠졌지만 작업이 끝나면 닫을 키 해시
+_clients_lock = threading.Lock()
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+class TokenBucket:
+    """분당 한도만큼 초 단위로 다시 채워지는 토큰 버킷"""
+
+    def __init__(self, per_minute):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+
+    def reserve(self, amount, now):
+        """amount만큼 미리 차감하고 기다려야 하는 시간(초) 반환"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= min(amount, self.capacity)
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class RateLimiter:
+    """요청 수(RPM)와 토큰 수(TPM)를 따로 제한하고 대기 지표를 기록"""
+
+    def __init__(self, rpm, tpm=None):
+        self._lock = threading.Lock()
+        self._requests = TokenBucket(rpm)
+        self._tokens = TokenBucket(tpm) if tpm else None
+        self._paused_until = 0.0
+        self.calls = 0
+        self.waiting = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def acquire(self, tokens=0):
+        """한도 안에서 호출할 수 있을 때까지 대기하고 대기한 시간 반환"""
+        with self._lock:
+            now = time.monotonic()
+            wait = self._requests.reserve(1, now)
+            if self._tokens and tokens:
+                wait = max(wait, self._tokens.reserve(tokens, now))
+            wait = max(wait, self._paused_until - now)
+            self.calls += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            if wait > 0:
+                self.waiting += 1
+
+        if wait > 0:
+            try:
+                time.sleep(wait)
+            finally:
+                with self._lock:
+                    self.waiting -= 1
+        return wait
+
+    def pause(self, seconds):
+        """429 응답을 받으면 같은 키의 다른 호출도 함께 쉬도록 일시 정지"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def stats(self):
+        """대기열 길이와 대기 시간 지표"""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "waiting": self.waiting,
+                "total_wait": self.total_wait,
+                "avg_wait": self.total_wait / self.calls if self.calls else 0.0,
+                "max_wait": self.max_wait,
+            }
+
+
+def _key_id(api_key):
+    # API 키 원문을 메모리 딕셔너리 키로 들고 있지 않도록 해시 사용
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+
+
+def _close_client(key_id):
+    # _clients_lock을 잡은 상태에서 호출
+    _released_keys.discard(key_id)
+    entry = _clients.pop(key_id, None)
+    if entry:
+        entry["client"].close()
+
+
+def _keys_in_use():
+    # _clients_lock을 잡은 상태에서 호출
+    in_use = {binding["key_id"] for binding in _session_keys.values()}
+    in_use.update(_client_holds)
+    return in_use
+
+
+def _evict_idle_clients(now):
+    # 오래 활동이 없는 세션(닫힌 브라우저 탭 등)의 키 기록부터 지움
+    for session_id, binding in list(_session_keys.items()):
+        if now - binding["last_seen"] > CLIENT_IDLE_SECONDS:
+            del _session_keys[session_id]
+    in_use = _keys_in_use()
+    for key_id, entry in list(_clients.items()):
+        if key_id not in in_use and now - entry["last_used"] > CLIENT_IDLE_SECONDS:
+            _close_client(key_id)
+
+
+def get_client(api_key):
+    """API 키별로 커넥션 풀을 재사용하는 OpenAI 클라이언트 반환"""
+    key_id = _key_id(api_key)
+    now = time.monotonic()
+    with _clients_lock:
+        _evict_idle_clients(now)
+        entry = _clients.get(key_id)
+        if entry is None:
+            timeout = httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT)
+            http_client = httpx.Client(
+                timeout=timeout,
+                limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                ),
+            )
+            # 재시도는 call_with_retry에서 일괄 처리
+            client = openai.OpenAI(
+                api_key=api_key, max_retries=0, timeout=timeout, http_client=http_client
+            )
+            entry = _clients[key_id] = {"client": client, "last_used": now}
+        entry["last_used"] = now
+        return entry["client"]
+
+
+def close_clients():
+    """열려 있는 모든 클라이언트의 연결 닫기 (배치 작업 종료 시)"""
+    with _clients_lock:
+        for key_id in list(_clients):
+            _close_client(key_id)
+
+
+def bind_session(session_id, api_key):
+    """세션이 사용하는 API 키와 활동 시각 기록 (화면을 다시 그릴 때마다 호출)
+
+    키가 바뀌거나 지워지면 다른 세션이 쓰지 않는 이전 키의 클라이언트를 바로 닫습니다.
+    그 키로 도는 작업(hold_client)이 있으면 작업이 끝날 때 닫습니다.
+    CLIENT_IDLE_SECONDS 동안 활동이 없는 세션의 기록과 클라이언트는 유휴 정리
+    (_evict_idle_clients)가 버립니다.
+    """
+    key_id = _key_id(api_key) if api_key else None
+    now = time.monotonic()
+    with _clients_lock:
+        previous = _session_keys.get(session_id, {}).get("key_id")
+        if key_id:
+            _session_keys[session_id] = {"key_id": key_id, "last_seen": now}
+            _released_keys.discard(key_id)
+        else:
+            _session_keys.pop(session_id, None)
+        if previous and previous != key_id:
+            if previous in _keys_in_use():
+                _released_keys.add(previous)
+            else:
+                _close_client(previous)
+        _evict_idle_clients(now)
+
+
+@contextlib.contextmanager
+def hold_client(api_key):
+    """이 블록이 끝날 때까지 API 키의 클라이언트를 유휴 정리에서 제외 (백그라운드 작업용)"""
+    key_id = _key_id(api_key)
+    with _clients_lock:
+        _client_holds[key_id] = _client_holds.get(key_id, 0) + 1
+    try:
+        yield
+    finally:
+        with _clients_lock:
+            _client_holds[key_id] -= 1
+            if not _client_holds[key_id]:
+                del _client_holds[key_id]
+            # 작업 중에 세션에서 빠진 키는 더 쓰는 곳이 없으면 바로 닫음
+            if key_id in _released_keys and key_id not in _keys_in_use():
+                _close_client(key_id)
+
+
+def get_rate_limiter(api_key, kind):
+    """API 키와 호출 종류("chat" 또는 "image")별로 공유되는 제한기 반환"""
+    key = (_key_id(api_key), kind)
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            if kind == "image":
+                limiter = RateLimiter(IMAGE_RPM)
+            else:
+                limiter = RateLimiter(CHAT_RPM, CHAT_TPM)
+            _limiters[key] = limiter
+        return limiter
+
+
+def limiter_stats(api_key):
+    """API 키의 호출 종류별 제한기 지표"""
+    key_id = _key_id(api_key)
+    with _limiters_lock:
+        items = [(kind, lim) for (k, kind), lim in _limiters.items() if k == key_id]
+    return {kind: limiter.stats() for kind, limiter in items}
+
+
+def estimate_chat_tokens(messages, max_output_tokens=1000):
+    """채팅 요청 하나가 TPM 한도에서 차지할 토큰 수 추정"""
+    return (
+        sum(text_processing.estimate_tokens(m.get("content") or "") for m in messages)
+        + max_output_tokens
+    )
+
+
+def _retry_after(error):
+    """응답 헤더의 Retry-After 값(초) 반환 (없으면 None)"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        pass
+    return None
+
+
+def _is_retryable(error):
+    if isinstance(error, openai.RateLimitError):
+        # 요금 한도 초과는 기다려도 풀리지 않음
+        return getattr(error, "code", None) != "insufficient_quota"
+    return isinstance(error, (openai.APIConnectionError, openai.InternalServerError))
+
+
+def call_with_retry(api_key, kind, func, *args, tokens=0, **kwargs):
+    """속도 제한을 지키며 func를 호출하고, 429/일시 오류는 지수 백오프로 재시도
+
+    Retry-After 헤더가 있으면 그 시간만큼, 없으면 지터를 섞은 지수 백오프만큼
+    기다린 뒤 다시 시도합니다.
+    """
+    limiter = get_rate_limiter(api_key, kind)
+    for attempt in range(MAX_RETRIES + 1):
+        limiter.acquire(tokens)
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            if attempt == MAX_RETRIES or not _is_retryable(e):
+                raise
+            delay = _retry_after(e)
+            if delay is None:
+                backoff = min(BACKOFF_MAX, BACKOFF_BASE * 2**attempt)
+                delay = backoff / 2 + random.uniform(0, backoff / 2)
+            else:
+                delay += random.uniform(0, BACKOFF_BASE)
+            if isinstance(e, openai.RateLimitError):
+                limiter.pause(delay)
+            else:
+                time.sleep(delay)
+
+
+class ResponseCache:
+    """모델·메시지·파라미터 해시로 채팅 응답을 저장하는 SQLite 캐시 (TTL + LRU 삭제)"""
+
+    def __init__(
+        self,
+        path=RESPONSE_CACHE_PATH,
+        ttl_seconds=RESPONSE_CACHE_TTL_SECONDS,
+        max_bytes=RESPONSE_CACHE_MAX_BYTES,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model, messages, params=None):
+        """요청 내용을 정렬된 JSON으로 만들어 SHA-256 키 생성"""
+        payload = json.dumps(
+            {"model": model, "messages": messages, "params": params or {}},
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """보관 기간 안의 응답 반환 (없으면 None)"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE responses SET last_used = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, response):
+        """응답 저장 후 만료/용량 초과 항목 정리"""
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                    (key, response, size, now, now),
+                )
+                self._conn.execute(
+                    "DELETE FROM responses WHERE created < ?",
+                    (now - self.ttl_seconds,),
+                )
+                total = self._conn.execute(
+                    "SELECT COALESCE(SUM(size), 0) FROM responses"
+                ).fetchone()[0]
+                if total > self.max_bytes:
+                    for old_key, old_size in self._conn.execute(
+                        "SELECT key, size FROM responses ORDER BY last_used"
+                    ).fetchall():
+                        if total <= self.max_bytes:
+                            break
+                        self._conn.execute(
+                            "DELETE FROM responses WHERE key = ?", (old_key,)
+                        )
+                        total -= old_size
+
+    def stats(self):
+        """캐시 적중/미스 횟수와 보관 중인 응답 수"""
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": count}
+
+
+def get_response_cache():
+    """프로세스 전체에서 공유하는 채팅 응답 캐시 반환"""
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache()
+        return _response_cache
+
+
+def chat_completion(api_key, model, messages, use_cache=True, validate=None, **params):
+    """채팅 완성 결과 텍스트 반환 (캐시 → 속도 제한/재시도 순으로 처리)
+
+    use_cache=False면 캐시를 읽지 않고 새로 호출한 뒤 결과로 캐시를 갱신합니다.
+    validate(텍스트)를 주면 예외 없이 통과한 응답만 캐시에 저장하고 반환하며,
+    통과하지 못한 응답은 캐시하지 않고 그 예외를 그대로 발생시킵니다.
+    """
+    cache = get_response_cache()
+    key = cache.make_key(model, messages, params)
+    if use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            try:
+                if validate:
+                    validate(cached)
+                return cached
+            except Exception:
+                pass  # 예전에 저장된 잘못된 응답은 무시하고 새로 호출
+
+    response = call_with_retry(
+        api_key,
+        "chat",
+        get_client(api_key).chat.completions.create,
+        model=model,
+        messages=messages,
+        tokens=estimate_chat_tokens(messages),
+        **params,
+    )
+    text = response.choices[0].message.content.strip()
+    if validate:
+        validate(text)
+    cache.put(key, text)
+    return text
+
+
+def chat_completion_stream(api_key, model, messages, use_cache=True, **params):
+    """채팅 완성 결과를 도착하는 대로 텍스트 조각 단위로 yield
+
+    캐시 키는 chat_completion과 같아서 두 함수가 캐시를 함께 씁니다.
+    캐시 적중 시에는 저장된 전체 응답을 한 번에 yield 합니다.
+    """
+    cache = get_response_cache()
+    key = cache.make_key(model, messages, params)
+    if use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+    # 재시도는 스트림이 열리기 전까지만 (이미 받은 조각을 되돌릴 수 없음)
+    stream = call_with_retry(
+        api_key,
+        "chat",
+        get_client(api_key).chat.completions.create,
+        model=model,
+        messages=messages,
+        stream=True,
+        tokens=estimate_chat_tokens(messages),
+        **params,
+    )
+    parts = []
+    try:
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                yield delta
+    finally:
+        # 중간에 멈춰도(취소 등) 응답 연결을 바로 돌려줌
+        stream.close()
+    cache.put(key, "".join(parts).strip())
@@ -0,0 +1,275 @@
+"""PDF 텍스트 추출 백엔드 (pypdf, pypdfium2, pdfminer, langchain) 선택과 대체
+
+사용할 백엔드 순서는 배포 환경마다 환경 변수 BLOGCLIP_PDF_BACKEND에
+"pypdfium2,pypdf"처럼 지정합니다. 지정하지 않으면 pdf_benchmark.py --save로
+저장한 순위 파일을, 그것도 없으면 DEFAULT_BACKEND_ORDER를 씁니다.
+앞의 백엔드가 파일을 열거나 페이지를 읽다 실패하면 다음 백엔드로 이어서 추출합니다.
+"""
+
+import contextlib
+import ctypes
+import importlib.util
+import io
+import json
+import os
+import threading
+
+BACKEND_PYPDF = "pypdf"
+BACKEND_PYPDFIUM2 = "pypdfium2"
+BACKEND_PDFMINER = "pdfminer"
+BACKEND_LANGCHAIN = "langchain"
+
+DEFAULT_BACKEND_ORDER = (BACKEND_PYPDF, BACKEND_PYPDFIUM2, BACKEND_PDFMINER)
+BACKEND_ENV = "BLOGCLIP_PDF_BACKEND"  # 배포별 백엔드 순서 (쉼표로 구분)
+RANKING_ENV = "BLOGCLIP_PDF_BACKEND_RANKING"  # 벤치마크 순위 파일 경로
+DEFAULT_RANKING_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "pdf_backend_ranking.json"
+)
+
+_order = None
+_order_lock = threading.Lock()
+_pdfium_lock = threading.Lock()  # PDFium은 스레드 안전하지 않으므로 호출을 직렬화
+
+
+def _is_path(source):
+    return isinstance(source, (str, os.PathLike))
+
+
+def _as_buffer(source):
+    """업로드 파일(BytesIO)은 복사하지 않고 내부 버퍼를 그대로 가리키는 ctypes 배열로"""
+    if hasattr(source, "getbuffer"):
+        view = source.getbuffer()
+        return (ctypes.c_char * len(view)).from_buffer(view)
+    return source if isinstance(source, bytes) else bytes(source)
+
+
+def _open_binary(source):
+    """파일 경로, 업로드 파일(BytesIO) 또는 bytes를 읽기용 바이너리 파일 객체로
+
+    업로드 파일은 복사하지 않고 처음으로 되감아 그대로 쓰며, 블록이 끝나도 닫지 않습니다.
+    """
+    if _is_path(source):
+        return open(source, "rb")
+    if hasattr(source, "seek"):
+        source.seek(0)
+        return contextlib.nullcontext(source)
+    return io.BytesIO(source)
+
+
+class PdfBackend:
+    """추출 백엔드 공통 인터페이스"""
+
+    name = None
+    module = None  # 설치 여부를 확인할 모듈 이름
+
+    def available(self):
+        return importlib.util.find_spec(self.module) is not None
+
+    def page_count(self, source):
+        raise NotImplementedError
+
+    def iter_pages(self, source, start=0, stop=None):
+        """문서를 한 번 열어 start 페이지부터 stop 전까지 (전체 페이지 수, 텍스트)를 yield"""
+        raise NotImplementedError
+
+
+class PypdfBackend(PdfBackend):
+    """pypdf 직접 사용 (langchain PyPDFLoader와 같은 텍스트, 무거운 import 없음)"""
+
+    name = BACKEND_PYPDF
+    module = "pypdf"
+
+    def _reader(self, source):
+        from pypdf import PdfReader
+
+        if _is_path(source):
+            return PdfReader(source)
+        if hasattr(source, "seek"):
+            source.seek(0)
+            return PdfReader(source)
+        return PdfReader(io.BytesIO(source))
+
+    def page_count(self, source):
+        return len(self._reader(source).pages)
+
+    def iter_pages(self, source, start=0, stop=None):
+        reader = self._reader(source)
+        total = len(reader.pages)
+        stop = total if stop is None else min(stop, total)
+        for page_no in range(start, stop):
+            yield total, reader.pages[page_no].extract_text()
+
+
+class PdfiumBackend(PdfBackend):
+    """PDFium(C++) 기반 pypdfium2, 순수 Python 파서보다 훨씬 빠름"""
+
+    name = BACKEND_PYPDFIUM2
+    module = "pypdfium2"
+
+    def _document(self, source):
+        import pypdfium2
+
+        return pypdfium2.PdfDocument(source if _is_path(source) else _as_buffer(source))
+
+    def page_count(self, source):
+        with _pdfium_lock:
+            pdf = self._document(source)
+            try:
+                return len(pdf)
+            finally:
+                pdf.close()
+
+    def iter_pages(self, source, start=0, stop=None):
+        with _pdfium_lock:
+            pdf = self._document(source)
+        try:
+            total = len(pdf)
+            stop = total if stop is None else min(stop, total)
+            for page_no in range(start, stop):
+                with _pdfium_lock:
+                    page = pdf[page_no]
+                    text_page = page.get_textpage()
+                    text = text_page.get_text_range()
+                    text_page.close()
+                    page.close()
+                # PDFium은 줄바꿈을 \r\n으로 돌려줌
+                yield total, text.replace("\r\n", "\n")
+        finally:
+            with _pdfium_lock:
+                pdf.close()
+
+
+class PdfminerBackend(PdfBackend):
+    """pdfminer.six, 느리지만 레이아웃 분석으로 읽기 순서가 정확한 편"""
+
+    name = BACKEND_PDFMINER
+    module = "pdfminer"
+
+    def page_count(self, source):
+        from pdfminer.pdfdocument import PDFDocument
+        from pdfminer.pdfparser import PDFParser
+        from pdfminer.pdftypes import resolve1
+
+        with _open_binary(source) as f:
+            document = PDFDocument(PDFParser(f))
+            return resolve1(document.catalog["Pages"])["Count"]
+
+    def iter_pages(self, source, start=0, stop=None):
+        from pdfminer.converter import TextConverter
+        from pdfminer.layout import LAParams
+        from pdfminer.pdfdocument import PDFDocument
+        from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+        from pdfminer.pdfpage import PDFPage
+        from pdfminer.pdfparser import PDFParser
+        from pdfminer.pdftypes import resolve1
+
+        resources = PDFResourceManager()
+        output = io.StringIO()
+        device = TextConverter(resources, output, laparams=LAParams())
+        interpreter = PDFPageInterpreter(resources, device)
+        try:
+            with _open_binary(source) as f:
+                # 페이지 수와 페이지 모두 같은 파싱 결과에서 읽음
+                document = PDFDocument(PDFParser(f))
+                total = resolve1(document.catalog["Pages"])["Count"]
+                for page_no, page in enumerate(PDFPage.create_pages(document)):
+                    if stop is not None and page_no >= stop:
+                        break
+                    if page_no < start:
+                        continue
+                    output.seek(0)
+                    output.truncate()
+                    interpreter.process_page(page)
+                    yield total, output.getvalue().strip("\f")
+        finally:
+            device.close()
+
+
+class LangchainBackend(PdfBackend):
+    """기존 방식인 langchain PyPDFLoader (파일 경로만 지원)"""
+
+    name = BACKEND_LANGCHAIN
+    module = "langchain_community"
+
+    def page_count(self, source):
+        return PypdfBackend().page_count(source)
+
+    def iter_pages(self, source, start=0, stop=None):
+        if not _is_path(source):
+            raise ValueError("langchain 백엔드는 파일 경로만 지원합니다.")
+        from langchain_community.document_loaders import PyPDFLoader
+
+        documents = PyPDFLoader(source).load()
+        for document in documents[start:stop]:
+            yield len(documents), document.page_content
+
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (
+        PypdfBackend(),
+        PdfiumBackend(),
+        PdfminerBackend(),
+        LangchainBackend(),
+    )
+}
+
+
+def _configured_names():
+    value = os.environ.get(BACKEND_ENV, "").strip()
+    if value:
+        return [name.strip() for name in value.split(",") if name.strip()]
+    try:
+        with open(os.environ.get(RANKING_ENV, DEFAULT_RANKING_PATH), "r") as f:
+            return json.load(f)["order"]
+    except (OSError, ValueError, KeyError):
+        return list(DEFAULT_BACKEND_ORDER)
+
+
+def backend_order():
+    """이 배포에서 시도할 백엔드 이름 순서 (설치된 것만, 목록에 pypdf가 없으면 마지막 대체 수단으로 추가)"""
+    global _order
+    with _order_lock:
+        if _order is None:
+            names = [
+                name
+                for name in _configured_names()
+                if name in BACKENDS and BACKENDS[name].available()
+            ]
+            if BACKEND_PYPDF not in names:
+                names.append(BACKEND_PYPDF)
+            _order = tuple(dict.fromkeys(names))
+        return _order
+
+
+def page_count(source, backends=None):
+    """PDF 페이지 수 (백엔드가 실패하면 다음 백엔드로)"""
+    error = None
+    for name in backends or backend_order():
+        try:
+            return BACKENDS[name].page_count(source)
+        except Exception as e:
+            error = e
+    raise error
+
+
+def iter_pages(source, start=0, stop=None, backends=None):
+    """(페이지 번호, 전체 페이지 수, 텍스트)를 yield, 백엔드가 실패한 페이지부터 다음 백엔드로 이어감"""
+    error = None
+    page_no = start
+    for name in backends or backend_order():
+        backend = BACKENDS[name]
+        try:
+            # 페이지 수는 페이지를 읽는 백엔드가 같은 문서에서 함께 알려 줌 (PDF를 한 번만 파싱)
+            for total, text in backend.iter_pages(source, page_no, stop):
+                yield page_no, total, text
+                page_no += 1
+            return
+        except Exception as e:
+            error = e
+    raise error
+
+
+def extract_pages(source, start=0, stop=None, backends=None):
+    """start~stop 페이지 텍스트 리스트 (stop=None이면 끝까지)"""
+    return [text for _, _, text in iter_pages(source, start, stop, backends)]
@@ -0,0 +1,219 @@
+"""PDF 추출 백엔드 벤치마크 (처리 속도, 메모리, 텍스트 정확도)
+
+사용 예:
+    python pdf_benchmark.py                      # 저장소의 샘플 PDF로 측정
+    python pdf_benchmark.py corpus/ --repeat 3 --save
+
+백엔드마다 새 프로세스에서 측정해 import와 메모리 사용량이 서로 섞이지 않게 합니다.
+정확도는 PDF와 같은 이름의 .txt 정답 파일이 있으면 그것과, 없으면 기준 백엔드
+(--reference) 결과와 비교한 단어 F1 점수입니다.
+--save를 주면 정확도 기준을 넘는 백엔드를 빠른 순서로 순위 파일에 저장하고,
+BLOGCLIP_PDF_BACKEND를 지정하지 않은 배포는 이 순서대로 백엔드를 씁니다.
+"""
+
+import argparse
+import glob
+import importlib
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import pdf_backends
+
+DEFAULT_CORPUS_DIR = os.path.dirname(os.path.abspath(__file__))  # 샘플 PDF 위치
+DEFAULT_REPEAT = 3  # 파일마다 반복 추출 횟수
+MIN_FIDELITY = 0.9  # 자동 선택 후보가 되기 위한 최소 단어 F1
+
+
+def collect_corpus(paths):
+    """파일/폴더 경로 목록에서 PDF 파일 목록 생성 (폴더는 바로 아래 *.pdf)"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "*.pdf"))))
+        else:
+            files.append(path)
+    return files
+
+
+def _measure(name, files, repeat):
+    """새 프로세스에서 실행: 백엔드 하나로 코퍼스를 repeat번 추출해 측정"""
+    importlib.import_module(pdf_backends.BACKENDS[name].module)
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    texts = {}
+    errors = {}
+    pages = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for path in files:
+            try:
+                extracted = pdf_backends.extract_pages(path, backends=[name])
+            except Exception as e:
+                errors[path] = f"{type(e).__name__}: {e}"
+                continue
+            pages += len(extracted)
+            texts[path] = "\n".join(extracted)
+    seconds = time.perf_counter() - started
+
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "backend": name,
+        "pages": pages,
+        "seconds": seconds,
+        "pages_per_second": pages / seconds if seconds else 0.0,
+        "peak_mb": (peak_kb - baseline_kb) / 1024,
+        "errors": errors,
+        "texts": texts,
+    }
+
+
+def word_f1(text, reference):
+    """두 텍스트의 단어(공백 기준) 다중집합 F1 점수"""
+    words = Counter(text.split())
+    reference_words = Counter(reference.split())
+    overlap = sum((words & reference_words).values())
+    if not overlap:
+        return 0.0
+    precision = overlap / sum(words.values())
+    recall = overlap / sum(reference_words.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def _ground_truth(path):
+    """PDF 옆의 같은 이름 .txt 정답 파일 내용 (없으면 None)"""
+    try:
+        with open(os.path.splitext(path)[0] + ".txt", encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def run_benchmark(files, backends, repeat=DEFAULT_REPEAT, reference=None):
+    """백엔드별 측정 결과 리스트 반환 (fidelity는 파일별 단어 F1 평균)"""
+    results = []
+    spawn = multiprocessing.get_context("spawn")
+    for name in backends:
+        with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+            results.append(pool.submit(_measure, name, files, repeat).result())
+
+    by_name = {result["backend"]: result for result in results}
+    for result in results:
+        scores = []
+        for path in files:
+            if path not in result["texts"]:
+                scores.append(0.0)
+                continue
+            expected = _ground_truth(path)
+            if expected is None and reference in by_name:
+                expected = by_name[reference]["texts"].get(path)
+            if expected is not None:
+                scores.append(word_f1(result["texts"][path], expected))
+        result["fidelity"] = sum(scores) / len(scores) if scores else None
+    return results
+
+
+def rank_backends(results, min_fidelity=MIN_FIDELITY):
+    """실패가 없고 정확도 기준을 넘는 백엔드를 빠른 순서로 정렬한 이름 목록"""
+    candidates = [
+        result
+        for result in results
+        if not result["errors"]
+        and (result["fidelity"] is None or result["fidelity"] >= min_fidelity)
+    ]
+    candidates.sort(key=lambda result: -result["pages_per_second"])
+    return [result["backend"] for result in candidates]
+
+
+def _print_results(results):
+    print(
+        f"{'백엔드':<12}{'페이지/초':>12}{'메모리(MB)':>12}{'정확도(F1)':>12}{'실패':>6}"
+    )
+    for result in results:
+        fidelity = "-" if result["fidelity"] is None else f"{result['fidelity']:.3f}"
+        print(
+            f"{result['backend']:<12}{result['pages_per_second']:>12.1f}"
+            f"{result['peak_mb']:>12.1f}{fidelity:>12}{len(result['errors']):>6}"
+        )
+        for path, error in result["errors"].items():
+            print(f"    ⚠️ {os.path.basename(path)}: {error}")
+
+
+def main(argv=None):
+    available = [
+        name for name, backend in pdf_backends.BACKENDS.items() if backend.available()
+    ]
+    parser = argparse.ArgumentParser(description="PDF 추출 백엔드 벤치마크")
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        default=[DEFAULT_CORPUS_DIR],
+        help="PDF 파일 또는 PDF가 든 폴더 (기본값: 저장소의 샘플 PDF)",
+    )
+    parser.add_argument(
+        "--backends",
+        default=",".join(available),
+        help=f"측정할 백엔드 (쉼표로 구분, 기본값: 설치된 전체 {','.join(available)})",
+    )
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument(
+        "--reference",
+        default=(
+            pdf_backends.BACKEND_PDFMINER
+            if pdf_backends.BACKEND_PDFMINER in available
+            else pdf_backends.BACKEND_PYPDF
+        ),
+        help=".txt 정답 파일이 없을 때 정확도 기준으로 쓸 백엔드",
+    )
+    parser.add_argument("--min-fidelity", type=float, default=MIN_FIDELITY)
+    parser.add_argument(
+        "--save",
+        nargs="?",
+        const=pdf_backends.DEFAULT_RANKING_PATH,
+        help="자동 선택 순위를 저장할 파일 (경로 생략 시 앱이 읽는 기본 위치)",
+    )
+    args = parser.parse_args(argv)
+
+    files = collect_corpus(args.paths)
+    if not files:
+        parser.error("측정할 PDF가 없습니다.")
+    backends = [name.strip() for name in args.backends.split(",") if name.strip()]
+    unknown = [name for name in backends if name not in available]
+    if unknown:
+        parser.error(f"설치되지 않았거나 없는 백엔드입니다: {', '.join(unknown)}")
+
+    print(f"📄 PDF {len(files)}개 × {args.repeat}회, 백엔드 {', '.join(backends)}")
+    results = run_benchmark(files, backends, args.repeat, args.reference)
+    _print_results(results)
+
+    order = rank_backends(results, args.min_fidelity)
+    if not order:
+        print("❌ 정확도 기준을 넘는 백엔드가 없습니다.")
+        return 1
+    print(f"✅ 추천 순서: {pdf_backends.BACKEND_ENV}={','.join(order)}")
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "order": order,
+                    "files": len(files),
+                    "results": [
+                        {k: v for k, v in result.items() if k != "texts"}
+                        for result in results
+                    ],
+                },
+                f,
+                indent=2,
+                ensure_ascii=False,
+            )
+        print(f"💾 순위 저장: {args.save}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,458 @@
+"""CSV URL 목록용 PDF 다운로드 엔진 (호스트별 세션 풀 + 동시 다운로드)"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# 기본 설정값
+CONNECT_TIMEOUT = 5  # 연결 타임아웃 (초)
+READ_TIMEOUT = 30  # 읽기 타임아웃 (초)
+MAX_WORKERS = 8  # 전체 동시 다운로드 수
+MAX_PER_HOST = 4  # 호스트별 동시 다운로드 수
+MAX_DOWNLOAD_BYTES = 100 * 1024 * 1024  # 파일당 최대 크기 (100MB)
+CHUNK_SIZE = 64 * 1024  # 스트리밍 청크 크기
+MAX_RESUME_ATTEMPTS = 3  # 연결이 끊겼을 때 이어받기 재시도 횟수
+
+# HTTP 캐시 설정 (재실행 시 변경 없는 PDF는 304 한 번으로 끝냄)
+HTTP_CACHE_DIR = os.path.join(tempfile.gettempdir(), "blogclip_http_cache")
+HTTP_CACHE_MAX_BYTES = 1024 * 1024 * 1024  # 1GB 넘으면 오래 안 쓴 것부터 삭제
+
+# 상태 표시용 문구
+STATUS_PENDING = "대기"
+STATUS_RUNNING = "다운로드 중"
+STATUS_DONE = "완료"
+STATUS_FAILED = "실패"
+
+## 호스트별 세션은 프로세스 전체에서 공유
+_sessions = {}
+_pool_sizes = {}  # 호스트 -> 세션 커넥션 풀 크기
+_lock = threading.Lock()
+_http_cache = None
+
+
+class DownloadTooLargeError(Exception):
+    """다운로드 크기가 허용 한도를 넘을 때 발생"""
+
+
+def _host_of(url):
+    return urlsplit(url).netloc.lower()
+
+
+def get_session(host, max_per_host=MAX_PER_HOST):
+    """호스트별로 커넥션 풀을 재사용하는 세션 반환
+
+    이미 만든 세션의 풀이 max_per_host보다 작으면 더 큰 풀로 바꿔 끼웁니다.
+    """
+    with _lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = _sessions[host] = requests.Session()
+        if _pool_sizes.get(host, 0) < max_per_host:
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_per_host)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _pool_sizes[host] = max_per_host
+        return session
+
+
+def normalize_url(url):
+    """캐시 키로 쓸 URL 정규화 (scheme/host 소문자, 기본 포트·fragment 제거, 쿼리 정렬)"""
+    return normalize_url_parts(urlsplit(url.strip()))
+
+
+def normalize_url_parts(parts, drop_param=None):
+    """urlsplit 결과로 normalize_url과 같은 정규화 (drop_param(이름)이 참인 쿼리 파라미터는 제외)"""
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if ":" in host:
+        host = f"[{host}]"  # IPv6 주소는 대괄호를 다시 씌움
+    port = parts.port
+    if port and not (
+        (scheme == "http" and port == 80) or (scheme == "https" and port == 443)
+    ):
+        host = f"{host}:{port}"
+    query = ""
+    if parts.query:
+        params = parse_qsl(parts.query, keep_blank_values=True)
+        if drop_param is not None:
+            params = [(name, value) for name, value in params if not drop_param(name)]
+        query = urlencode(sorted(params))
+    return urlunsplit((scheme, host, parts.path or "/", query, ""))
+
+
+class HttpCache:
+    """ETag/Last-Modified 기반 조건부 GET용 디스크 캐시 (크기 기준 LRU 삭제)"""
+
+    def __init__(self, cache_dir=HTTP_CACHE_DIR, max_bytes=HTTP_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._index_path = os.path.join(cache_dir, "index.json")
+        os.makedirs(cache_dir, exist_ok=True)
+        self._index = self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # 본문 파일이 사라진 항목은 버림
+        return {
+            key: entry
+            for key, entry in index.items()
+            if os.path.exists(self._body_path(key))
+        }
+
+    def _save_index(self):
+        tmp_path = self._index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._index, f, ensure_ascii=False)
+        os.replace(tmp_path, self._index_path)
+
+    def _body_path(self, key):
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.bin")
+
+    def conditional_headers(self, url):
+        """캐시된 항목이 있으면 재검증용 요청 헤더 반환"""
+        with self._lock:
+            entry = self._index.get(normalize_url(url))
+        if not entry:
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def restore(self, url, save_path):
+        """304 응답일 때 캐시된 본문을 save_path로 복사 (캐시본이 없으면 None)"""
+        key = normalize_url(url)
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                return None
+            try:
+                _link_or_copy(self._body_path(key), save_path)
+            except OSError:
+                # 본문 파일이 사라진 항목은 지워서 다음 요청이 조건 없이 받아 다시 저장하게 함
+                del self._index[key]
+                self._save_index()
+                return None
+            entry["last_used"] = time.time()
+            self.hits += 1
+            self._save_index()
+        return save_path
+
+    def store(self, url, file_path, response):
+        """새로 받은 파일을 검증 헤더와 함께 캐시에 저장"""
+        key = normalize_url(url)
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        with self._lock:
+            self.misses += 1
+            if not etag and not last_modified:
+                # 재검증할 수단이 없으면 저장하지 않음
+                return
+            size = os.path.getsize(file_path)
+            if size > self.max_bytes:
+                return
+            body_path = self._body_path(key)
+            tmp_path = body_path + ".tmp"
+            shutil.copyfile(file_path, tmp_path)
+            os.replace(tmp_path, body_path)
+            self._index[key] = {
+                "url": url,
+                "etag": etag,
+                "last_modified": last_modified,
+                "size": size,
+                "last_used": time.time(),
+            }
+            self._evict()
+            self._save_index()
+
+    def _evict(self):
+        total = sum(entry["size"] for entry in self._index.values())
+        for key, entry in sorted(
+            self._index.items(), key=lambda item: item[1]["last_used"]
+        ):
+            if total <= self.max_bytes:
+                break
+            _remove_quietly(self._body_path(key))
+            del self._index[key]
+            total -= entry["size"]
+
+    def stats(self):
+        """캐시 적중/미스 횟수와 현재 사용량"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._index),
+                "bytes": sum(entry["size"] for entry in self._index.values()),
+            }
+
+
+def get_http_cache():
+    """프로세스 전체에서 공유하는 HTTP 캐시 반환"""
+    global _http_cache
+    with _lock:
+        if _http_cache is None:
+            _http_cache = HttpCache()
+        return _http_cache
+
+
+def _link_or_copy(src, dst):
+    _remove_quietly(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+def filename_from_url(url):
+    """URL에서 저장할 파일명 추출 (쿼리스트링 제거)"""
+    filename = os.path.basename(urlsplit(url).path)
+    return filename or "download.pdf"
+
+
+def _unique_filenames(urls, save_dir):
+    """같은 이름의 파일이 서로 덮어쓰지 않도록 URL별 파일명 배정
+
+    save_dir에 이미 있는 파일(먼저 저장한 업로드 파일 등)과 겹치는 이름도 피합니다.
+    """
+    names = {}
+    used = set()
+    for url in urls:
+        name = filename_from_url(url)
+        stem, ext = os.path.splitext(name)
+        n = 1
+        while name in used or os.path.exists(os.path.join(save_dir, name)):
+            name = f"{stem}_{n}{ext}"
+            n += 1
+        used.add(name)
+        names[url] = name
+    return names
+
+
+def _total_size(response, offset):
+    """응답 헤더로부터 전체 파일 크기 계산 (알 수 없으면 None)"""
+    if response.status_code == 206:
+        content_range = response.headers.get("Content-Range", "")
+        total = content_range.rsplit("/", 1)[-1]
+        if total.isdigit():
+            return int(total)
+        offset_length = response.headers.get("Content-Length")
+        return offset + int(offset_length) if offset_length else None
+    length = response.headers.get("Content-Length")
+    return int(length) if length and length.isdigit() else None
+
+
+def download_pdf(
+    url,
+    save_path,
+    timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+    max_bytes=MAX_DOWNLOAD_BYTES,
+    max_resume_attempts=MAX_RESUME_ATTEMPTS,
+    use_cache=True,
+    max_per_host=MAX_PER_HOST,
+):
+    """URL 하나를 청크 단위로 스트리밍 다운로드
+
+    연결이 중간에 끊기면 받은 부분(.part)부터 Range 요청으로 이어받고,
+    크기가 max_bytes를 넘으면 DownloadTooLargeError로 중단합니다.
+    캐시된 파일이 있으면 조건부 GET으로 재검증해 304일 때 캐시본을 씁니다.
+    """
+    session = get_session(_host_of(url), max_per_host)
+    cache = get_http_cache() if use_cache else None
+    part_path = save_path + ".part"
+    attempts = 0
+    received = None  # 이번 호출에서 본문을 받은 마지막 응답 (캐시 검증자용)
+    final_response = None
+
+    while True:
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        if offset:
+            headers = {"Range": f"bytes={offset}-"}
+        else:
+            headers = cache.conditional_headers(url) if cache else {}
+        try:
+            with session.get(
+                url, headers=headers, stream=True, timeout=timeout
+            ) as response:
+                if response.status_code == 304 and cache:
+                    if cache.restore(url, save_path):
+                        return save_path
+                    if offset or not headers:
+                        raise requests.exceptions.HTTPError(
+                            "조건부 요청이 아닌데 304 응답을 받았습니다.",
+                            response=response,
+                        )
+                    # 그 사이 캐시본이 삭제됐다면 (항목은 restore에서 지워짐)
+                    # 조건 없이 다시 받아 평소처럼 캐시에 저장
+                    continue
+                if response.status_code == 416 and offset:
+                    total = response.headers.get("Content-Range", "").rsplit("/", 1)[-1]
+                    if total.isdigit() and int(total) != offset:
+                        # .part가 지금 서버의 파일과 맞지 않으면 처음부터 다시 받기
+                        _remove_quietly(part_path)
+                        continue
+                    # 이미 끝까지 받은 상태: 캐시할 수 있게 검증 헤더(ETag 등)가 있는
+                    # 응답을 찾음 (416 응답에는 없는 경우가 많음)
+                    final_response = received or response
+                    if cache and not _has_validators(final_response):
+                        final_response = session.head(
+                            url, timeout=timeout, allow_redirects=True
+                        )
+                    break
+                response.raise_for_status()
+                received = response
+
+                # 서버가 Range를 무시하면 처음부터 다시 받기
+                if response.status_code != 206:
+                    offset = 0
+
+                total = _total_size(response, offset)
+                if max_bytes and total and total > max_bytes:
+                    raise DownloadTooLargeError(
+                        f"파일 크기 {total} bytes가 한도 {max_bytes} bytes를 초과합니다."
+                    )
+
+                written = offset
+                with open(part_path, "ab" if offset else "wb") as f:
+                    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                        written += len(chunk)
+                        if max_bytes and written > max_bytes:
+                            raise DownloadTooLargeError(
+                                f"다운로드가 한도 {max_bytes} bytes를 초과했습니다."
+                            )
+                        f.write(chunk)
+
+                if total and written < total:
+                    raise requests.exceptions.ChunkedEncodingError(
+                        f"응답이 중간에 끊겼습니다 ({written}/{total} bytes)"
+                    )
+                final_response = response
+            break
+        except DownloadTooLargeError:
+            _remove_quietly(part_path)
+            raise
+        except (
+            requests.exceptions.ConnectionError,
+            requests.exceptions.ChunkedEncodingError,
+            requests.exceptions.ReadTimeout,
+        ):
+            attempts += 1
+            if attempts > max_resume_attempts:
+                raise
+
+    os.replace(part_path, save_path)
+    if cache and final_response is not None:
+        cache.store(url, save_path, final_response)
+    return save_path
+
+
+def _has_validators(response):
+    return bool(response.headers.get("ETag") or response.headers.get("Last-Modified"))
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def download_many(
+    urls,
+    save_dir,
+    max_workers=MAX_WORKERS,
+    max_per_host=MAX_PER_HOST,
+    timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+    max_bytes=MAX_DOWNLOAD_BYTES,
+    on_progress=None,
+    poll_interval=0.5,
+):
+    """여러 URL을 동시에 다운로드하고 URL 순서대로 결과 경로 리스트 반환
+
+    on_progress(statuses)는 호출한 스레드에서 주기적으로 불리므로
+    Streamlit 위젯을 바로 갱신해도 됩니다.
+    """
+    urls = list(urls)
+    names = _unique_filenames(urls, save_dir)
+    statuses = {
+        url: {"url": url, "status": STATUS_PENDING, "seconds": None, "error": ""}
+        for url in urls
+    }
+
+    def worker(url):
+        statuses[url]["status"] = STATUS_RUNNING
+        started = time.time()
+        try:
+            path = download_pdf(
+                url,
+                os.path.join(save_dir, names[url]),
+                timeout=timeout,
+                max_bytes=max_bytes,
+                max_per_host=max_per_host,
+            )
+            statuses[url]["status"] = STATUS_DONE
+            return path
+        except Exception as e:
+            statuses[url]["status"] = STATUS_FAILED
+            statuses[url]["error"] = str(e)
+            return None
+        finally:
+            statuses[url]["seconds"] = round(time.time() - started, 2)
+
+    # 호스트별 대기열: 작업 스레드가 기다리며 묶이지 않도록
+    # 호스트에 빈자리가 있을 때만 풀에 넣음
+    queues = {}
+    for url in urls:
+        queues.setdefault(_host_of(url), deque()).append(url)
+    running = dict.fromkeys(queues, 0)  # 호스트 -> 진행 중인 다운로드 수
+    max_workers = max(1, max_workers)
+    futures = {}
+
+    def submit_ready():
+        emptied = []
+        for host, queue in queues.items():
+            if len(futures) >= max_workers:
+                break
+            while queue and running[host] < max_per_host and len(futures) < max_workers:
+                url = queue.popleft()
+                running[host] += 1
+                futures[pool.submit(worker, url)] = url
+            if not queue:
+                emptied.append(host)
+        for host in emptied:
+            del queues[host]
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        submit_ready()
+        while futures:
+            done, _ = wait(futures, timeout=poll_interval, return_when=FIRST_COMPLETED)
+            for future in done:
+                url = futures.pop(future)
+                running[_host_of(url)] -= 1
+                results[url] = future.result()
+            submit_ready()
+            if on_progress:
+                on_progress(list(statuses.values()))
+
+    return [results.get(url) for url in urls]
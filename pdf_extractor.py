@@ -0,0 +1,449 @@
+"""PDF 텍스트 추출 + 파일 내용(SHA-256) 기반 추출 결과 캐시"""
+
+import contextlib
+import hashlib
+import itertools
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pdf_backends
+
+# 추출 캐시 설정 (모든 세션이 공유하고 재시작 후에도 유지)
+TEXT_CACHE_PATH = os.path.join(tempfile.gettempdir(), "blogclip_text_cache.sqlite3")
+TEXT_CACHE_MAX_CHARS = 200_000_000  # 캐시에 보관할 최대 글자 수
+
+# 병렬 추출 설정
+EXTRACT_WORKERS = max(1, (os.cpu_count() or 2) - 1)  # 추출 프로세스 수
+LARGE_PDF_PAGES = 200  # 이 페이지 수 이상인 파일은 페이지 구간 단위로 나눠 추출
+PAGE_RANGE_SIZE = 50  # 구간 하나에 포함할 페이지 수
+
+_text_cache = None
+_text_cache_lock = threading.Lock()
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def file_sha256(file_path, chunk_size=1024 * 1024):
+    """파일 내용을 청크 단위로 읽어 SHA-256 해시 계산"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _is_path(source):
+    return isinstance(source, (str, os.PathLike))
+
+
+def source_name(source):
+    """경고 메시지 등에 표시할 PDF 이름 (경로 또는 업로드 파일)"""
+    if _is_path(source):
+        return os.path.basename(source)
+    return getattr(source, "name", "업로드 파일")
+
+
+def source_sha256(source):
+    """PDF 원본(파일 경로 또는 메모리 버퍼)의 SHA-256 해시"""
+    if _is_path(source):
+        return file_sha256(source)
+    if hasattr(source, "getbuffer"):
+        # 업로드 파일 버퍼를 복사하지 않고 그대로 해시
+        with source.getbuffer() as view:
+            return hashlib.sha256(view).hexdigest()
+    return hashlib.sha256(source).hexdigest()
+
+
+def cache_key(source):
+    """추출 캐시 키 (같은 파일이라도 백엔드마다 텍스트가 달라 백엔드 이름 포함)"""
+    return f"{source_sha256(source)}:{pdf_backends.backend_order()[0]}"
+
+
+def _partial_key(doc_hash):
+    """예산 때문에 앞부분만 읽은 문서를 저장하는 캐시 키 (전체 결과와 구분)"""
+    return f"{doc_hash}:partial"
+
+
+class TextCache:
+    """문서 해시별 페이지 텍스트를 저장하는 SQLite 캐시 (LRU 삭제)"""
+
+    def __init__(self, path=TEXT_CACHE_PATH, max_chars=TEXT_CACHE_MAX_CHARS):
+        self.path = path
+        self.max_chars = max_chars
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                doc_hash TEXT PRIMARY KEY,
+                page_count INTEGER NOT NULL,
+                chars INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS pages (
+                doc_hash TEXT NOT NULL,
+                page_no INTEGER NOT NULL,
+                text TEXT NOT NULL,
+                PRIMARY KEY (doc_hash, page_no)
+            );
+            """
+        )
+        self._conn.commit()
+
+    def get_pages(self, doc_hash, count_stats=True):
+        """캐시된 페이지 텍스트 리스트 반환 (없으면 None)
+
+        count_stats=False면 적중/미스 횟수에 넣지 않습니다. (같은 문서의 보조 조회용)
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT page_count FROM documents WHERE doc_hash = ?", (doc_hash,)
+            ).fetchone()
+            if row is None:
+                self.misses += count_stats
+                return None
+            pages = [
+                text
+                for (text,) in self._conn.execute(
+                    "SELECT text FROM pages WHERE doc_hash = ? ORDER BY page_no",
+                    (doc_hash,),
+                )
+            ]
+            if len(pages) != row[0]:
+                # 일부 페이지가 빠진 항목은 미스로 처리
+                self.misses += count_stats
+                return None
+            self._conn.execute(
+                "UPDATE documents SET last_used = ? WHERE doc_hash = ?",
+                (time.time(), doc_hash),
+            )
+            self._conn.commit()
+            self.hits += count_stats
+            return pages
+
+    def put_pages(self, doc_hash, pages):
+        """문서의 페이지 텍스트를 캐시에 저장 (앞부분만 저장해 둔 항목은 함께 삭제)"""
+        chars = sum(len(text) for text in pages)
+        if chars > self.max_chars:
+            return
+        with self._lock:
+            with self._conn:
+                # 전체 페이지가 생기면 예산 추출 때 남긴 앞부분은 더 쓸 일이 없음
+                partial = _partial_key(doc_hash)
+                self._conn.execute("DELETE FROM pages WHERE doc_hash = ?", (partial,))
+                self._conn.execute("DELETE FROM documents WHERE doc_hash = ?", (partial,))
+                self._conn.execute("DELETE FROM pages WHERE doc_hash = ?", (doc_hash,))
+                self._conn.executemany(
+                    "INSERT INTO pages (doc_hash, page_no, text) VALUES (?, ?, ?)",
+                    [(doc_hash, i, text) for i, text in enumerate(pages)],
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?)",
+                    (doc_hash, len(pages), chars, time.time()),
+                )
+                self._evict()
+
+    def _evict(self):
+        total = self._conn.execute(
+            "SELECT COALESCE(SUM(chars), 0) FROM documents"
+        ).fetchone()[0]
+        if total <= self.max_chars:
+            return
+        for doc_hash, chars in self._conn.execute(
+            "SELECT doc_hash, chars FROM documents ORDER BY last_used"
+        ).fetchall():
+            if total <= self.max_chars:
+                break
+            self._conn.execute("DELETE FROM pages WHERE doc_hash = ?", (doc_hash,))
+            self._conn.execute(
+                "DELETE FROM documents WHERE doc_hash = ?", (doc_hash,)
+            )
+            total -= chars
+
+    def stats(self):
+        """캐시 적중/미스 횟수와 보관 중인 문서 수"""
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "documents": count}
+
+
+def get_text_cache():
+    """프로세스 전체에서 공유하는 추출 캐시 반환"""
+    global _text_cache
+    with _text_cache_lock:
+        if _text_cache is None:
+            _text_cache = TextCache()
+        return _text_cache
+
+
+def _iter_source_pages(source, cache):
+    """원본 하나의 (페이지 번호, 전체 페이지 수, 텍스트)를 yield
+
+    끝까지 읽으면 전체 페이지를, 중간에 멈추면 읽은 앞부분만 따로 캐시에 저장하고
+    다음에는 저장된 앞부분 뒤부터 이어서 추출합니다.
+    """
+    doc_hash = cache_key(source) if cache else None
+    pages = cache.get_pages(doc_hash) if cache else None
+    if pages is not None:
+        for page_no, text in enumerate(pages):
+            yield page_no, len(pages), text
+        return
+
+    # 전체 조회에서 이미 미스로 셌으므로 앞부분 조회는 통계에 넣지 않음
+    pages = (
+        cache.get_pages(_partial_key(doc_hash), count_stats=False) if cache else None
+    ) or []
+    cached = len(pages)
+    fresh = pdf_backends.iter_pages(source, cached)
+    if pages:
+        # 전체 페이지 수는 이어서 읽을 첫 페이지와 함께 받음 (PDF를 따로 한 번 더 열지 않음)
+        first = next(fresh, None)
+        page_count = first[1] if first else cached
+        for page_no, text in enumerate(pages):
+            yield page_no, page_count, text
+        if first:
+            fresh = itertools.chain([first], fresh)
+
+    try:
+        for page_no, page_count, text in fresh:
+            pages.append(text)
+            yield page_no, page_count, text
+    except GeneratorExit:
+        if cache and len(pages) > cached:
+            cache.put_pages(_partial_key(doc_hash), pages)
+        raise
+    if cache:
+        cache.put_pages(doc_hash, pages)
+
+
+def iter_pdf_pages(sources, use_cache=True, on_error=None):
+    """PDF 페이지를 필요한 만큼만 하나씩 추출하는 제너레이터
+
+    sources에는 파일 경로와 메모리 상의 업로드 파일을 섞어 넣을 수 있습니다.
+    (원본 인덱스, 페이지 번호, 원본의 전체 페이지 수, 텍스트)를 yield 하며,
+    실패한 원본은 on_error(source, error)로 알리고 건너뜁니다.
+    다 쓰기 전에 멈출 때는 close()를 불러야 읽은 앞부분이 캐시에 남습니다.
+    """
+    cache = get_text_cache() if use_cache else None
+    for i, source in enumerate(sources):
+        try:
+            with contextlib.closing(_iter_source_pages(source, cache)) as pages:
+                for page_no, page_count, text in pages:
+                    yield i, page_no, page_count, text
+        except Exception as e:
+            if on_error:
+                on_error(source, e)
+
+
+def extract_text_within_budget(
+    sources, max_chars, use_cache=True, on_error=None, make_filter=None
+):
+    """글자 수 예산이 찰 때까지만 페이지를 추출해 텍스트 반환
+
+    예산이 채워지면 나머지 페이지는 파싱하지 않고, 건너뛴 페이지 수를
+    통계로 함께 반환합니다. make_filter가 주어지면 파일마다 새 필터를 만들어
+    페이지를 정리한 뒤 예산을 계산하고, 파일별 정리 통계를 stats["cleaning"]에 담습니다.
+    """
+    sources = list(sources)
+    parts = []
+    length = 0
+    stats = {"pages_extracted": 0, "pages_skipped": 0, "cleaning": {}}
+    last = None  # 마지막으로 읽은 (파일 인덱스, 페이지 번호, 전체 페이지 수)
+    filters = {}  # 파일 인덱스 -> 페이지 정리 필터
+
+    with contextlib.closing(
+        iter_pdf_pages(sources, use_cache=use_cache, on_error=on_error)
+    ) as pages:
+        for i, page_no, page_count, text in pages:
+            if make_filter is not None:
+                if i not in filters:
+                    filters[i] = make_filter()
+                text = filters[i].clean(text)
+            # 기존 방식과 같게 파일 앞에는 줄바꿈, 페이지 사이에도 줄바꿈
+            parts.append("\n")
+            parts.append(text)
+            length += len(text) + 1
+            stats["pages_extracted"] += 1
+            last = (i, page_no, page_count)
+            if length >= max_chars:
+                break
+
+    for i, page_filter in filters.items():
+        stats["cleaning"][i] = page_filter.stats()
+
+    if last is not None and length >= max_chars:
+        i, page_no, page_count = last
+        stats["pages_skipped"] += page_count - page_no - 1
+        for source in sources[i + 1 :]:
+            try:
+                stats["pages_skipped"] += pdf_backends.page_count(source)
+            except Exception:
+                pass
+
+    return "".join(parts), stats
+
+
+def _extract_page_range(source, start, stop):
+    """프로세스 풀 작업: 지정한 페이지 구간의 텍스트 추출"""
+    return pdf_backends.extract_pages(source, start, stop)
+
+
+def _extract_whole_file(source):
+    """프로세스 풀 작업: 파일 전체 페이지 텍스트 추출"""
+    return pdf_backends.extract_pages(source)
+
+
+def _picklable(source):
+    """프로세스 풀로 넘길 수 있는 형태로 변환 (메모리 원본은 이때만 bytes로 복사)"""
+    if _is_path(source):
+        return source
+    if hasattr(source, "getvalue"):
+        return source.getvalue()
+    return bytes(source)
+
+
+def _get_pool(max_workers):
+    """세션들이 함께 쓰는 추출용 프로세스 풀 반환"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Streamlit 서버는 스레드가 많으므로 fork 대신 spawn 사용
+            _pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def _reset_pool(broken_pool):
+    """깨진 풀을 버림 (다른 세션이 이미 새 풀로 바꿨으면 그 풀은 건드리지 않음)"""
+    global _pool
+    with _pool_lock:
+        if _pool is broken_pool:
+            _pool = None
+    broken_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _retry_one_by_one(tasks, payloads, chunks, errors):
+    """끝나지 못한 작업을 파일 하나씩 새 풀에서 다시 실행 (또 죽는 파일만 실패 처리)"""
+    by_file = {}
+    for i, order, func, _, args in tasks:
+        by_file.setdefault(i, []).append((order, func, args))
+
+    pool = None
+    try:
+        for i, file_tasks in by_file.items():
+            if pool is None:
+                pool = ProcessPoolExecutor(
+                    max_workers=1, mp_context=multiprocessing.get_context("spawn")
+                )
+            futures = [
+                (order, pool.submit(func, payloads[i], *args))
+                for order, func, args in file_tasks
+            ]
+            try:
+                for order, future in futures:
+                    chunks.setdefault(i, {})[order] = future.result()
+            except BrokenProcessPool as e:
+                errors[i] = e
+                pool.shutdown(wait=False, cancel_futures=True)
+                pool = None  # 다음 파일은 다시 새 풀에서
+            except Exception as e:
+                errors[i] = e
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+
+def extract_pdfs_parallel(sources, max_workers=EXTRACT_WORKERS, use_cache=True):
+    """여러 PDF를 프로세스 풀에서 병렬 추출
+
+    결과는 입력 순서대로 (pages, error) 튜플 리스트로 반환합니다.
+    실패한 파일은 pages가 None이고 error에 예외가 담기며, 나머지 파일은 계속 처리됩니다.
+    """
+    sources = list(sources)
+    cache = get_text_cache() if use_cache else None
+    results = [None] * len(sources)
+    hashes = [None] * len(sources)
+    tasks = []  # (원본 인덱스, 구간 순서, 함수, 원본, 추가 인자)
+
+    for i, source in enumerate(sources):
+        try:
+            if cache:
+                hashes[i] = cache_key(source)
+                pages = cache.get_pages(hashes[i])
+                if pages is not None:
+                    results[i] = (pages, None)
+                    continue
+
+            page_count = pdf_backends.page_count(source)
+            if page_count >= LARGE_PDF_PAGES:
+                for order, start in enumerate(range(0, page_count, PAGE_RANGE_SIZE)):
+                    stop = min(start + PAGE_RANGE_SIZE, page_count)
+                    tasks.append((i, order, _extract_page_range, source, (start, stop)))
+            else:
+                tasks.append((i, 0, _extract_whole_file, source, ()))
+        except Exception as e:
+            results[i] = (None, e)
+
+    chunks = {}  # 파일 인덱스 -> {구간 순서: 페이지 리스트}
+    errors = {}
+    if len(tasks) == 1:
+        # 작업이 하나뿐이면 프로세스 간 전달 비용 없이 바로 처리
+        i, order, func, source, args = tasks[0]
+        try:
+            chunks.setdefault(i, {})[order] = func(source, *args)
+        except Exception as e:
+            errors[i] = e
+    elif tasks:
+        pool = _get_pool(max_workers)
+        payloads = {}  # 같은 원본을 여러 구간에 나눠도 한 번만 변환
+        futures = []
+        unfinished = []  # 풀이 깨지거나 취소돼 결과를 못 받은 작업
+        for task in tasks:
+            i, order, func, source, args = task
+            if i not in payloads:
+                payloads[i] = _picklable(source)
+            try:
+                futures.append((task, pool.submit(func, payloads[i], *args)))
+            except (BrokenProcessPool, RuntimeError):
+                # 다른 세션의 작업이 이미 풀을 깨뜨렸거나 종료함
+                unfinished.append(task)
+        for task, future in futures:
+            i, order = task[:2]
+            try:
+                chunks.setdefault(i, {})[order] = future.result()
+            except (BrokenProcessPool, CancelledError):
+                # 취소는 다른 세션이 깨진 풀을 정리하며 생긴 것이라 파일 탓이 아님
+                unfinished.append(task)
+            except Exception as e:
+                errors.setdefault(i, e)
+        if unfinished:
+            # 어느 파일이 프로세스를 죽였는지 모르므로 파일 하나씩 다시 시도
+            _reset_pool(pool)
+            _retry_one_by_one(
+                [task for task in unfinished if task[0] not in errors],
+                payloads,
+                chunks,
+                errors,
+            )
+
+    for i, parts in chunks.items():
+        if i in errors:
+            continue
+        pages = [text for order in sorted(parts) for text in parts[order]]
+        if cache:
+            cache.put_pages(hashes[i], pages)
+        results[i] = (pages, None)
+    for i, error in errors.items():
+        results[i] = (None, error)
+
+    return results
@@ -0,0 +1,107 @@
+"""blog_generator 순수 함수 테스트 (python -m pytest)"""
+
+import pytest
+
+import blog_generator
+
+SCRIPT = """# 페이지 제목: 서론
+## 페이지 스크립트:
+첫 페이지 본문입니다.
+두 번째 줄입니다.
+
+# 페이지 제목: 본론
+## 페이지 스크립트:
+본론 내용입니다.
+
+# 페이지 제목: 결론
+## 페이지 스크립트:
+마무리 문단입니다.
+"""
+
+
+def _stream_pages(script, delta_size):
+    parser = blog_generator.IncrementalPageParser()
+    pages = []
+    for start in range(0, len(script), delta_size):
+        pages += parser.feed(script[start : start + delta_size])
+    return pages + parser.finish(), parser
+
+
+def test_streamed_pages_match_full_parse():
+    """제목 표시가 조각 사이에 잘려 와도 전체 스크립트 파싱 결과와 같음"""
+    expected = blog_generator.parse_script_pages(SCRIPT, 3)
+    for delta_size in (1, 3, 7, len(SCRIPT)):
+        pages, parser = _stream_pages(SCRIPT, delta_size)
+        assert pages == expected
+        assert parser.text == SCRIPT
+
+
+def test_page_is_emitted_only_when_next_title_arrives():
+    """다음 '# 페이지 제목:'이 나오기 전까지는 페이지를 닫지 않음"""
+    parser = blog_generator.IncrementalPageParser()
+    second = SCRIPT.index("# 페이지 제목: 본론")
+
+    assert parser.feed(SCRIPT[: second + 3]) == []
+    assert [p["title"] for p in parser.feed(SCRIPT[second + 3 : second + 12])] == ["서론"]
+    assert parser.feed(SCRIPT[second + 12 :]) == [
+        {"title": "본론", "content": "본론 내용입니다."}
+    ]
+    assert parser.finish() == [{"title": "결론", "content": "마무리 문단입니다."}]
+    assert parser.finish() == []
+
+
+def _document_lines(count=1500):
+    return [
+        f"{n}번째 줄: 문서 내용을 설명하는 문장이 이어집니다. 항목 {n * 7 % 13}"
+        for n in range(count)
+    ]
+
+
+def test_chunks_cover_text_within_limits():
+    """청크를 다시 이으면 원문이고, 마지막 청크 외에는 최소·최대 길이 안"""
+    lines = _document_lines()
+    text = "\n".join(lines)
+    chunks = blog_generator.split_into_chunks(text)
+    longest = max(len(line) for line in lines)
+
+    assert "\n".join(chunks) == text
+    for chunk in chunks[:-1]:
+        # 마지막 줄을 넣은 뒤 길이를 확인하므로 최대 길이는 줄 하나만큼 넘을 수 있음
+        assert blog_generator.MAP_MIN_CHUNK_CHARS <= len(chunk) + 1
+        assert len(chunk) + 1 <= blog_generator.MAP_CHUNK_CHARS + longest
+
+
+def test_editing_one_page_keeps_other_chunks():
+    """가운데 한 줄만 바꾸면 그 줄이 든 청크만 달라지고 나머지 청크는 그대로"""
+    lines = _document_lines()
+    before = blog_generator.split_into_chunks("\n".join(lines))
+    lines[700] = "수정된 줄입니다. " * 5
+    after = blog_generator.split_into_chunks("\n".join(lines))
+
+    changed = [chunk for chunk in after if chunk not in before]
+    assert len(changed) == 1
+    assert "수정된 줄입니다." in changed[0]
+    assert len(after) == len(before)
+
+
+def test_parse_prompt_list_accepts_json_array_in_reply():
+    """코드 블록·설명이 붙은 JSON 배열과 {"prompt": ...} 항목도 순서대로 읽음"""
+    reply = '설명입니다.\n```json\n[" 첫 프롬프트 ", {"prompt": "둘째 [야경]"}]\n```'
+    assert blog_generator._parse_prompt_list(reply, 2) == ["첫 프롬프트", "둘째 [야경]"]
+
+
+@pytest.mark.parametrize(
+    "reply",
+    [
+        "1. 첫 프롬프트\n2. 둘째 프롬프트",  # 번호 목록
+        "- 첫 프롬프트\n- 둘째 프롬프트",  # 글머리표 목록
+        "1. [도시] 첫 프롬프트\n2. [바다] 둘째 프롬프트",  # 대괄호가 섞인 목록
+        '["첫 프롬프트"]',  # 페이지 수보다 짧음
+        '["첫 프롬프트", "  "]',  # 빈 프롬프트
+        '["첫 프롬프트", 2]',  # 문자열이 아님
+    ],
+)
+def test_parse_prompt_list_rejects_malformed_replies(reply):
+    """JSON 배열이 아니거나 개수·내용이 맞지 않는 응답은 ValueError"""
+    with pytest.raises(ValueError):
+        blog_generator._parse_prompt_list(reply, 2)
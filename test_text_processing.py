@@ -0,0 +1,136 @@
+"""text_processing 머리말/꼬리말 정리 회귀 테스트 (python -m pytest)"""
+
+import random
+
+import text_processing
+
+LABELS = [
+    "Revenue",
+    "Cost of sales",
+    "Gross profit",
+    "Operating expenses",
+    "Operating income",
+    "Net income",
+    "Total assets",
+    "Total liabilities",
+]
+
+
+def _table_pages(page_count=6, seed=1):
+    """머리말·꼬리말·쪽번호 사이에 값만 다른 재무 표가 있는 페이지 목록"""
+    rng = random.Random(seed)
+    pages = []
+    for page_no in range(1, page_count + 1):
+        rows = ["ACME Corp Annual Report 2023", "Item FY2022 FY2023"]
+        rows += [
+            f"{label} {rng.randint(1000, 9999):,} {rng.randint(1000, 9999):,}"
+            for label in LABELS
+        ]
+        rows += ["Confidential", f"Page {page_no} of {page_count}"]
+        pages.append("\n".join(rows))
+    return pages
+
+
+def test_numeric_table_rows_are_kept():
+    """숫자만 다른 표 행은 본문이므로 모든 페이지에 남아야 함"""
+    pages = _table_pages()
+    cleaned, _ = text_processing.clean_document_pages(pages)
+
+    for page, text in zip(pages, cleaned):
+        for row in page.split("\n")[2:-2]:
+            assert row in text.split("\n")
+
+
+def test_repeated_edges_are_removed():
+    """반복되는 머리말/꼬리말과 쪽번호는 두 번째 페이지부터 제거"""
+    cleaned, stats = text_processing.clean_document_pages(_table_pages())
+
+    assert "ACME Corp Annual Report 2023" in cleaned[0]
+    for text in cleaned[1:]:
+        assert "ACME Corp Annual Report" not in text
+        assert "Confidential" not in text
+        assert "Page" not in text
+    assert stats["chars_saved"] > 0
+
+
+def test_counter_in_footer_is_masked():
+    """줄 끝 번호만 다른 꼬리말은 같은 줄로 보고 제거"""
+    pages = [f"본문 {n}번째 문단입니다.\n\nACME 보고서 | {n}" for n in range(1, 4)]
+    cleaned, _ = text_processing.clean_document_pages(pages)
+
+    assert cleaned[0].endswith("ACME 보고서 | 1")
+    assert cleaned[2] == "본문 3번째 문단입니다."
+
+
+def test_paragraph_features_split_on_punctuation():
+    """문장부호·전각 공백은 단어 경계로 보고 대소문자는 구분하지 않음"""
+    same = ["Hello, World!", "hello world", "「hello」　world…"]
+    paras, features, tf, lengths = text_processing._paragraph_features(same)
+
+    assert list(lengths) == [2, 2, 2]
+    for i in range(1, len(same)):
+        assert list(features[paras == i]) == list(features[paras == 0])
+    assert list(tf) == [1] * 6
+
+
+def test_numbered_headings_are_kept():
+    """번호만 다른 제목("Chapter 1", "Chapter 2")은 쪽번호가 아니므로 모두 남아야 함"""
+    pages = [f"Chapter {n}\n\n{n}장 본문입니다." for n in range(1, 6)]
+    cleaned, _ = text_processing.clean_document_pages(pages)
+
+    for n, text in enumerate(cleaned, start=1):
+        assert f"Chapter {n}" in text
+
+
+def test_body_lines_ending_in_numbers_are_kept():
+    """끝의 숫자만 다른 본문 줄(쉼표 뒤 숫자, 문장 끝 숫자)은 지우지 않음"""
+    values = ["1,234", "1,567", "1,890", "2,012"]
+    growth = [12, 15, 18, 21]
+    pages = [
+        f"Total revenue {value}\nQ3 2023 revenue grew {rate}"
+        for value, rate in zip(values, growth)
+    ]
+    cleaned, _ = text_processing.clean_document_pages(pages)
+
+    for value, rate, text in zip(values, growth, cleaned):
+        assert f"Total revenue {value}" in text
+        assert f"Q3 2023 revenue grew {rate}" in text
+
+
+def test_masked_footer_needs_repeat_limit():
+    """쪽번호를 가린 꼬리말은 BODY_REPEAT_LIMIT 페이지째부터 제거"""
+    limit = text_processing.BODY_REPEAT_LIMIT
+    pages = [f"본문 {n}번째 문단입니다.\n\n보고서 - {n} -" for n in range(1, limit + 1)]
+    cleaned, _ = text_processing.clean_document_pages(pages)
+
+    for n, text in enumerate(cleaned[:-1], start=1):
+        assert f"보고서 - {n} -" in text
+    assert "보고서" not in cleaned[-1]
+
+
+def test_paragraph_features_tell_long_words_apart():
+    """앞부분이 같은 긴 단어는 다른 특징, 같은 단어는 문단이 달라도 같은 특징"""
+    paragraphs = ["internationalization", "internationalisation", "보고서의 재무제표 요약", "INTERNATIONALIZATION"]
+    paras, features, _, _ = text_processing._paragraph_features(paragraphs)
+
+    assert features[paras == 0][0] != features[paras == 1][0]
+    assert features[paras == 0][0] == features[paras == 3][0]
+    assert len(set(features[paras == 2])) == 3
+
+
+def test_numeric_edge_lines_on_one_page_are_kept():
+    """한 페이지 가장자리에만 있는 숫자 줄(연도 등)은 쪽번호가 아니므로 유지"""
+    pages = ["매출 추이는 아래 연도별 표와 같습니다.\n2019\n2020\n2021", "다음 장 본문입니다."]
+    cleaned, _ = text_processing.clean_document_pages(pages)
+
+    assert cleaned[0].split("\n")[-3:] == ["2019", "2020", "2021"]
+
+
+def test_page_counters_are_removed_after_first_page():
+    """같은 자리에서 페이지마다 커지는 번호 줄은 쪽번호로 보고 두 번째 페이지부터 제거"""
+    pages = [f"{n}장 본문 첫 줄\n{n}장 본문 둘째 줄\n- {n} -" for n in range(1, 5)]
+    cleaned, _ = text_processing.clean_document_pages(pages)
+
+    assert cleaned[0].endswith("- 1 -")
+    for n, text in enumerate(cleaned[1:], start=2):
+        assert text == f"{n}장 본문 첫 줄\n{n}장 본문 둘째 줄"
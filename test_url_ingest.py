@@ -0,0 +1,95 @@
+"""url_ingest URL 정리·중복 제거 테스트 (python -m pytest)"""
+
+import io
+from urllib.parse import urlsplit
+
+import url_ingest
+
+
+def _urls(text):
+    counts = url_ingest.new_counts()
+    return list(url_ingest.iter_csv_urls(io.StringIO(text), counts)), counts
+
+
+def test_clean_url_adds_scheme_and_rejects_bad_values():
+    """//, www.로 시작하면 https를 붙이고, 잘못된 값과 PDF가 아닌 링크는 이유와 함께 거름"""
+    assert url_ingest.clean_url("//example.com/a.pdf") == (
+        "https://example.com/a.pdf",
+        None,
+    )
+    assert url_ingest.clean_url(" www.example.com/a.pdf ") == (
+        "https://www.example.com/a.pdf",
+        None,
+    )
+    assert url_ingest.clean_url("https://한글.kr/a.pdf")[1] is None
+    assert url_ingest.clean_url("http://[::1]:8080/a.pdf")[1] is None
+    invalid = ["ftp://example.com/a.pdf", "https://exa mple.com/a.pdf", "https://:80/a"]
+    for value in invalid:
+        assert url_ingest.clean_url(value) == (None, url_ingest.REJECT_INVALID)
+    assert url_ingest.clean_url("https://example.com/a.PNG") == (
+        None,
+        url_ingest.REJECT_NOT_PDF,
+    )
+
+
+def test_strip_tracking_keeps_order_and_encoding():
+    """추적 파라미터만 빼고 나머지 쿼리는 순서·인코딩 그대로 (서명된 링크 보존)"""
+    parts = urlsplit("https://s3.example.com/a.pdf?Sig=a%2Fb&utm_source=x&b=2&fbclid=1")
+    expected = "https://s3.example.com/a.pdf?Sig=a%2Fb&b=2"
+    assert url_ingest._strip_tracking(parts) == expected
+
+
+def test_dedupe_key_normalizes_equivalent_urls():
+    """대소문자·기본 포트·쿼리 순서·추적 파라미터가 달라도 같은 키, 계정 정보가 다르면 다른 키"""
+    key = url_ingest._dedupe_key(urlsplit("https://example.com/a.pdf?a=1&b=2"))
+    same = [
+        "HTTPS://Example.COM:443/a.pdf?b=2&a=1",
+        "https://example.com/a.pdf?a=1&utm_medium=x&b=2#page=3",
+    ]
+    for url in same:
+        assert url_ingest._dedupe_key(urlsplit(url)) == key
+    assert url_ingest._dedupe_key(urlsplit("https://example.com/A.pdf?a=1&b=2")) != key
+    with_user = urlsplit("https://u:p@example.com/a.pdf?a=1&b=2")
+    assert url_ingest._dedupe_key(with_user) != key
+
+
+def test_digest_set_grows_and_keeps_members():
+    """작은 표에서 시작해 여러 번 커져도 넣은 값은 모두 중복으로 인식"""
+    digests = url_ingest.DigestSet(capacity=4)
+    keys = [f"https://example.com/{i}.pdf" for i in range(1000)]
+
+    assert all(digests.add(key) for key in keys)
+    assert len(digests) == 1000
+    assert len(digests._table) >= 2000
+    assert not any(digests.add(key) for key in keys)
+    assert len(digests) == 1000
+
+
+def test_digest_set_probes_past_collisions():
+    """같은 칸에 떨어지는 해시도 다음 칸으로 넘어가 각각 저장"""
+    digests = url_ingest.DigestSet(capacity=8)
+    colliding = [1 + 8 * n for n in range(3)]  # 모두 1번 칸
+
+    assert all(digests._insert(digest) for digest in colliding)
+    assert not any(digests._insert(digest) for digest in colliding)
+    assert sorted(int(d) for d in digests._table if d) == colliding
+
+
+def test_header_row_skipped_but_malformed_first_url_counted():
+    """URL 모양이 아닌 첫 줄은 머리글, URL 모양인데 잘못된 첫 줄은 잘못된 값으로 셈"""
+    urls, counts = _urls("url\nhttps://example.com/a.pdf\n")
+    assert urls == ["https://example.com/a.pdf"]
+    assert counts["rows"] == 1 and counts[url_ingest.REJECT_INVALID] == 0
+
+    urls, counts = _urls("https://exa mple.com/a.pdf\nhttps://example.com/b.pdf\n")
+    assert urls == ["https://example.com/b.pdf"]
+    assert counts["rows"] == 2 and counts[url_ingest.REJECT_INVALID] == 1
+
+
+def test_iter_csv_urls_dedupes_in_order():
+    """정규화 후 같은 URL은 처음 나온 것만 원래 순서대로"""
+    urls, counts = _urls(
+        "https://b.com/x.pdf\nhttps://a.com/y.pdf\nHTTPS://B.com/x.pdf?utm_source=z\n"
+    )
+    assert urls == ["https://b.com/x.pdf", "https://a.com/y.pdf"]
+    assert counts["duplicates"] == 1 and counts["urls"] == 2
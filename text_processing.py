@@ -0,0 +1,300 @@
+"""프롬프트에 넣기 전 문서 텍스트 가공 (머리말/꼬리말 제거 + 핵심 문단 선택)"""
+
+import re
+import string
+
+import numpy as np
+
+# 머리말/꼬리말 제거 설정
+EDGE_LINES = 3  # 페이지 위/아래에서 머리말·꼬리말로 볼 줄 수
+MAX_BOILERPLATE_LINE = 120  # 이보다 긴 줄은 반복돼도 본문으로 봄
+BODY_REPEAT_LIMIT = 3  # 본문 위치라도 이 페이지 수 이상 반복되면 상용구로 보고 제거
+
+_PAGE_NUMBER_PATTERN = re.compile(
+    r"^[-–—\s]*(?:page\s*)?\d{1,4}(?:\s*(?:/|of)\s*\d{1,4})?[-–—\s]*(?:페이지|쪽|p\.?)?$",
+    re.IGNORECASE,
+)
+_DIGITS_PATTERN = re.compile(r"\d+")
+_HYPHEN_BREAK_PATTERN = re.compile(r"([A-Za-z])-\n([a-z])")
+_SPACES_PATTERN = re.compile(r"[ \t\u00a0\u3000]+")
+_BLANK_LINES_PATTERN = re.compile(r"\n{3,}")
+# 머리말/꼬리말에서 페이지마다 바뀌는 번호 (줄 맨 앞이나 맨 끝에 따로 떨어진 쪽번호)
+# "3/120", "3 of 120", "page 3"은 공백만으로, 맨숫자 "3", "- 3 -"는 구분자("|", "-", "·", ":")로
+# 본문과 떨어져 있을 때만 쪽번호로 봄 ("Chapter 2", "revenue 1,567", "grew 15"는 그대로)
+_STRONG_COUNTER = r"(?:(?:page|p\.)\s*\d{1,4}(?:\s*(?:/|of)\s*\d{1,4})?|\d{1,4}\s*(?:/|of)\s*\d{1,4})"
+_ANY_COUNTER = rf"(?:{_STRONG_COUNTER}|\d{{1,4}})"
+_COUNTER_DELIMITER = r"(?:\s[-–—]|\s?[|·•:])"
+_EDGE_COUNTER_PATTERN = re.compile(
+    rf"^(?:[-–—]\s*)?{_ANY_COUNTER}(?:\s*[-–—])?{_COUNTER_DELIMITER}\s*"
+    rf"|^{_STRONG_COUNTER}\s"
+    rf"|{_COUNTER_DELIMITER}\s*(?:[-–—]\s*)?{_ANY_COUNTER}(?:\s*[-–—])?$"
+    rf"|\s{_STRONG_COUNTER}$"
+)
+
+# 핵심 문단 선택 설정
+FEATURE_BITS = 20  # 단어 해시 공간 크기 (2^20)
+MINHASH_PERMUTATIONS = 16  # 중복 판별용 MinHash 개수
+DUPLICATE_THRESHOLD = 0.6  # 추정 자카드 유사도가 이 이상이면 중복 문단으로 보고 제외
+PARAGRAPH_TARGET_CHARS = 400  # 빈 줄이 없는 텍스트는 이 길이 정도로 줄을 묶어 문단 생성
+
+# 단어 사이 구분자로 볼 구두점 (ASCII는 bytes.translate, 나머지는 정규식으로 공백 처리)
+_ASCII_PUNCTUATION_TABLE = bytes.maketrans(
+    string.punctuation.encode("ascii"), b" " * len(string.punctuation)
+)
+_NON_ASCII_SEPARATOR_PATTERN = re.compile(
+    "[“”‘’·…「」『』〈〉《》【】•\u0085\u00a0\u1680\u2000-\u200b\u2028\u2029\u202f\u205f\u3000]"
+)
+
+# 단어 해시: 단어의 앞/뒤 8바이트와 길이를 섞어 numpy로 한 번에 계산 (16바이트 이하 단어는 정확히 구분)
+_PARAGRAPH_SEPARATOR = "\x01"  # 문서 전체를 한 번에 토큰화할 때 문단 경계 표시 (공백 취급)
+_WORD_MASKS = np.array([(1 << (8 * n)) - 1 for n in range(8)] + [(1 << 64) - 1], dtype=np.uint64)
+_HEAD_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+_TAIL_MULTIPLIER = np.uint64(0xC2B2AE3D27D4EB4F)
+_LENGTH_MULTIPLIER = np.uint64(0x165667B19E3779F9)
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = np.random.default_rng(20240501)  # 실행마다 같은 결과가 나오도록 고정 시드
+_MINHASH_A = _rng.integers(1, 1 << 31, size=MINHASH_PERMUTATIONS, dtype=np.int64)
+_MINHASH_B = _rng.integers(0, 1 << 31, size=MINHASH_PERMUTATIONS, dtype=np.int64)
+
+
+def estimate_tokens(text):
+    """대략적인 토큰 수 추정 (영문 4자당 1토큰, 한글 등은 1자당 1토큰)"""
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return ascii_chars // 4 + (len(text) - ascii_chars) + 1
+
+
+class BoilerplateFilter:
+    """한 문서의 페이지를 순서대로 넣으면 반복되는 머리말/꼬리말·쪽번호를 지워 주는 필터
+
+    줄별로 이전 페이지 등장 횟수를 세기 때문에 페이지를 한 번씩만 훑으며
+    (스트리밍 추출 중에도) 바로 정리할 수 있습니다. 처음 나온 줄은 남기고,
+    페이지 위/아래 가장자리에서 똑같이 다시 나오는 줄이나 본문에서 똑같이
+    BODY_REPEAT_LIMIT 페이지 이상 반복되는 줄을 제거합니다. 따로 떨어진 쪽번호만
+    다른 가장자리 줄도 BODY_REPEAT_LIMIT 페이지 이상 반복되어야 제거합니다.
+    숫자만 있는 가장자리 줄은 이전 페이지의 같은 위치에 같은 꼴로 나왔고 번호가
+    커졌을 때만 쪽번호로 보고 지웁니다 (한 페이지에만 있는 연도·표 값은 유지).
+    """
+
+    def __init__(self):
+        self._seen_edges = {}  # 가장자리 줄 키(쪽번호는 '#') -> 등장한 페이지 수
+        self._seen_pages = {}  # 줄 키(원문 그대로) -> 등장한 페이지 수
+        self._seen_counters = {}  # (가장자리 위치, 숫자를 '#'로 가린 줄) -> 마지막 번호
+        self.chars_before = 0
+        self.chars_after = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+
+    def clean(self, page_text):
+        """페이지 하나를 정리해 반환"""
+        text = _HYPHEN_BREAK_PATTERN.sub(r"\1\2", page_text)
+        lines = [_SPACES_PATTERN.sub(" ", line).strip() for line in text.split("\n")]
+        content_rows = [i for i, line in enumerate(lines) if line]
+        # 가장자리 줄 위치: 위에서 몇 번째("top", n) / 아래에서 몇 번째("bottom", n)
+        positions = {}
+        for n, i in enumerate(content_rows[:EDGE_LINES]):
+            positions.setdefault(i, []).append(("top", n))
+        for n, i in enumerate(reversed(content_rows[-EDGE_LINES:])):
+            positions.setdefault(i, []).append(("bottom", n))
+
+        kept = []
+        edge_keys = set()
+        body_keys = set()
+        counters = {}
+        for i, line in enumerate(lines):
+            if not line:
+                kept.append("")
+                continue
+            if i in positions and _PAGE_NUMBER_PATTERN.match(line):
+                # 쪽번호는 가장자리에서, 페이지마다 같은 자리에서 번호가 커질 때만 제거
+                # (본문 표의 숫자나 한 페이지에만 있는 연도 줄은 유지)
+                number = int(_DIGITS_PATTERN.search(line).group())
+                form = _DIGITS_PATTERN.sub("#", line.lower())
+                slots = [(position, form) for position in positions[i]]
+                for slot in slots:
+                    counters[slot] = number
+                previous = [self._seen_counters.get(slot, number) for slot in slots]
+                if min(previous) < number:
+                    continue
+            if len(line) <= MAX_BOILERPLATE_LINE:
+                key = line.lower()
+                body_keys.add(key)
+                repeated = self._seen_pages.get(key, 0) + 1 >= BODY_REPEAT_LIMIT
+                if i in positions:
+                    # 쪽번호만 다른 머리말/꼬리말("2024년 3월 보고서 - 5")은 가장자리에서만 같은 줄로 봄
+                    # (번호를 가린 줄은 본문처럼 BODY_REPEAT_LIMIT 페이지 이상 반복돼야 제거)
+                    edge_key = _EDGE_COUNTER_PATTERN.sub("#", key)
+                    edge_keys.add(edge_key)
+                    edge_count = self._seen_edges.get(edge_key, 0)
+                    if edge_key == key:
+                        repeated = repeated or edge_count > 0
+                    else:
+                        repeated = repeated or edge_count + 1 >= BODY_REPEAT_LIMIT
+                if repeated:
+                    continue
+            kept.append(line)
+
+        # 같은 페이지 안의 반복은 세지 않도록 페이지를 다 본 뒤 한 번에 반영
+        for key in body_keys:
+            self._seen_pages[key] = self._seen_pages.get(key, 0) + 1
+        for key in edge_keys:
+            self._seen_edges[key] = self._seen_edges.get(key, 0) + 1
+        self._seen_counters.update(counters)
+
+        cleaned = _BLANK_LINES_PATTERN.sub("\n\n", "\n".join(kept)).strip()
+        self.chars_before += len(page_text)
+        self.chars_after += len(cleaned)
+        self.tokens_before += estimate_tokens(page_text)
+        self.tokens_after += estimate_tokens(cleaned)
+        return cleaned
+
+    def stats(self):
+        """정리 전후 글자 수와 절약한 추정 토큰 수"""
+        return {
+            "chars_before": self.chars_before,
+            "chars_after": self.chars_after,
+            "chars_saved": self.chars_before - self.chars_after,
+            "tokens_saved": self.tokens_before - self.tokens_after,
+        }
+
+
+def clean_document_pages(pages):
+    """문서 한 개의 페이지 리스트를 정리하고 (정리된 페이지 리스트, 통계) 반환"""
+    boilerplate = BoilerplateFilter()
+    cleaned = [boilerplate.clean(page) for page in pages]
+    return cleaned, boilerplate.stats()
+
+
+def split_paragraphs(text, target_chars=PARAGRAPH_TARGET_CHARS):
+    """빈 줄 기준으로 문단 분리 (빈 줄이 거의 없으면 줄을 묶어 문단 생성)"""
+    paragraphs = [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+    if len(paragraphs) > 1 and max(len(p) for p in paragraphs) <= target_chars * 4:
+        return paragraphs
+
+    # PDF 추출 텍스트처럼 빈 줄이 없으면 줄을 target_chars 근처까지 묶음
+    paragraphs = []
+    current = []
+    length = 0
+    for line in text.split("\n"):
+        if not line.strip():
+            continue
+        current.append(line.strip())
+        length += len(line)
+        if length >= target_chars:
+            paragraphs.append("\n".join(current))
+            current, length = [], 0
+    if current:
+        paragraphs.append("\n".join(current))
+    return paragraphs
+
+
+def _paragraph_features(paragraphs):
+    """문단별 단어 해시를 (문단 번호, 특징 번호, 등장 횟수) 배열로 변환
+
+    문단을 구분 문자로 이어 문서 전체를 한 번만 토큰화하고, 단어 경계 찾기와
+    해시 계산을 모두 numpy 배열 연산으로 처리합니다 (문단·단어별 파이썬 반복 없음).
+    """
+    mask = (1 << FEATURE_BITS) - 1
+    text = _PARAGRAPH_SEPARATOR.join(
+        p.replace(_PARAGRAPH_SEPARATOR, " ") for p in paragraphs
+    )
+    text = text.lower()
+    if not text.isascii():
+        text = _NON_ASCII_SEPARATOR_PATTERN.sub(" ", text)
+    data = text.encode("utf-8").translate(_ASCII_PUNCTUATION_TABLE)
+    raw = np.frombuffer(data, dtype=np.uint8)
+
+    # 공백·제어 문자(문단 구분 문자 포함)가 아닌 바이트가 이어진 구간이 단어
+    inside = np.zeros(len(raw) + 2, dtype=bool)
+    np.greater(raw, 32, out=inside[1:-1])
+    edges = np.flatnonzero(inside[1:] != inside[:-1])
+    starts, ends = edges[0::2], edges[1::2]
+    sizes = ends - starts
+
+    # 임의 위치에서 8바이트씩 읽는 uint64 뷰 (끝에서 넘치지 않도록 0으로 채움)
+    # 내장 hash()와 달리 프로세스가 달라도 같은 값이 나옴
+    words = np.ndarray(
+        shape=(len(data) + 1,), dtype="<u8", buffer=data + bytes(8), strides=(1,)
+    )
+    head = words[starts] & _WORD_MASKS[np.minimum(sizes, 8)]
+    tail = np.where(sizes > 8, words[np.maximum(ends - 8, 0)], np.uint64(0))
+    hashes = (
+        (head * _HEAD_MULTIPLIER)
+        ^ (tail * _TAIL_MULTIPLIER)
+        ^ (sizes.astype(np.uint64) * _LENGTH_MULTIPLIER)
+    ) * _HEAD_MULTIPLIER
+    features = (hashes >> np.uint64(64 - FEATURE_BITS)).astype(np.int64)
+
+    para_ids = np.searchsorted(np.flatnonzero(raw == ord(_PARAGRAPH_SEPARATOR)), starts, side="right")
+    lengths = np.bincount(para_ids, minlength=len(paragraphs))
+
+    # (문단, 특징) 쌍별 등장 횟수 = 단어 빈도(tf)
+    keys, tf = np.unique((para_ids << FEATURE_BITS) | features, return_counts=True)
+    return keys >> FEATURE_BITS, keys & mask, tf, lengths
+
+
+def _minhash_signature(features):
+    """단어 특징 집합의 MinHash 서명 (MINHASH_PERMUTATIONS개)"""
+    if len(features) == 0:
+        return np.full(MINHASH_PERMUTATIONS, _MERSENNE_PRIME, dtype=np.int64)
+    hashed = (
+        features[:, None] * _MINHASH_A[None, :] + _MINHASH_B[None, :]
+    ) % _MERSENNE_PRIME
+    return hashed.min(axis=0)
+
+
+def score_paragraphs(paragraphs):
+    """문단별 정보량 점수(TF-IDF 합 / √단어 수)와 문단별 특징 배열 계산
+
+    토큰화·해시·정렬이 모두 배열 연산이라 시간은 입력 길이에 비례합니다.
+    """
+    pair_paras, pair_features, tf, lengths = _paragraph_features(paragraphs)
+    count = len(paragraphs)
+
+    df = np.bincount(pair_features, minlength=1 << FEATURE_BITS)
+    idf = np.log((count + 1) / (df[pair_features] + 1)) + 1.0
+    weights = tf * idf
+    scores = np.bincount(pair_paras, weights=weights, minlength=count)
+    scores = scores / np.sqrt(np.maximum(lengths, 1))
+
+    # 쌍 배열은 문단 번호 순으로 정렬되어 있으므로 문단별 구간으로 자를 수 있음
+    bounds = np.searchsorted(pair_paras, np.arange(count + 1))
+    features = [pair_features[bounds[i] : bounds[i + 1]] for i in range(count)]
+    return scores, features
+
+
+def select_passages(text, max_chars, duplicate_threshold=DUPLICATE_THRESHOLD):
+    """정보량이 높고 서로 겹치지 않는 문단을 골라 max_chars 안에 채워 넣기
+
+    점수가 높은 문단부터 예산에 맞는 것을 고르되, 이미 고른 문단과 거의 같은
+    문단(반복 머리말, 중복 안내문 등)은 건너뛰고, 결과는 원래 문서 순서로 이어 붙입니다.
+    """
+    if len(text) <= max_chars:
+        return text
+
+    paragraphs = split_paragraphs(text)
+    if not paragraphs:
+        return text[:max_chars]
+    scores, features = score_paragraphs(paragraphs)
+
+    selected = []
+    signatures = []  # 고른 문단의 MinHash 서명 (후보로 검사할 때만 계산)
+    remaining = max_chars
+    for i in np.argsort(-scores, kind="stable"):
+        size = len(paragraphs[i]) + 2  # 문단 사이 빈 줄
+        if size > remaining:
+            continue
+        signature = _minhash_signature(features[i])
+        if signatures:
+            similarity = (np.array(signatures) == signature).mean(axis=1).max()
+            if similarity >= duplicate_threshold:
+                continue
+        selected.append(i)
+        signatures.append(signature)
+        remaining -= size
+        if remaining < 50:
+            break
+
+    if not selected:
+        return text[:max_chars]
+    return "\n\n".join(paragraphs[i] for i in sorted(selected))
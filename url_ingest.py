@@ -0,0 +1,277 @@
+"""CSV의 PDF URL 목록을 스트리밍으로 읽기 (정규화, 순서 유지 중복 제거, 잘못된 값 거르기)
+
+수백만 줄짜리 파일도 한 줄씩 처리하며, 중복 검사에는 URL 문자열 대신
+64비트 해시만 numpy 배열에 담아 URL 하나당 16바이트 정도만 씁니다.
+"""
+
+import csv
+import hashlib
+import io
+import ipaddress
+import os
+import re
+from urllib.parse import unquote_plus, urlsplit, urlunsplit
+
+import numpy as np
+
+import pdf_downloader
+
+# 추적용 쿼리 파라미터 (같은 문서인데 링크마다 달라지는 값)
+TRACKING_PARAMS = {
+    "fbclid",
+    "gclid",
+    "dclid",
+    "msclkid",
+    "yclid",
+    "igshid",
+    "mc_cid",
+    "mc_eid",
+    "_ga",
+    "_gl",
+}
+TRACKING_PREFIXES = ("utm_",)
+
+# 확장자만 봐도 PDF가 아닌 링크 (확장자가 없거나 .php 등이면 받아 봐야 알 수 있어 통과)
+NON_PDF_EXTENSIONS = {
+    ".jpg",
+    ".jpeg",
+    ".png",
+    ".gif",
+    ".webp",
+    ".svg",
+    ".bmp",
+    ".mp3",
+    ".mp4",
+    ".avi",
+    ".mov",
+    ".wav",
+    ".zip",
+    ".gz",
+    ".tar",
+    ".rar",
+    ".7z",
+    ".exe",
+    ".doc",
+    ".docx",
+    ".xls",
+    ".xlsx",
+    ".ppt",
+    ".pptx",
+    ".hwp",
+    ".txt",
+    ".csv",
+    ".json",
+    ".xml",
+    ".css",
+    ".js",
+}
+
+DIGEST_SET_CAPACITY = 1 << 16  # 중복 검사 해시 테이블 초기 크기 (2의 거듭제곱)
+
+_HOST_PATTERN = re.compile(r"^[a-z0-9.-]+$")  # IDNA 변환 후의 호스트 이름
+_SPACE_PATTERN = re.compile(r"\s")
+# 첫 줄이 머리글인지 볼 때 URL이나 호스트를 쓰려던 값으로 볼 모양 (scheme://, //, www., a.b)
+_URL_LIKE_PATTERN = re.compile(
+    r"^(?:[a-z][a-z0-9+.-]*://|//|www\.|[^\s/]+\.[^\s/]+(?:/|$))", re.IGNORECASE
+)
+
+# 거른 이유
+REJECT_INVALID = "invalid"
+REJECT_NOT_PDF = "not_pdf"
+
+
+class DigestSet:
+    """64비트 URL 해시만 저장하는 열린 주소법 해시 집합 (파이썬 set보다 몇 배 작음)"""
+
+    def __init__(self, capacity=DIGEST_SET_CAPACITY):
+        self._table = np.zeros(capacity, dtype=np.uint64)  # 0은 빈 칸
+        self._mask = capacity - 1
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def add(self, key):
+        """key를 추가하고, 처음 보는 값이면 True 반환"""
+        digest = int.from_bytes(
+            hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little"
+        )
+        if self._insert(digest or 1):
+            self._count += 1
+            if self._count * 2 > len(self._table):
+                self._grow()
+            return True
+        return False
+
+    def _insert(self, digest):
+        table = self._table
+        i = digest & self._mask
+        while True:
+            slot = int(table[i])
+            if slot == 0:
+                table[i] = digest
+                return True
+            if slot == digest:
+                return False
+            i = (i + 1) & self._mask
+
+    def _grow(self):
+        old = self._table[self._table != 0]
+        self._table = np.zeros(len(self._table) * 2, dtype=np.uint64)
+        self._mask = len(self._table) - 1
+        for digest in old.tolist():
+            self._insert(digest)
+
+
+def new_counts():
+    """읽기 결과 집계용 dict"""
+    return {
+        "rows": 0,  # 읽은 줄 수 (빈 줄·머리글 제외)
+        "urls": 0,  # 받아들인 고유 URL 수
+        "duplicates": 0,
+        REJECT_INVALID: 0,
+        REJECT_NOT_PDF: 0,
+    }
+
+
+def is_tracking_param(name):
+    """추적용 쿼리 파라미터 이름인지 여부"""
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def _valid_host(parts):
+    """호스트가 도메인 이름(한글 등 IDN 포함), IPv4 또는 대괄호로 감싼 IPv6인지 여부"""
+    host = parts.hostname or ""
+    if parts.netloc.rpartition("@")[2].startswith("["):
+        try:
+            ipaddress.IPv6Address(host)
+        except ValueError:
+            return False
+        return True
+    if not host.isascii():
+        try:
+            host = host.encode("idna").decode("ascii")  # 한글.kr -> xn--bj0bj06e.kr
+        except UnicodeError:
+            return False
+    if not _HOST_PATTERN.match(host):
+        return False
+    return "." in host or host == "localhost"
+
+
+def _strip_tracking(parts):
+    """추적 파라미터만 쿼리에서 빼고 나머지는 순서·인코딩 그대로 둔 URL
+
+    서명된(presigned) 링크는 쿼리 순서나 인코딩만 바뀌어도 깨지므로 다시 만들지 않습니다.
+    """
+    if not parts.query:
+        return urlunsplit(parts)
+    query = "&".join(
+        item
+        for item in parts.query.split("&")
+        if not is_tracking_param(unquote_plus(item.partition("=")[0]))
+    )
+    return urlunsplit(parts._replace(query=query))
+
+
+def _dedupe_key(parts):
+    """중복 판별용 키 (다운로드 캐시 키와 같은 정규화, 계정 정보가 다르면 다른 URL)"""
+    key = pdf_downloader.normalize_url_parts(parts, is_tracking_param)
+    userinfo = parts.netloc.rpartition("@")[0]
+    return f"{userinfo}@{key}" if userinfo else key
+
+
+def clean_url(value):
+    """CSV 값 하나를 정리해 (내려받을 URL, None) 또는 (None, 거른 이유) 반환"""
+    url, _, reason = _clean_url(value)
+    return url, reason
+
+
+def _clean_url(value):
+    """clean_url과 같되 (URL, 중복 판별 키, 거른 이유) 반환"""
+    value = value.strip()
+    if value.startswith("//"):
+        value = "https:" + value
+    elif value.lower().startswith("www."):
+        value = "https://" + value
+    if not value or _SPACE_PATTERN.search(value):
+        return None, None, REJECT_INVALID
+
+    try:
+        parts = urlsplit(value)
+        parts.port  # 잘못된 포트면 ValueError
+    except ValueError:
+        return None, None, REJECT_INVALID
+    if parts.scheme.lower() not in ("http", "https") or not _valid_host(parts):
+        return None, None, REJECT_INVALID
+    if os.path.splitext(parts.path)[1].lower() in NON_PDF_EXTENSIONS:
+        return None, None, REJECT_NOT_PDF
+
+    # 내려받는 주소는 원래 링크에서 추적 파라미터만 빼고, 정규화한 형태는 중복 판별에만 씀
+    return _strip_tracking(parts), _dedupe_key(parts), None
+
+
+def iter_csv_urls(text_file, counts=None):
+    """텍스트 파일 객체의 CSV 첫 번째 열에서 정리한 URL을 원래 순서대로 yield
+
+    정규화 후 같은 URL은 처음 나온 것만 내보내고, counts가 주어지면
+    읽은 줄 수와 중복·잘못된 값·PDF가 아닌 링크 수를 집계합니다.
+    첫 줄은 URL 모양이 아닐 때만 머리글로 보고, 잘못된 URL이면 잘못된 값으로 셉니다.
+    """
+    counts = counts if counts is not None else new_counts()
+    seen = DigestSet()
+    first = True
+    for row in csv.reader(text_file):
+        if not row or not row[0].strip():
+            continue
+        url, key, reason = _clean_url(row[0])
+        if first:
+            first = False
+            if reason == REJECT_INVALID and not _URL_LIKE_PATTERN.match(row[0].strip()):
+                continue  # URL 모양조차 아닌 첫 줄("url", "링크")은 머리글로 보고 건너뜀
+        counts["rows"] += 1
+        if reason:
+            counts[reason] += 1
+        elif not seen.add(key):
+            counts["duplicates"] += 1
+        else:
+            counts["urls"] += 1
+            yield url
+
+
+def open_csv_text(source):
+    """CSV 파일 경로 또는 업로드 파일(바이너리)을 텍스트 파일 객체로 열기"""
+    if isinstance(source, (str, os.PathLike)):
+        return open(source, newline="", encoding="utf-8-sig", errors="replace")
+    source.seek(0)
+    return io.TextIOWrapper(source, newline="", encoding="utf-8-sig", errors="replace")
+
+
+def ingest_csv(source, out_path, max_preview=2):
+    """CSV의 URL을 정리해 out_path에 한 줄씩 저장하고 {counts, preview} 반환
+
+    전체 목록을 메모리에 만들지 않고 미리보기용 앞부분 max_preview개만 돌려줍니다.
+    """
+    counts = new_counts()
+    preview = []
+    text_file = open_csv_text(source)
+    try:
+        with open(out_path, "w", encoding="utf-8") as out:
+            for url in iter_csv_urls(text_file, counts):
+                out.write(url + "\n")
+                if len(preview) < max_preview:
+                    preview.append(url)
+    finally:
+        if isinstance(source, (str, os.PathLike)):
+            text_file.close()
+        else:
+            text_file.detach()  # 업로드 파일 버퍼는 닫지 않고 래퍼만 분리
+    return {"counts": counts, "preview": preview}
+
+
+def read_url_file(path):
+    """ingest_csv로 저장한 URL 파일을 한 줄씩 yield"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield line.strip()